@@ -0,0 +1,11 @@
+from django.apps import AppConfig
+
+
+class MelarProjectConfig(AppConfig):
+    name = 'melar_project'
+
+    def ready(self):
+        from django.core import checks
+        from .cache import check_shared_caches
+
+        checks.register(check_shared_caches, checks.Tags.caches, deploy=True)
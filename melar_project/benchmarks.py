@@ -0,0 +1,432 @@
+import json
+import platform
+import time
+import tracemalloc
+from datetime import timedelta
+from decimal import Decimal
+from importlib import import_module
+from types import SimpleNamespace
+
+import django
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, reverse
+from django.utils import timezone
+
+DEFAULTS = {
+    'BASELINE': None,            # Path JSON baseline yang di-commit
+    'URLCONFS': ['shops.urls', 'rentals.urls', 'users.urls', 'seller_requests.urls'],
+    'ITERATIONS': 30,
+    'WARMUP': 3,
+    'MEMORY_ITERATIONS': 3,      # Putaran terpisah dengan tracemalloc (memperlambat request)
+    'LATENCY_METRIC': 'p50_ms',  # Latensi yang dibandingkan dengan baseline (p95/p99 terlalu berisik di CI bersama)
+    'LATENCY_TOLERANCE': 0.5,    # Boleh lebih lambat 50% dari baseline...
+    'LATENCY_SLACK_MS': 2.0,     # ...ditambah selisih absolut ini (endpoint sub-milidetik berisik)
+    'MEMORY_TOLERANCE': 0.25,
+    'MEMORY_SLACK_KIB': 64,
+    'QUERY_TOLERANCE': 0,        # Jumlah query deterministik: tambahan satu pun berarti regresi
+    'BUDGETS': {},               # Batas absolut per skenario, mis. {'product-list.get': {'p95_ms': 50, 'queries': 5}}
+}
+
+PASSWORD = 'Bench-password-123'
+TRANSACTION_SQL = ('BEGIN', 'SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK')
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'BENCHMARKS', {})}
+
+
+def seed():
+    """
+    Dataset tetap untuk benchmark: admin, penjual dengan 200 produk di 10 kategori,
+    pelanggan dengan keranjang dan 20 order, serta 30 permohonan seller pending.
+    """
+    from django.contrib.auth import get_user_model
+    from rentals import exports
+    from rentals.models import Booking, Cart, ExportJob, Order, OrderItem, Shipping
+    from seller_requests.models import SellerRequest
+    from shops.models import Category, Discount, Inventory, Product, Shop
+
+    User = get_user_model()
+    today = timezone.localdate()
+    admin = User.objects.create_user(
+        email='bench-admin@example.com', username='bench-admin', full_name='Bench Admin',
+        password=PASSWORD, role='admin', is_staff=True,
+    )
+    seller = User.objects.create_user(
+        email='bench-seller@example.com', username='bench-seller', full_name='Bench Seller',
+        password=PASSWORD, is_seller=True,
+    )
+    customer = User.objects.create_user(
+        email='bench-customer@example.com', username='bench-customer', full_name='Bench Customer',
+        password=PASSWORD,
+    )
+    applicants = User.objects.bulk_create([
+        User(email=f'bench-applicant{i}@example.com', username=f'bench-applicant{i}', full_name='Applicant', password='!')
+        for i in range(30)
+    ])
+
+    shop = Shop.objects.create(user=seller, shop_name='Bench Outdoor', address='Jl. Benchmark 1', postal_code='40111', contact='0812000000')
+    categories = Category.objects.bulk_create([Category(name=f'Bench Kategori {i}') for i in range(10)])
+    statuses = ('approved', 'approved', 'pending', 'blocked')
+    availability = ('available', 'available', 'rented', 'unavailable')
+    products = Product.objects.bulk_create([
+        Product(
+            shop=shop, name=f'Tenda Kemah {i}', description=f'Tenda dome kapasitas {i % 6 + 1} orang',
+            price=Decimal(10 + i % 50), status=statuses[i % 4], availability_status=availability[i % 4],
+        )
+        for i in range(200)
+    ])
+    Product.categories.through.objects.bulk_create([
+        Product.categories.through(product_id=product.id, category_id=categories[(i + offset) % 10].id)
+        for i, product in enumerate(products) for offset in (0, 3)
+    ])
+    # Produk terakhir tanpa inventory agar skenario POST inventory tidak melanggar unik product_id
+    inventories = Inventory.objects.bulk_create([Inventory(product=product, quantity=5) for product in products[:-1]])
+    discounts = Discount.objects.bulk_create([
+        Discount(
+            code=f'BENCH{i}', percentage=Decimal(5 * (i + 1)), valid_from=today - timedelta(days=30),
+            valid_until=today + timedelta(days=60), admin=admin,
+            product=products[i] if i % 2 == 0 else None, category=categories[i] if i % 2 else None,
+        )
+        for i in range(5)
+    ])
+
+    cart = [Cart(user=customer, product=product, quantity=1, total_price=product.price) for product in products[:5]]
+    Cart.objects.bulk_create(cart)
+    orders = Order.objects.bulk_create([
+        Order(
+            user=customer, total_price=Decimal(0), borrow_date=today + timedelta(days=10 + i),
+            return_deadline=today + timedelta(days=13 + i), status='shipping' if i == 19 else 'pending',
+        )
+        for i in range(20)  # Order terakhir sedang dikirim untuk skenario konfirmasi diterima
+    ])
+    items, bookings = [], []
+    for i, order in enumerate(orders):
+        for product in (products[10 + i], products[40 + i]):
+            items.append(OrderItem(order=order, product=product, quantity=1, price=product.price, total_price=product.price))
+            bookings.append(Booking(product=product, order=order, start_date=order.borrow_date, end_date=order.return_deadline))
+    OrderItem.objects.bulk_create(items)
+    Booking.objects.bulk_create(bookings)
+    shippings = Shipping.objects.bulk_create([
+        Shipping(order=order, address='Jl. Pelanggan 2', postal_code='40112', phone_number='0813000000', user_name='Bench Customer')
+        for order in orders
+    ])
+    requests = SellerRequest.objects.bulk_create([SellerRequest(user=user) for user in applicants])
+    # Ekspor selesai untuk skenario download (file di EXPORTS['DIRECTORY'])
+    export = ExportJob.objects.create(user=admin, kind='users', format='csv')
+    exports.run_job(export.pk)
+
+    return SimpleNamespace(
+        today=today, admin=admin, seller=seller, customer=customer, shop=shop.id,
+        categories=[category.id for category in categories], products=[product.id for product in products],
+        inventories=[inventory.id for inventory in inventories], discounts=[discount.id for discount in discounts],
+        cart=list(Cart.objects.filter(user=customer).order_by('id').values_list('id', flat=True)),
+        orders=[order.id for order in orders], shippings=[shipping.id for shipping in shippings],
+        seller_requests=[request.id for request in requests], exports=[export.id],
+    )
+
+
+class Scenario:
+    """
+    Satu request terhadap satu route: method, user, argumen URL dan body.
+
+    `args`, `query` dan `data` adalah fungsi dataset (hasil `seed`) sehingga
+    token, id dan tanggal dibangun ulang di setiap iterasi.
+    """
+
+    def __init__(self, url_name, method='get', user='customer', args=None, query=None, data=None, name=None):
+        self.url_name = url_name
+        self.method = method
+        self.user = user
+        self.args = args
+        self.query = query
+        self.data = data
+        self.name = name or f'{url_name}.{method}'
+
+    def request(self, client, dataset, tokens):
+        url = reverse(self.url_name, args=self.args(dataset) if self.args else None)
+        headers = {'Authorization': f'Bearer {tokens[self.user]}'} if self.user else {}
+        if self.method == 'get':
+            query = self.query(dataset) if self.query else None
+            start = time.perf_counter()
+            response = client.get(url, query, headers=headers)
+        else:
+            body = json.dumps(self.data(dataset) if self.data else {}, default=str)
+            start = time.perf_counter()
+            response = client.generic(self.method.upper(), url, body, content_type='application/json', headers=headers)
+        return time.perf_counter() - start, response
+
+
+def _refresh(dataset):
+    from users.tokens import CachedBlacklistRefreshToken
+    return str(CachedBlacklistRefreshToken.for_user(dataset.customer))
+
+
+def _dates(dataset, offset=90, days=3):
+    start = dataset.today + timedelta(days=offset)
+    return start, start + timedelta(days=days)
+
+
+SCENARIOS = [
+    # users
+    Scenario('register', 'post', user=None, data=lambda d: {
+        'email': 'bench-new@example.com', 'username': 'bench-new', 'full_name': 'Bench New', 'password': PASSWORD,
+    }),
+    Scenario('login', 'post', user=None, data=lambda d: {'email': d.customer.email, 'password': PASSWORD}),
+    Scenario('logout', 'post', data=lambda d: {'refresh': _refresh(d)}),
+    Scenario('token_refresh', 'post', user=None, data=lambda d: {'refresh': _refresh(d)}),
+    Scenario('profile'),
+    Scenario('profile', 'patch', data=lambda d: {'full_name': 'Bench Customer Baru'}),
+    Scenario('change_password', 'post', data=lambda d: {
+        'old_password': PASSWORD, 'new_password': PASSWORD + '-baru', 'confirm_new_password': PASSWORD + '-baru',
+    }),
+
+    # shops: katalog dibaca sebagai pemilik toko (queryset dibatasi pada milik user).
+    # POST diskon (admin tidak diisi view) dan PATCH/DELETE produk (IsOwnerOrReadOnly membaca
+    # `obj.user`) belum punya jalur sukses; skenarionya ditambahkan setelah view diperbaiki,
+    # agar suite tidak mengukur error 500.
+    Scenario('shop-list', user='seller'),
+    Scenario('shop-list', 'post', data=lambda d: {
+        'shop_name': 'Bench Toko Baru', 'address': 'Jl. Baru 3', 'postal_code': '40113', 'contact': '0814000000',
+    }),
+    Scenario('shop-detail', user='seller', args=lambda d: [d.shop]),
+    Scenario('shop-detail', 'patch', user='seller', args=lambda d: [d.shop], data=lambda d: {'description': 'Sewa alat kemah'}),
+    Scenario('product-list', user='seller'),
+    Scenario('product-list', user='seller', name='product-list.get:filtered', query=lambda d: {
+        'min_price': 20, 'max_price': 40, 'status': 'approved', 'category': d.categories[0],
+    }),
+    Scenario('product-list', 'post', user='seller', data=lambda d: {
+        'name': 'Bench Carrier 60L', 'price': '35.00', 'categories': ['Bench Kategori 1', 'Bench Kategori Baru'],
+    }),
+    Scenario('product-bulk', 'post', user='seller', data=lambda d: {'products': [
+        {'name': f'Bench Sleeping Bag {i}', 'price': '15.00', 'categories': [f'Bench Kategori {i % 10}']}
+        for i in range(50)
+    ]}),
+    Scenario('product-search', user='seller', query=lambda d: {'q': 'tenda kem'}),
+    Scenario('product-detail', user='seller', args=lambda d: [d.products[0]]),
+    Scenario('category-list'),
+    Scenario('category-list', name='category-list.get:expanded', query=lambda d: {'expand': 'products'}),
+    Scenario('category-list', 'post', user='admin', data=lambda d: {'name': 'Bench Kategori Baru'}),
+    Scenario('category-detail', args=lambda d: [d.categories[0]]),
+    Scenario('category-detail', 'patch', user='admin', args=lambda d: [d.categories[0]], data=lambda d: {'description': 'Perlengkapan'}),
+    Scenario('discount-list'),
+    Scenario('discount-detail', args=lambda d: [d.discounts[0]]),
+    Scenario('inventory-list'),
+    Scenario('inventory-list', 'post', user='seller', data=lambda d: {'product_id': d.products[-1], 'quantity': 3}),
+    Scenario('inventory-detail', args=lambda d: [d.inventories[0]]),
+    Scenario('async-product-list', user='seller'),
+    Scenario('async-product-detail', user='seller', args=lambda d: [d.products[0]]),
+    Scenario('async-category-list'),
+    Scenario('async-shop-detail', user='seller', args=lambda d: [d.shop]),
+    Scenario('moderation-products', user='admin'),
+    Scenario('moderation-products', 'post', user='admin', data=lambda d: {'ids': d.products[:50], 'decision': 'approve'}),
+
+    # rentals
+    Scenario('api-root'),
+    Scenario('availability', query=lambda d: {
+        'product': ','.join(map(str, d.products[10:30])), 'start': d.today, 'end': d.today + timedelta(days=60),
+    }),
+    Scenario('quote', 'post', data=lambda d: {'start': _dates(d)[0], 'end': _dates(d)[1]}),
+    Scenario('cart-list'),
+    Scenario('cart-list', 'post', data=lambda d: {'product': d.products[0], 'quantity': 1}),
+    Scenario('cart-bulk', 'post', data=lambda d: {'lines': [{'product': product, 'quantity': 1} for product in d.products[5:55]]}),
+    Scenario('cart-summary'),
+    Scenario('cart-checkout', 'post', data=lambda d: {'borrow_date': _dates(d)[0], 'return_deadline': _dates(d)[1]}),
+    Scenario('cart-detail', args=lambda d: [d.cart[0]]),
+    Scenario('cart-detail', 'patch', args=lambda d: [d.cart[0]], data=lambda d: {'quantity': 2}),
+    Scenario('cart-detail', 'delete', args=lambda d: [d.cart[0]]),
+    Scenario('order-list'),
+    Scenario('order-detail', args=lambda d: [d.orders[0]]),
+    Scenario('order-request-cancel', 'post', args=lambda d: [d.orders[0]]),
+    Scenario('order-confirm-received', 'post', args=lambda d: [d.orders[-1]]),
+    Scenario('shipping-list'),
+    Scenario('shipping-detail', args=lambda d: [d.shippings[0]]),
+    Scenario('export-list', user='admin'),
+    Scenario('export-list', 'post', user='admin', data=lambda d: {'kind': 'orders', 'format': 'jsonl'}),
+    Scenario('export-detail', user='admin', args=lambda d: [d.exports[0]]),
+    Scenario('export-download', user='admin', args=lambda d: [d.exports[0]]),
+
+    # seller_requests
+    Scenario('sellerrequest-list', user='admin'),
+    Scenario('sellerrequest-detail', user='admin', args=lambda d: [d.seller_requests[0]]),
+    Scenario('sellerrequest-detail', 'put', user='admin', args=lambda d: [d.seller_requests[0]], data=lambda d: {'status': 'approved'}),
+    Scenario('moderation-seller-requests', user='admin'),
+    Scenario('moderation-seller-requests', 'post', user='admin', data=lambda d: {'ids': d.seller_requests, 'decision': 'approve'}),
+]
+
+
+def route_names(urlconfs=None):
+    """Nama semua route di `URLCONFS` (varian format suffix digabung dengan route aslinya)."""
+    names = set()
+
+    def walk(patterns):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                walk(pattern.url_patterns)
+            elif isinstance(pattern, URLPattern) and pattern.name:
+                names.add(pattern.name)
+
+    for urlconf in urlconfs or get_config()['URLCONFS']:
+        walk(import_module(urlconf).urlpatterns)
+    return names
+
+
+def uncovered_routes(scenarios=SCENARIOS):
+    return sorted(route_names() - {scenario.url_name for scenario in scenarios})
+
+
+def calibrate(rounds=5):
+    """
+    Waktu (ms) beban CPU tetap, terbaik dari `rounds` putaran.
+
+    Disimpan bersama baseline; batas latensi diskalakan dengan rasio kalibrasi
+    agar mesin yang lebih lambat (atau sedang sibuk) tidak dianggap regresi.
+    """
+    payload = [{'id': i, 'name': f'produk {i}', 'price': str(Decimal(i) / 7), 'tags': list(range(i % 10))} for i in range(2000)]
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(5):
+            json.loads(json.dumps(payload))
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 3)
+
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def run(scenarios, dataset, iterations=None, warmup=None, memory_iterations=None, stdout=None):
+    """
+    Ukur setiap skenario: latensi p50/p95/p99, jumlah query dan puncak alokasi memori.
+
+    Setiap request berjalan di transaksi yang di-rollback sehingga skenario tulis
+    (checkout, hapus, moderasi) melihat dataset yang sama di setiap iterasi.
+    """
+    from rest_framework_simplejwt.tokens import AccessToken
+    from users.claims import add_claims
+
+    config = get_config()
+    iterations = iterations or config['ITERATIONS']
+    warmup = config['WARMUP'] if warmup is None else warmup
+    memory_iterations = config['MEMORY_ITERATIONS'] if memory_iterations is None else memory_iterations
+    # Token dengan claim seperti hasil login, agar jalur autentikasi sama dengan produksi
+    tokens = {
+        role: str(add_claims(AccessToken.for_user(user), user))
+        for role, user in (('admin', dataset.admin), ('seller', dataset.seller), ('customer', dataset.customer))
+    }
+    client = Client(raise_request_exception=False)  # Error 500 dicatat sebagai status, bukan menghentikan suite
+
+    def once(scenario):
+        with transaction.atomic():
+            elapsed, response = scenario.request(client, dataset, tokens)
+            transaction.set_rollback(True)
+        return elapsed, response
+
+    results = {}
+    for scenario in scenarios:
+        for _ in range(warmup):
+            once(scenario)
+        connection.queries_log.clear()  # Log lama membuat indeks awal CaptureQueriesContext meleset
+        with CaptureQueriesContext(connection) as queries:
+            _, response = once(scenario)
+        # Tanpa BEGIN/SAVEPOINT/ROLLBACK milik transaksi rollback benchmark; dihitung sekarang
+        # karena `captured_queries` membaca log koneksi yang dikosongkan request berikutnya
+        query_count = sum(1 for query in queries.captured_queries if not query['sql'].startswith(TRANSACTION_SQL))
+        latencies = sorted(once(scenario)[0] for _ in range(iterations))
+
+        peak = 0
+        tracemalloc.start()
+        try:
+            for _ in range(memory_iterations):
+                tracemalloc.reset_peak()
+                before = tracemalloc.get_traced_memory()[0]
+                once(scenario)
+                peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+        finally:
+            tracemalloc.stop()
+
+        results[scenario.name] = {
+            'status': response.status_code,
+            'queries': query_count,
+            'p50_ms': round(_percentile(latencies, 0.5) * 1000, 3),
+            'p95_ms': round(_percentile(latencies, 0.95) * 1000, 3),
+            'p99_ms': round(_percentile(latencies, 0.99) * 1000, 3),
+            'peak_kib': round(peak / 1024, 1),
+        }
+        if stdout is not None:
+            stdout.write(format_result(scenario.name, results[scenario.name]))
+    return results
+
+
+def format_result(name, result, baseline=None):
+    line = (
+        f"{name:<40} {result['status']:>3} q={result['queries']:<3} "
+        f"p50={result['p50_ms']:7.2f}ms p95={result['p95_ms']:7.2f}ms p99={result['p99_ms']:7.2f}ms "
+        f"mem={result['peak_kib']:8.1f}KiB"
+    )
+    if baseline is not None:
+        metric = get_config()['LATENCY_METRIC']
+        line += f" (baseline q={baseline['queries']} {metric[:3]}={baseline[metric]:.2f}ms)"
+    return line
+
+
+def compare(results, baseline, config=None, speed=1.0):
+    """
+    Pelanggaran budget per skenario: status berubah, query bertambah, latensi atau
+    memori melewati toleransi relatif baseline, atau melewati batas absolut `BUDGETS`.
+    Skenario yang belum ada di baseline hanya dibandingkan dengan `BUDGETS`.
+
+    `speed` adalah rasio kalibrasi mesin ini terhadap mesin baseline (>1 = lebih lambat).
+    Hasilnya `{nama skenario: [pesan, ...]}`.
+    """
+    config = config or get_config()
+    metric = config['LATENCY_METRIC']
+    violations = {}
+    for name, result in results.items():
+        messages = violations.setdefault(name, [])
+        base = baseline.get(name)
+        if base is not None:
+            if result['status'] != base['status']:
+                messages.append(f"status {result['status']} (baseline {base['status']})")
+            if result['queries'] > base['queries'] + config['QUERY_TOLERANCE']:
+                messages.append(f"{result['queries']} query (baseline {base['queries']})")
+            limit = base[metric] * speed * (1 + config['LATENCY_TOLERANCE']) + config['LATENCY_SLACK_MS']
+            if result[metric] > limit:
+                messages.append(f"{metric} {result[metric]:.2f}ms > {limit:.2f}ms (baseline {base[metric]:.2f}ms)")
+            limit = base['peak_kib'] * (1 + config['MEMORY_TOLERANCE']) + config['MEMORY_SLACK_KIB']
+            if result['peak_kib'] > limit:
+                messages.append(f"peak_kib {result['peak_kib']:.1f} > {limit:.1f} (baseline {base['peak_kib']:.1f})")
+        for key, budget in config['BUDGETS'].get(name, {}).items():
+            if result[key] > budget:
+                messages.append(f"{key} {result[key]} > budget {budget}")
+        if not messages:
+            del violations[name]
+    return violations
+
+
+def load_baseline(path):
+    """`(meta, skenario)` dari file baseline."""
+    with open(path) as f:
+        data = json.load(f)
+    return data['meta'], data['scenarios']
+
+
+def write_baseline(path, results, iterations, calibration_ms):
+    data = {
+        'meta': {
+            'calibration_ms': calibration_ms,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'machine': platform.machine(),
+            'iterations': iterations,
+        },
+        'scenarios': dict(sorted(results.items())),
+    }
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+        f.write('\n')
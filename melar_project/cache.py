@@ -0,0 +1,246 @@
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from rest_framework.response import Response
+from .routers import PRIMARY, use_database
+
+DEFAULTS = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'TIMEOUT': 300,       # Umur entri respons (detik)
+    'LOCK_TIMEOUT': 10,   # Umur lock single-flight jika pemegangnya mati
+    'LOCK_WAIT': 2.0,     # Lama request lain menunggu hasil pemegang lock
+    'POLL_INTERVAL': 0.02,
+}
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'waits': 0}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'CATALOG_CACHE', {})}
+
+
+def get_cache():
+    return caches[get_config()['ALIAS']]
+
+
+def stats():
+    """Salinan counter hit/miss proses ini."""
+    with _stats_lock:
+        return dict(_stats)
+
+
+def _count(name):
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def _seed():
+    """Versi awal: waktu dalam ns, selalu di atas versi mana pun yang pernah dipakai sebelumnya."""
+    return time.time_ns()
+
+
+def _bump(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Versi belum ada (atau sudah di-evict): mulai dari nilai unik agar key lama tidak hidup lagi
+        cache.set(key, _seed(), None)
+
+
+def invalidate(resource, pk=None):
+    """
+    Buang cache respons untuk `resource`.
+
+    Dengan `pk`, hanya respons list dan detail objek itu yang dibuang; tanpa `pk`,
+    semua respons resource itu (dipakai untuk resource yang menanamkan model lain).
+    """
+    if pk is None:
+        _bump(f'catalog:{resource}:global')
+    else:
+        _bump(f'catalog:{resource}:list')
+        _bump(f'catalog:{resource}:obj:{pk}')
+
+
+def _versions(resource, pk):
+    """
+    Versi global dan list/objek untuk key respons.
+
+    Versi disimpan tanpa kadaluarsa. Versi yang hilang (belum pernah dibuat atau
+    di-evict) diisi dari `_seed()`, bukan dianggap 0: dengan 0, entri respons lama
+    yang dibuat sebelum versi pertama di-bump akan terbaca lagi setelah eviction.
+    """
+    cache = get_cache()
+    names = _version_names(resource, pk)
+    found = cache.get_many(names)
+    missing = [name for name in names if name not in found]
+    if missing:
+        for name in missing:
+            cache.add(name, _seed(), None)  # Jika proses lain lebih dulu, nilainya yang dipakai
+        found.update(cache.get_many(missing))
+    return [found.get(name) or _seed() for name in names]
+
+
+async def _aversions(resource, pk):
+    """`_versions` untuk view async: cache dibaca dengan API async, event loop tidak diblok."""
+    cache = get_cache()
+    names = _version_names(resource, pk)
+    found = await cache.aget_many(names)
+    missing = [name for name in names if name not in found]
+    if missing:
+        for name in missing:
+            await cache.aadd(name, _seed(), None)
+        found.update(await cache.aget_many(missing))
+    return [found.get(name) or _seed() for name in names]
+
+
+def _version_names(resource, pk):
+    return [f'catalog:{resource}:global', f'catalog:{resource}:list' if pk is None else f'catalog:{resource}:obj:{pk}']
+
+
+def _response_key(resource, request, versions, pk, scope, validator):
+    query = hashlib.sha1(f'{request.get_full_path()}|{validator or ""}'.encode('utf-8')).hexdigest()
+    versions = '.'.join(str(version) for version in versions)
+    return f'catalog:{resource}:resp:{versions}:{pk or "list"}:{scope or "all"}:{query}'
+
+
+def response_key(resource, request, pk=None, scope=None, validator=None):
+    return _response_key(resource, request, _versions(resource, pk), pk, scope, validator)
+
+
+async def aresponse_key(resource, request, pk=None, scope=None, validator=None):
+    return _response_key(resource, request, await _aversions(resource, pk), pk, scope, validator)
+
+
+def single_flight(key, compute):
+    """
+    Ambil nilai `key` dari cache atau hitung dengan `compute()`.
+
+    Hanya satu request per key yang menghitung ulang; request lain menunggu hasilnya
+    selama `LOCK_WAIT` detik sebelum menghitung sendiri, sehingga key yang baru
+    kadaluarsa tidak memicu stampede ke database. `compute` mengembalikan
+    `(value, cacheable)`.
+    """
+    config = get_config()
+    cache = get_cache()
+    value = cache.get(key)
+    if value is not None:
+        _count('hits')
+        return value, True
+
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, config['LOCK_TIMEOUT']):
+        _count('waits')
+        deadline = time.monotonic() + config['LOCK_WAIT']
+        while time.monotonic() < deadline:
+            time.sleep(config['POLL_INTERVAL'])
+            value = cache.get(key)
+            if value is not None:
+                _count('hits')
+                return value, True
+        lock_key = None  # Pemegang lock terlalu lama; hitung sendiri tanpa menunggu lagi
+
+    _count('misses')
+    try:
+        value, cacheable = compute()
+        if cacheable:
+            cache.set(key, value, config['TIMEOUT'])
+    finally:
+        if lock_key is not None:
+            cache.delete(lock_key)
+    return value, False
+
+
+def process_local(alias):
+    """True jika cache `alias` hanya hidup di satu proses (LocMem, Dummy)."""
+    backend = caches[alias]
+    return isinstance(backend, (LocMemCache, DummyCache))
+
+
+SHARED_CACHE_HINT = "Pakai backend cache bersama (Redis, Memcached atau DatabaseCache)."
+
+
+def shared_cache_error(alias, setting, feature, id, hint=SHARED_CACHE_HINT):
+    """Error check deploy jika `feature` bergantung pada cache `alias` yang hanya hidup di satu proses."""
+    if not process_local(alias):
+        return []
+    return [checks.Error(
+        f"{setting} ({alias!r}) memakai cache per proses; {feature} tidak terlihat oleh worker lain.",
+        hint=hint,
+        id=id,
+    )]
+
+
+def check_shared_caches(app_configs, **kwargs):
+    """
+    Check deploy (`manage.py check --deploy`) untuk penanda yang ditulis satu worker
+    dan dibaca worker lain: versi invalidasi katalog dan indeks diskon (E001),
+    penanda perubahan claim (E002, bila ClaimsJWTAuthentication dipakai) dan pin
+    sticky routing (E003, bila ada replika).
+    """
+    from rest_framework.settings import api_settings
+    from users import claims
+    from users.authentication import ClaimsJWTAuthentication
+    from . import routers
+
+    errors = shared_cache_error(
+        get_config()['ALIAS'], "CATALOG_CACHE['ALIAS']", "invalidasi katalog dan harga", 'melar.E001',
+    )
+    if any(issubclass(cls, ClaimsJWTAuthentication) for cls in api_settings.DEFAULT_AUTHENTICATION_CLASSES):
+        errors += shared_cache_error(
+            claims.get_config()['ALIAS'], "CLAIMS_AUTH['ALIAS']", "perubahan claim", 'melar.E002',
+            hint=(
+                "Pakai backend cache bersama yang tidak meng-evict penanda sebelum kadaluarsa (mis. Redis noeviction), "
+                "atau ganti ClaimsJWTAuthentication dengan JWTAuthentication."
+            ),
+        )
+    routing = routers.get_config()
+    if routing['REPLICAS']:
+        errors += shared_cache_error(
+            routing['CACHE_ALIAS'], "DATABASE_ROUTING['CACHE_ALIAS']", "pin baca ke primary setelah write", 'melar.E003',
+        )
+    return errors
+
+
+class CachedResponseMixin:
+    """
+    Read-through cache untuk `list` dan `retrieve`.
+
+    `cache_resource` menamai resource untuk invalidasi; `cache_per_user` memisahkan
+    entri per user untuk viewset yang queryset-nya dibatasi pada user yang login.
+    """
+    cache_resource = None
+    cache_per_user = False
+
+    def list(self, request, *args, **kwargs):
+        return self._cached(request, None, lambda: super(CachedResponseMixin, self).list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs.get(self.lookup_url_kwarg or self.lookup_field)
+        return self._cached(request, pk, lambda: super(CachedResponseMixin, self).retrieve(request, *args, **kwargs))
+
+    def _cached(self, request, pk, render):
+        if not get_config()['ENABLED'] or self.cache_resource is None:
+            return render()
+
+        def compute():
+            # Isi cache dari primary: replika yang tertinggal bisa menyimpan data lama di bawah versi baru
+            with use_database(PRIMARY):
+                response = render()
+            return (response.status_code, response.data), response.status_code == 200
+
+        scope = request.user.pk if self.cache_per_user else None
+        # Validator ETag (jika ada) membuat entri lama gugur juga saat data diubah tanpa sinyal
+        key = response_key(self.cache_resource, request, pk=pk, scope=scope, validator=getattr(self, 'validator_etag', None))
+        (status_code, data), hit = single_flight(key, compute)
+        response = Response(data, status=status_code)
+        response['X-Cache'] = 'HIT' if hit else 'MISS'
+        return response
@@ -0,0 +1,133 @@
+import hashlib
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def has_updated_at(model):
+    try:
+        model._meta.get_field('updated_at')
+    except FieldDoesNotExist:
+        return False
+    return True
+
+
+class ConditionalGetMixin:
+    """
+    ETag dan Last-Modified untuk `list` dan `retrieve` dari `updated_at`.
+
+    Validator list dihitung dari `(id, updated_at)` baris halaman yang diminta saja
+    (plus `MAX(updated_at)` relasi `select_related` yang ikut di-serialize), bukan
+    seluruh queryset terfilter: dengan keyset pagination itu query ber-LIMIT yang
+    sama dengan halaman, sehingga biayanya tidak tumbuh bersama tabel. Daftar id
+    ikut masuk ETag agar baris yang dihapus (lalu digantikan baris lama dari
+    halaman berikutnya) tetap terdeteksi; data di luar halaman (mis. facet)
+    ditambahkan lewat `get_validator_extra`. `If-None-Match`/`If-Modified-Since`
+    dijawab 304 sebelum serializer berjalan. Validator detail memakai agregat
+    `MAX(updated_at)` + `COUNT(*)` atas satu baris.
+    """
+
+    def get_validator_queryset(self):
+        return self.filter_queryset(self.get_queryset())
+
+    def get_validator_relations(self):
+        """Path relasi yang ikut di-serialize dan punya `updated_at` sendiri."""
+        plan = self.get_query_plan() if hasattr(self, 'get_query_plan') else None
+        relations = []
+        model = self.get_queryset().model
+        for path in getattr(plan, 'select_related', ()):
+            related = model
+            for part in path.split('__'):
+                related = related._meta.get_field(part).related_model
+            if has_updated_at(related):
+                relations.append(path)
+        return relations
+
+    def get_validator_page(self, queryset):
+        """Baris halaman saat ini bila paginator mendukung `page_queryset`; tanpa paginasi, seluruh queryset."""
+        paginator = self.pagination_class() if self.pagination_class is not None else None
+        if paginator is None or not hasattr(paginator, 'page_queryset'):
+            return queryset
+        return paginator.page_queryset(queryset, self.request, self)
+
+    def get_validator_extra(self, queryset):
+        """Nilai tambahan ETag list untuk data respons yang dihitung di luar halaman."""
+        return []
+
+    def list(self, request, *args, **kwargs):
+        render = lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)  # noqa: E731
+        queryset = self.get_validator_queryset()
+        extra = self.get_validator_extra(queryset)
+        return self._conditional(request, queryset, render, page=True, extra=extra)
+
+    def retrieve(self, request, *args, **kwargs):
+        render = lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)  # noqa: E731
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        queryset = self.get_validator_queryset().filter(**{self.lookup_field: kwargs[lookup_url_kwarg]})
+        return self._conditional(request, queryset, render, detail=True)
+
+    def _conditional(self, request, queryset, render, detail=False, page=False, extra=()):
+        if not has_updated_at(queryset.model):
+            return render()
+
+        relations = {
+            f'related_{index}': Max(f'{path}__updated_at')
+            for index, path in enumerate(self.get_validator_relations())
+        }
+        rows = self.get_validator_page(
+            queryset.annotate(**relations).values_list('pk', 'updated_at', *relations)
+        ) if page else None
+        if rows is not None and rows.query.is_sliced:
+            # Satu query ber-LIMIT per halaman; id baris ikut ETag karena COUNT dan MAX
+            # tidak berubah bila baris dihapus lalu baris yang lebih lama naik ke halaman
+            rows = list(rows)
+            count, ids = len(rows), [row[0] for row in rows]
+            values = [max(filter(None, column), default=None) for column in list(zip(*rows))[1:]]
+        else:
+            aggregates = {'count': Count('pk'), 'updated': Max('updated_at')}
+            aggregates.update(relations)
+            values = queryset.order_by().aggregate(**aggregates)
+            count, ids = values.pop('count'), []
+            values = list(values.values())
+        if detail and not count:
+            return render()  # Biarkan retrieve menghasilkan 404/403 seperti biasa
+
+        timestamps = [value for value in values if value is not None]
+        last_modified = max(timestamps) if timestamps else None
+        renderer = getattr(request, 'accepted_renderer', None)
+        fingerprint = '|'.join([
+            request.get_full_path(),
+            getattr(renderer, 'format', ''),
+            str(request.user.pk),
+            str(count),
+            ','.join(map(str, ids)),
+            *(value.isoformat() for value in timestamps),
+            *extra,
+        ])
+        etag = '"%s"' % hashlib.sha1(fingerprint.encode('utf-8')).hexdigest()
+        self.validator_etag = etag  # Dipakai CachedResponseMixin sebagai bagian key cache
+
+        if self._not_modified(request, etag, last_modified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = render()
+            if response.status_code != status.HTTP_200_OK:
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified.timestamp())
+        return response
+
+    @staticmethod
+    def _not_modified(request, etag, last_modified):
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etags = parse_etags(if_none_match)
+            return '*' in etags or etag in etags
+        if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+        if if_modified_since is not None and last_modified is not None:
+            return int(last_modified.timestamp()) <= if_modified_since
+        return False
@@ -0,0 +1,320 @@
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from rest_framework import renderers, serializers
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SERVER_TIMING': 'staff',  # 'staff' | 'all' | 'off': siapa yang menerima header Server-Timing
+    'DIRECTORY': None,         # Direktori bersama antar proses worker; None = hanya proses ini
+    'FLUSH_INTERVAL': 5.0,     # Detik antar penulisan snapshot proses ke DIRECTORY
+    'TABLE_SIZES': True,       # Sertakan jumlah baris tabel token (3 COUNT) saat scrape
+}
+
+DURATION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# nama -> (keterangan, bucket, label)
+HISTOGRAMS = {
+    'melar_request_duration_seconds': ("Durasi request per view", DURATION_BUCKETS, ('view', 'method', 'status')),
+    'melar_db_queries': ("Jumlah query per request", QUERY_BUCKETS, ('view',)),
+    'melar_db_duration_seconds': ("Total waktu query per request", DURATION_BUCKETS, ('view',)),
+    'melar_serializer_duration_seconds': ("Waktu serializer `.data` per request", DURATION_BUCKETS, ('view',)),
+    'melar_render_duration_seconds': ("Waktu render respons per request", DURATION_BUCKETS, ('view',)),
+    'melar_response_size_bytes': ("Ukuran body respons", SIZE_BUCKETS, ('view',)),
+}
+
+# Timing request yang sedang berjalan; dibaca wrapper query dan serializer
+_current = ContextVar('metrics_timings', default=None)
+
+_lock = threading.Lock()
+_histograms = {}   # (nama, nilai label) -> [count per bucket..., +Inf, sum]
+_next_flush = 0.0
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'METRICS', {})}
+
+
+def observe(*observations):
+    """Catat `(nama, nilai label, nilai)` ke histogram proses dengan satu kali ambil lock."""
+    with _lock:
+        for name, labels, value in observations:
+            buckets = HISTOGRAMS[name][1]
+            series = _histograms.get((name, labels))
+            if series is None:
+                series = _histograms[(name, labels)] = [0] * (len(buckets) + 1) + [0.0]
+            series[bisect_left(buckets, value)] += 1  # Batas bucket inklusif (le)
+            series[-1] += value
+
+
+def _db_wrapper(execute, sql, params, many, context):
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings['db'] += time.perf_counter() - start
+        timings['queries'] += 1
+
+
+def _timed_data(fget):
+    def data(self):
+        timings = _current.get()
+        if timings is None or timings['serializing']:
+            return fget(self)  # Serializer bersarang sudah terhitung oleh yang terluar
+        timings['serializing'] = True
+        start = time.perf_counter()
+        try:
+            return fget(self)
+        finally:
+            timings['serialize'] += time.perf_counter() - start
+            timings['serializing'] = False
+    data.timed = True
+    return property(data)
+
+
+def install():
+    """Pasang timing pada `BaseSerializer.data`; `Serializer` dan `ListSerializer` memanggilnya lewat `super()`."""
+    fget = serializers.BaseSerializer.data.fget
+    if not getattr(fget, 'timed', False):
+        serializers.BaseSerializer.data = _timed_data(fget)
+
+
+def view_name(view_func, method):
+    """`ProductViewSet.list`, `CartViewSet.checkout`, `LoginView.post`, atau nama fungsi view."""
+    cls = getattr(view_func, 'cls', None)
+    if cls is None:
+        return f'{view_func.__module__}.{view_func.__name__}'
+    actions = getattr(view_func, 'actions', None)
+    action = actions.get(method.lower(), method.lower()) if actions else method.lower()
+    return f'{cls.__name__}.{action}'
+
+
+class MetricsMiddleware:
+    """
+    Ukur setiap request: jumlah dan waktu query, waktu serializer dan render, ukuran respons.
+
+    Hasilnya masuk ke histogram proses (lihat `MetricsView`) dan, untuk user staff,
+    dikembalikan sebagai header `Server-Timing`. Letakkan paling atas di MIDDLEWARE
+    agar `total` mencakup middleware lain.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        install()
+
+    def __call__(self, request):
+        config = get_config()
+        if not config['ENABLED']:
+            return self.get_response(request)
+        timings = {'view': None, 'db': 0.0, 'queries': 0, 'serialize': 0.0, 'serializing': False, 'render': 0.0}
+        token = _current.set(timings)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for alias in connections:
+                    stack.enter_context(connections[alias].execute_wrapper(_db_wrapper))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - start
+        size = len(response.content) if not response.streaming else 0
+        self.record(timings, request, response, total, size)
+        maybe_flush(config)
+
+        mode = config['SERVER_TIMING']
+        user = getattr(request, 'user', None)  # Diisi DRF setelah autentikasi JWT
+        if mode == 'all' or (mode == 'staff' and getattr(user, 'is_staff', False)):
+            response['Server-Timing'] = ', '.join([
+                f'db;dur={timings["db"] * 1000:.2f};desc="{timings["queries"]} queries"',
+                f'serialize;dur={timings["serialize"] * 1000:.2f}',
+                f'render;dur={timings["render"] * 1000:.2f}',
+                f'total;dur={total * 1000:.2f}',
+                f'size;desc="{size} bytes"',
+            ])
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        timings = _current.get()
+        if timings is not None:
+            timings['view'] = view_name(view_func, request.method)
+
+    def process_template_response(self, request, response):
+        timings = _current.get()
+        if timings is not None:
+            start = time.perf_counter()
+
+            def rendered(response):
+                timings['render'] += time.perf_counter() - start
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    @staticmethod
+    def record(timings, request, response, total, size):
+        view = (timings['view'] or '<unresolved>',)
+        observe(
+            ('melar_request_duration_seconds', (*view, request.method, str(response.status_code)), total),
+            ('melar_db_queries', view, timings['queries']),
+            ('melar_db_duration_seconds', view, timings['db']),
+            ('melar_serializer_duration_seconds', view, timings['serialize']),
+            ('melar_render_duration_seconds', view, timings['render']),
+            ('melar_response_size_bytes', view, size),
+        )
+
+
+def snapshot():
+    """Histogram dan counter proses ini dalam bentuk yang bisa ditulis sebagai JSON."""
+    from users.blacklist import blacklist_cache
+    from .cache import stats as cache_stats
+
+    with _lock:
+        histograms = [[name, list(labels), list(series)] for (name, labels), series in _histograms.items()]
+    blacklist = blacklist_cache.stats()
+    counters = [['melar_catalog_cache_events_total', ['event', name], value] for name, value in cache_stats().items()]
+    counters += [
+        ['melar_token_blacklist_events_total', ['event', name], blacklist[name]]
+        for name in ('lookups', 'bloom_negatives', 'cache_hits', 'db_lookups', 'false_positives', 'syncs', 'rebuilds')
+    ]
+    counters.append(['melar_token_blacklist_lookup_seconds_total', [], blacklist['lookup_seconds_total']])
+    return {'pid': os.getpid(), 'histograms': histograms, 'counters': counters}
+
+
+def flush(directory=None):
+    """Tulis snapshot proses ini ke `DIRECTORY/<pid>.json` secara atomik."""
+    directory = directory or get_config()['DIRECTORY']
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(snapshot(), f)
+    os.replace(path, os.path.join(directory, f'{os.getpid()}.json'))
+
+
+def maybe_flush(config):
+    global _next_flush
+    now = time.monotonic()
+    if not config['DIRECTORY'] or now < _next_flush:
+        return
+    _next_flush = now + config['FLUSH_INTERVAL']
+    flush(config['DIRECTORY'])
+
+
+def collect():
+    """
+    Gabungan snapshot semua proses di `DIRECTORY` (atau proses ini saja).
+
+    Snapshot proses ini selalu yang terbaru. File proses yang sudah mati tetap
+    dihitung agar counter tidak turun; kosongkan direktori saat deploy.
+    """
+    directory = get_config()['DIRECTORY']
+    snapshots = [snapshot()]
+    if directory:
+        flush(directory)
+        own = os.path.join(directory, f'{os.getpid()}.json')
+        for path in sorted(glob.glob(os.path.join(directory, '*.json'))):
+            if path == own:
+                continue
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                continue  # Sedang ditulis ulang atau rusak; ikut di scrape berikutnya
+
+    histograms, counters = {}, {}
+    for data in snapshots:
+        for name, labels, series in data['histograms']:
+            if name not in HISTOGRAMS:
+                continue
+            key = (name, tuple(labels))
+            merged = histograms.setdefault(key, [0] * len(series))
+            histograms[key] = [a + b for a, b in zip(merged, series)]
+        for name, labels, value in data['counters']:
+            key = (name, tuple(labels))
+            counters[key] = counters.get(key, 0) + value
+    return histograms, counters
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', r'\\').replace('"', r'\"').replace('\n', r'\n') for _, v in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def exposition(histograms, counters, gauges=()):
+    """Format teks Prometheus 0.0.4."""
+    lines = []
+    for name, (description, buckets, label_names) in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+        for (series_name, labels), series in sorted(histograms.items()):
+            if series_name != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ['+Inf'], series[:-1]):
+                cumulative += count
+                le = bound if bound == '+Inf' else _number(bound)
+                lines.append(f'{name}_bucket{_labels(label_names, labels, [("le", le)])} {cumulative}')
+            lines.append(f'{name}_sum{_labels(label_names, labels)} {_number(series[-1])}')
+            lines.append(f'{name}_count{_labels(label_names, labels)} {cumulative}')
+
+    typed = set()
+    for (name, labels), value in sorted(counters.items()):
+        if name not in typed:
+            lines.append(f'# TYPE {name} counter')
+            typed.add(name)
+        lines.append(f'{name}{_labels(labels[::2], labels[1::2])} {_number(value)}')
+    for name, labels, value in gauges:
+        if name not in typed:
+            lines.append(f'# TYPE {name} gauge')
+            typed.add(name)
+        lines.append(f'{name}{_labels(labels[::2], labels[1::2])} {_number(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+class PrometheusRenderer(renderers.BaseRenderer):
+    media_type = 'text/plain'
+    format = 'prometheus'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, str):
+            return data.encode(self.charset)
+        return json.dumps(data).encode(self.charset)  # Respons error DRF
+
+
+class MetricsView(APIView):
+    """Metrik semua proses worker dalam format teks Prometheus; hanya untuk staff."""
+
+    permission_classes = [IsAdminUser]
+    renderer_classes = [PrometheusRenderer]
+
+    def get(self, request):
+        histograms, counters = collect()
+        gauges = []
+        if get_config()['TABLE_SIZES']:
+            from users.blacklist import table_sizes
+            gauges = [['melar_token_table_rows', ['table', table], rows] for table, rows in table_sizes().items()]
+        return Response(exposition(histograms, counters, gauges), content_type='text/plain; version=0.0.4; charset=utf-8')
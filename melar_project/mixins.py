@@ -0,0 +1,105 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.relations import ManyRelatedField, PrimaryKeyRelatedField, RelatedField
+
+
+class QueryPlan:
+    """Hasil analisis serializer: relasi yang di-join, di-prefetch, dan kolom untuk `only()`."""
+
+    def __init__(self):
+        self.select_related = []
+        self.prefetch_related = []
+        self.only = []
+        self.complete = True  # False jika ada field yang tidak bisa dipetakan ke kolom model
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.complete and self.only:
+            queryset = queryset.only(*self.only)
+        return queryset
+
+
+def plan_serializer(serializer, model, prefix='', plan=None):
+    """
+    Telusuri field yang dapat dibaca pada `serializer` dan susun rencana query untuk `model`.
+
+    Serializer bersarang tunggal menjadi `select_related`, serializer `many=True` dan
+    relasi many-to-many menjadi `Prefetch` dengan queryset yang juga direncanakan, dan
+    `PrimaryKeyRelatedField` cukup membaca kolom `<fk>_id` tanpa join.
+    """
+    if plan is None:
+        plan = QueryPlan()
+    plan.only.append(f'{prefix}{model._meta.pk.name}')
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        source = field.source
+        if source == '*' or '.' in source:
+            plan.complete = False
+            continue
+        try:
+            model_field = model._meta.get_field(source)
+        except FieldDoesNotExist:
+            # SerializerMethodField, properti, atau anotasi dari get_queryset
+            plan.complete = False
+            continue
+
+        path = f'{prefix}{source}'
+        if not model_field.is_relation:
+            plan.only.append(path)
+        elif isinstance(field, serializers.ListSerializer):
+            plan.prefetch_related.append(_planned_prefetch(path, field.child, model_field))
+        elif isinstance(field, ManyRelatedField):
+            plan.prefetch_related.append(path)
+        elif isinstance(field, serializers.BaseSerializer):
+            plan.select_related.append(path)
+            if model_field.concrete:
+                plan.only.append(path)
+            nested = plan_serializer(field, model_field.related_model, prefix=f'{path}__')
+            plan.select_related.extend(nested.select_related)
+            plan.prefetch_related.extend(nested.prefetch_related)
+            if nested.complete:
+                plan.only.extend(nested.only)
+            else:
+                # Model terkait dimuat utuh, kolom induk tetap dibatasi
+                plan.only = [name for name in plan.only if not name.startswith(f'{path}__')]
+        elif isinstance(field, PrimaryKeyRelatedField) and model_field.concrete:
+            plan.only.append(path)  # Cukup kolom <fk>_id
+        elif isinstance(field, RelatedField) and model_field.concrete:
+            plan.select_related.append(path)
+            plan.only.append(path)
+        else:
+            plan.complete = False
+    return plan
+
+
+def _planned_prefetch(path, child_serializer, model_field):
+    related_model = model_field.related_model
+    child_plan = plan_serializer(child_serializer, related_model)
+    if model_field.one_to_many:
+        # Prefetch reverse FK butuh kolom FK ke induk agar tidak memicu query per baris
+        child_plan.only.append(model_field.field.name)
+    return Prefetch(path, queryset=child_plan.apply(related_model._default_manager.all()))
+
+
+class QueryPlanMixin:
+    """
+    Terapkan `select_related`/`prefetch_related`/`only()` otomatis berdasarkan
+    serializer view untuk request baca (list dan retrieve).
+    """
+
+    def get_query_plan(self):
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        return plan_serializer(serializer, serializer.Meta.model)
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.request.method in SAFE_METHODS:
+            queryset = self.get_query_plan().apply(queryset)
+        return queryset
@@ -0,0 +1,194 @@
+import logging
+import os
+import re
+import sys
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from fnmatch import fnmatchcase
+
+from django.conf import settings
+from django.db import connections
+from rest_framework import fields as drf_fields
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    'ENABLED': False,    # Opt-in; biaya per query kecil, tapi tidak perlu di produksi
+    'THRESHOLD': 5,      # Template SQL yang sama dieksekusi sebanyak ini dalam satu request = N+1
+    'ACTION': 'log',     # 'log' (warning di logger melar_project.nplusone) | 'raise' (NPlusOneError)
+    'ALLOWLIST': [],     # Pola fnmatch untuk nama view, field serializer, frame asal atau template SQL
+}
+
+# Statement transaksi memang berulang (savepoint per atomic) dan bukan N+1
+TRANSACTION_SQL = ('BEGIN', 'SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK', 'COMMIT')
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+_SPACE = re.compile(r'\s+')
+
+_current = ContextVar('nplusone_detector', default=None)
+
+# Modul pembungkus query; frame-nya bukan asal N+1
+_INSTRUMENTATION = {__file__, metrics.__file__}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'NPLUSONE', {})}
+
+
+def normalize(sql):
+    """
+    Template SQL: literal string/angka jadi `%s` dan daftar `IN (%s, %s, ...)` diringkas.
+
+    Query yang hanya berbeda parameter (`WHERE product_id = 3` vs `= 4`, atau IN
+    dengan panjang berbeda) menghasilkan template yang sama.
+    """
+    sql = _STRING.sub('%s', sql)
+    sql = _NUMBER.sub('%s', sql)
+    sql = _IN_LIST.sub('(%s...)', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+class NPlusOneError(AssertionError):
+    """Dilempar pada mode 'raise'; turunan AssertionError agar terbaca sebagai kegagalan test."""
+
+
+class Offender:
+    """Satu template SQL yang melewati ambang dalam satu request."""
+
+    def __init__(self, template, view, field, frame):
+        self.template = template
+        self.view = view
+        self.field = field
+        self.frame = frame
+        self.count = 0
+
+    def __str__(self):
+        return (
+            f"N+1: {self.count}x di view {self.view or '<tanpa view>'}, "
+            f"field {self.field or '-'}, dari {self.frame or '-'}: {self.template}"
+        )
+
+
+def _origin():
+    """Field serializer terdalam yang sedang dievaluasi dan frame kode proyek terdalam di stack."""
+    field = frame_text = None
+    base_dir = str(settings.BASE_DIR) + os.sep
+    frame = sys._getframe(2)
+    while frame is not None and (field is None or frame_text is None):
+        filename = frame.f_code.co_filename
+        if field is None:
+            owner = frame.f_locals.get('self')
+            if isinstance(owner, drf_fields.Field) and owner.field_name and owner.parent is not None:
+                field = f'{type(owner.parent).__name__}.{owner.field_name}'
+        if (
+            frame_text is None and filename.startswith(base_dir) and 'site-packages' not in filename
+            and filename not in _INSTRUMENTATION
+        ):
+            frame_text = f'{os.path.relpath(filename, base_dir)}:{frame.f_lineno} in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return field, frame_text
+
+
+class Detector:
+    """
+    Hitung eksekusi per template SQL dalam satu cakupan (request atau blok test).
+
+    Saat sebuah template mencapai `threshold`, asalnya (view, field serializer,
+    frame kode proyek) dicatat sekali; inspeksi stack hanya terjadi pada saat itu.
+    """
+
+    def __init__(self, threshold=None, action=None, allowlist=None):
+        config = get_config()
+        self.threshold = threshold or config['THRESHOLD']
+        self.action = action or config['ACTION']
+        self.allowlist = list(config['ALLOWLIST'] if allowlist is None else allowlist)
+        self.view = None
+        self.counts = {}
+        self.offenders = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not many and not sql.startswith(TRANSACTION_SQL):
+            self.record(sql)
+        return execute(sql, params, many, context)
+
+    def record(self, sql):
+        template = normalize(sql)
+        count = self.counts.get(template, 0) + 1
+        self.counts[template] = count
+        offender = self.offenders.get(template)
+        if offender is not None:
+            offender.count = max(offender.count, count)
+        elif count >= self.threshold:
+            field, frame = _origin()
+            offender = Offender(template, self.view, field, frame)
+            offender.count = count
+            if self.allowed(offender):
+                return
+            self.offenders[template] = offender
+            if self.action == 'raise':
+                raise NPlusOneError(str(offender))
+
+    def allowed(self, offender):
+        names = (offender.view, offender.field, offender.frame, offender.template)
+        return any(fnmatchcase(name, pattern) for pattern in self.allowlist for name in names if name)
+
+    def report(self):
+        for offender in self.offenders.values():
+            logger.warning(str(offender))
+
+
+@contextmanager
+def detect(threshold=None, action=None, allowlist=None):
+    """
+    Deteksi N+1 di dalam blok, misalnya di test:
+
+        with nplusone.detect(action='raise'):
+            self.client.get(url)
+
+    Dengan action 'log', offender ditulis ke logger saat blok selesai dan tetap
+    bisa diperiksa lewat `detector.offenders`.
+    """
+    detector = Detector(threshold, action, allowlist)
+    token = _current.set(detector)
+    try:
+        with ExitStack() as stack:
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(detector))
+            yield detector
+    finally:
+        _current.reset(token)
+    detector.report()
+
+
+class NPlusOneMiddleware:
+    """
+    Jalankan `Detector` per request bila `NPLUSONE['ENABLED']`.
+
+    Jika blok `detect()` sudah aktif (test), middleware tidak memasang detektor
+    kedua; hitungan detektor itu dimulai ulang per request dan nama view diisi.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        detector = _current.get()
+        if detector is not None:
+            detector.counts, detector.view = {}, None
+            try:
+                return self.get_response(request)
+            finally:
+                detector.view = None
+        if not get_config()['ENABLED']:
+            return self.get_response(request)
+        with detect():
+            return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        detector = _current.get()
+        if detector is not None:
+            detector.view = metrics.view_name(view_func, request.method)
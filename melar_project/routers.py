@@ -0,0 +1,136 @@
+import random
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+DEFAULTS = {
+    'PRIMARY': 'default',
+    'REPLICAS': [],          # Alias baca; kosong = semua query ke primary
+    'STICKY_SECONDS': 5.0,   # Lama baca user dipaku ke primary setelah ia menulis (>= lag replika)
+    'CACHE_ALIAS': 'default',
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+PRIMARY, REPLICA = 'primary', 'replica'
+
+# State routing per request (aman untuk thread dan task async)
+_state = ContextVar('db_routing_state', default=None)
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'DATABASE_ROUTING', {})}
+
+
+def _pin_key(user_id):
+    return f'db:pinned:{user_id}'
+
+
+def pin_to_primary(user_id, seconds=None):
+    """Arahkan baca `user_id` ke primary selama `seconds` (default `STICKY_SECONDS`)."""
+    config = get_config()
+    seconds = config['STICKY_SECONDS'] if seconds is None else seconds
+    if seconds > 0:
+        caches[config['CACHE_ALIAS']].set(_pin_key(user_id), time.time() + seconds, seconds)
+
+
+def is_pinned(user_id):
+    config = get_config()
+    until = caches[config['CACHE_ALIAS']].get(_pin_key(user_id))
+    return until is not None and until > time.time()
+
+
+@contextmanager
+def use_database(target):
+    """Paksa baca di blok ini ke `primary` atau `replica`, di dalam maupun di luar request."""
+    state = _state.get()
+    token = _state.set({**(state or {}), 'forced': target})
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+class PrimaryReplicaRouter:
+    """
+    Tulis ke primary, baca request GET/HEAD/OPTIONS ke salah satu replika.
+
+    Baca tetap ke primary jika: di luar request (management command, task),
+    method request tidak aman, berada di dalam `transaction.atomic` pada primary,
+    user baru saja menulis (`STICKY_SECONDS`), atau view memaksa lewat atribut
+    `database_routing = 'primary'`. State request diisi `DatabaseRoutingMiddleware`.
+    """
+
+    def db_for_read(self, model, **hints):
+        config = get_config()
+        if not config['REPLICAS']:
+            return None
+        state = _state.get()
+        if state is None or self._use_primary(state, config):
+            return config['PRIMARY']
+        if state.get('replica') is None:
+            # Satu replika per request agar halaman dan agregatnya konsisten
+            state['replica'] = random.choice(config['REPLICAS'])
+        return state['replica']
+
+    def db_for_write(self, model, **hints):
+        return get_config()['PRIMARY']
+
+    def allow_relation(self, obj1, obj2, **hints):
+        config = get_config()
+        aliases = {config['PRIMARY'], *config['REPLICAS']}
+        if obj1._state.db in aliases and obj2._state.db in aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replika mengikuti primary lewat replikasi (atau sync_sqlite_replicas saat lokal)
+        return db not in get_config()['REPLICAS']
+
+    @staticmethod
+    def _use_primary(state, config):
+        forced = state.get('forced')
+        if forced is not None:
+            return forced == PRIMARY
+        request = state.get('request')
+        if request is None or request.method not in SAFE_METHODS:
+            return True
+        # Blok atomic milik TestCase diabaikan, sama seperti pengecekan `durable` Django
+        if any(not block._from_testcase for block in connections[config['PRIMARY']].atomic_blocks):
+            return True
+        user = getattr(request, 'user', None)
+        user_id = getattr(user, 'pk', None)  # Diisi DRF setelah autentikasi JWT
+        return user_id is not None and is_pinned(user_id)
+
+
+class DatabaseRoutingMiddleware:
+    """
+    Simpan request untuk `PrimaryReplicaRouter` dan paku user ke primary setelah menulis.
+
+    Override per view: atribut `database_routing` (`'primary'`/`'replica'`) pada
+    class view (viewset DRF) atau fungsi view.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _state.set({'request': request, 'forced': None, 'replica': None})
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            user_id = getattr(getattr(request, 'user', None), 'pk', None)
+            if user_id is not None:
+                pin_to_primary(user_id)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        target = getattr(getattr(view_func, 'cls', view_func), 'database_routing', None)
+        state = _state.get()
+        if target is not None and state is not None:
+            state['forced'] = target
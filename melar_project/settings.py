@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -43,14 +44,18 @@ INSTALLED_APPS = [
     'shops',
     'seller_requests',
     'rentals',
+    'melar_project',  # Check deploy proyek (melar_project.apps)
 ]
 
 MIDDLEWARE = [
+    'melar_project.metrics.MetricsMiddleware',
+    'melar_project.nplusone.NPlusOneMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'melar_project.routers.DatabaseRoutingMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -86,6 +91,37 @@ DATABASES = {
     }
 }
 
+# Replika baca. DB_REPLICAS=N menambah alias replica1..N; secara lokal berupa file
+# SQLite terpisah yang disalin dari primary dengan `manage.py sync_sqlite_replicas`.
+DB_REPLICAS = int(os.environ.get('DB_REPLICAS', '0'))
+for _index in range(1, DB_REPLICAS + 1):
+    DATABASES[f'replica{_index}'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / f'db-replica{_index}.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Mode SQLite produksi (SQLITE_PRODUCTION=1): WAL dan pragma lain di setiap koneksi,
+# transaksi tulis lewat `melar_project.sqlite.write_transaction` memakai BEGIN IMMEDIATE.
+SQLITE_MODE = {
+    'ENABLED': os.environ.get('SQLITE_PRODUCTION') == '1',
+    'BUSY_TIMEOUT_MS': 5000,
+    'WRITE_LANE_SIZE': 1,
+    'WRITE_LANE_TIMEOUT': 10,
+}
+if SQLITE_MODE['ENABLED']:
+    from melar_project.sqlite import connection_options
+    for _alias in DATABASES:
+        DATABASES[_alias]['OPTIONS'] = connection_options(SQLITE_MODE)
+
+DATABASE_ROUTERS = ['melar_project.routers.PrimaryReplicaRouter']
+
+DATABASE_ROUTING = {
+    'PRIMARY': 'default',
+    'REPLICAS': [f'replica{index}' for index in range(1, DB_REPLICAS + 1)],
+    'STICKY_SECONDS': 5,  # Baca user ke primary selama ini setelah ia menulis
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -105,6 +141,26 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Hash password baru dengan scrypt sesuai profil PASSWORD_HASHING['PROFILE']
+# (users.hashing.PROFILES). Hasher lain tetap ada untuk memverifikasi hash lama,
+# yang diperbarui ke profil aktif saat login berhasil.
+PASSWORD_HASHERS = [
+    'users.hashing.ProfileScryptPasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+PASSWORD_HASHING = {
+    'PROFILE': 'balanced',  # throughput | balanced | hardened
+    'POOL_SIZE': 0,         # > 0: verifikasi login di process pool sebanyak ini
+    'MAX_PENDING': 32,
+    'ACQUIRE_TIMEOUT': 5.0,
+}
+
+AUTHENTICATION_BACKENDS = ['users.backends.PooledHashingBackend']
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
@@ -132,8 +188,29 @@ AUTH_USER_MODEL = 'users.CustomUser'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication yang membaca role/is_staff dari claim token tanpa query user
+        'users.authentication.ClaimsJWTAuthentication',
     ),
+    # Keyset pagination di atas (created_at, id): tanpa COUNT(*), biaya per halaman konstan
+    'DEFAULT_PAGINATION_CLASS': 'melar_project.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
+}
+
+# Cache respons katalog (shops). Ganti BACKEND ke
+# 'django.core.cache.backends.filebased.FileBasedCache' dengan LOCATION direktori
+# agar cache dan versinya dibagi antar proses worker. Invalidasi bergantung pada
+# cache bersama: `manage.py check --deploy` gagal (melar.E001) selama ALIAS masih LocMem.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'melar-catalog',
+    }
+}
+
+CATALOG_CACHE = {
+    'ENABLED': True,
+    'ALIAS': 'default',
+    'TIMEOUT': 300,
 }
 
 from datetime import timedelta
@@ -143,5 +220,63 @@ SIMPLE_JWT = {
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION': True,
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.ClaimsTokenRefreshSerializer',
+}
+
+# Metrik per view (melar_project.metrics) di /api/metrics/ dan header Server-Timing.
+# Dengan beberapa proses worker, isi METRICS_DIR dengan direktori bersama yang
+# dikosongkan setiap deploy; scrape menggabungkan snapshot semua proses.
+METRICS = {
+    'ENABLED': True,
+    'SERVER_TIMING': 'staff',
+    'DIRECTORY': os.environ.get('METRICS_DIR') or None,
+    'FLUSH_INTERVAL': 5.0,
+}
+
+# Detektor N+1 (melar_project.nplusone): aktifkan dengan NPLUSONE=log atau NPLUSONE=raise.
+# Template SQL yang berulang >= THRESHOLD kali dalam satu request dilaporkan beserta
+# view, field serializer dan frame asalnya. ALLOWLIST berisi pola fnmatch.
+NPLUSONE = {
+    'ENABLED': bool(os.environ.get('NPLUSONE')),
+    'ACTION': os.environ.get('NPLUSONE') or 'log',
+    'THRESHOLD': 5,
+    'ALLOWLIST': [],
+}
+
+# Ekspor latar (rentals.exports) di /api/exports/. Dengan WORKER_THREADS=0, jalankan
+# `manage.py run_export_jobs` sebagai proses terpisah; perintah itu juga melanjutkan
+# job yang worker-nya mati. EXPORTS_DIR sebaiknya direktori bersama antar proses.
+EXPORTS = {
+    'DIRECTORY': os.environ.get('EXPORTS_DIR') or BASE_DIR / 'exports',
+    'CHUNK_SIZE': 2000,
+    'WORKER_THREADS': 1,
+    'STALE_AFTER': 300,
+}
+
+# Benchmark endpoint (`manage.py bench_endpoints`). Baseline di-commit; perbarui dengan
+# `--update-baseline` di mesin CI yang sama setelah perubahan performa yang disengaja.
+BENCHMARKS = {
+    'BASELINE': BASE_DIR / 'benchmarks' / 'baseline.json',
+    'ITERATIONS': 30,
+    'LATENCY_TOLERANCE': 0.5,
+    'QUERY_TOLERANCE': 0,
+    'BUDGETS': {},
+}
+
+# Auth berbasis claim (users.authentication). Penanda perubahan claim disimpan di
+# cache ALIAS; status per user di-cache di proses selama USER_CACHE_TTL detik.
+# ALIAS wajib cache bersama: `manage.py check --deploy` gagal (melar.E002) selama masih LocMem.
+CLAIMS_AUTH = {
+    'ALIAS': 'default',
+    'USER_CACHE_TTL': 30,
+}
+
+# Cache blacklist refresh token per proses (users.blacklist). Token yang di-blacklist
+# proses lain terlihat paling lambat SYNC_INTERVAL detik kemudian; 0 = sinkron tiap lookup.
+# Tabel token dibersihkan dengan `manage.py purge_expired_tokens`.
+TOKEN_BLACKLIST_CACHE = {
+    'ENABLED': True,
+    'SYNC_INTERVAL': 2.0,
 }
 
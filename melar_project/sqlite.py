@@ -0,0 +1,136 @@
+import threading
+from collections import deque
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+DEFAULTS = {
+    'ENABLED': False,                  # Mode produksi: pragma di bawah + jalur tulis BEGIN IMMEDIATE
+    'JOURNAL_MODE': 'WAL',             # Pembaca tidak memblokir penulis (dan sebaliknya)
+    'SYNCHRONOUS': 'NORMAL',           # Aman di WAL; fsync hanya saat checkpoint
+    'BUSY_TIMEOUT_MS': 5000,           # Tunggu lock antar proses alih-alih langsung `database is locked`
+    'MMAP_SIZE': 256 * 1024 * 1024,    # Byte file database yang dibaca lewat mmap
+    'CACHE_SIZE_KIB': 64 * 1024,       # Page cache per koneksi
+    'WRITE_LANE_SIZE': 1,              # Transaksi tulis bersamaan per proses (SQLite hanya punya satu writer)
+    'WRITE_LANE_TIMEOUT': 10.0,        # Detik menunggu giliran sebelum request ditolak sibuk
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'SQLITE_MODE', {})}
+
+
+def connection_options(mode):
+    """
+    `DATABASES[...]['OPTIONS']` untuk mode produksi, dipanggil dari settings.
+
+    Pragma dijalankan lewat `init_command` pada setiap koneksi baru.
+    """
+    config = {**DEFAULTS, **mode}
+    pragmas = [
+        f"PRAGMA journal_mode={config['JOURNAL_MODE']}",
+        f"PRAGMA synchronous={config['SYNCHRONOUS']}",
+        f"PRAGMA busy_timeout={int(config['BUSY_TIMEOUT_MS'])}",
+        f"PRAGMA mmap_size={int(config['MMAP_SIZE'])}",
+        f"PRAGMA cache_size=-{int(config['CACHE_SIZE_KIB'])}",  # Negatif = KiB, bukan jumlah page
+        "PRAGMA foreign_keys=ON",
+    ]
+    return {'init_command': ';'.join(pragmas), 'timeout': config['BUSY_TIMEOUT_MS'] / 1000}
+
+
+class WriteLaneBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Database is busy, please retry."
+    default_code = 'write_lane_busy'
+    wait = 1  # Dipakai exception handler DRF sebagai header Retry-After
+
+
+class WriteLane:
+    """
+    Semaphore FIFO: penulis mendapat giliran sesuai urutan datang.
+
+    `threading.Semaphore` tidak adil; thread yang baru melepas bisa langsung
+    mengambil lagi dan membuat penulis lain kelaparan sampai timeout.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._lock = threading.Lock()
+        self._waiters = deque()
+        self._active = 0
+
+    def acquire(self, timeout=None):
+        with self._lock:
+            if self._active < self.size and not self._waiters:
+                self._active += 1
+                return True
+            waiter = threading.Event()
+            self._waiters.append(waiter)
+        if waiter.wait(timeout):
+            return True
+        with self._lock:
+            if waiter.is_set():
+                return True  # Giliran diberikan tepat saat timeout
+            self._waiters.remove(waiter)
+            return False
+
+    def release(self):
+        with self._lock:
+            if self._waiters:
+                self._waiters.popleft().set()  # Slot langsung diwariskan ke penunggu terdepan
+            else:
+                self._active -= 1
+
+
+_lock = threading.Lock()
+_lanes = {}
+
+
+def _lane(using, size):
+    with _lock:
+        lane = _lanes.get(using)
+        if lane is None or lane.size != size:
+            lane = _lanes[using] = WriteLane(size)
+        return lane
+
+
+@contextmanager
+def write_transaction(using=DEFAULT_DB_ALIAS, serialize=False):
+    """
+    `transaction.atomic` untuk transaksi tulis.
+
+    Dalam mode produksi SQLite, transaksi terluar antre di jalur tulis per proses
+    lalu dibuka dengan `BEGIN IMMEDIATE`: kunci tulis diambil di awal sehingga
+    transaksi baca-lalu-tulis tidak gagal saat upgrade lock. Penulis dari proses
+    lain ditunggu `busy_timeout`. Jika giliran tidak didapat dalam
+    `WRITE_LANE_TIMEOUT`, `WriteLaneBusy` (503) dilempar.
+
+    `serialize=True` memakai jalur yang sama walau mode produksi mati, untuk
+    transaksi yang kebenarannya bergantung pada penguncian (checkout): SQLite
+    mengabaikan `select_for_update()`, jadi hanya kunci tulis di awal yang
+    membuat cek stok dan penulisan booking tidak bisa disela penulis lain.
+    """
+    connection = connections[using]
+    config = get_config()
+    if connection.vendor != 'sqlite' or not (config['ENABLED'] or serialize) or connection.in_atomic_block:
+        with transaction.atomic(using=using):
+            yield
+        return
+
+    lane = _lane(using, config['WRITE_LANE_SIZE'])
+    if not lane.acquire(timeout=config['WRITE_LANE_TIMEOUT']):
+        raise WriteLaneBusy()
+    try:
+        connection.ensure_connection()  # transaction_mode dibaca ulang dari OPTIONS saat connect
+        mode, connection.transaction_mode = connection.transaction_mode, 'IMMEDIATE'
+        try:
+            with transaction.atomic(using=using):
+                connection.transaction_mode = mode
+                yield
+        finally:
+            connection.transaction_mode = mode
+    finally:
+        lane.release()
@@ -0,0 +1,397 @@
+import math
+import random
+import time
+from bisect import bisect_right
+from contextlib import contextmanager
+from datetime import datetime, time as clock, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.utils import timezone
+
+# Rasio baris per user untuk `plan()`; total sekitar 11,6 baris per user
+DEFAULT_RATIOS = {
+    'shops': 0.05,          # 1 toko per 20 user
+    'products': 1.0,
+    'orders': 1.0,
+    'cart_users': 0.25,     # Porsi user yang punya keranjang (1-3 baris)
+    'discounts': 0.02,      # Per produk
+}
+CATEGORIES = 200
+WINDOW_DAYS = 730           # Rentang tanggal data (dua tahun sampai `anchor`)
+
+# Bobot musiman order per bulan: libur sekolah (Jun-Jul) dan akhir tahun paling ramai
+MONTH_WEIGHTS = {1: 0.7, 2: 0.6, 3: 0.8, 4: 1.0, 5: 1.1, 6: 1.6, 7: 1.7, 8: 1.0, 9: 0.8, 10: 0.8, 11: 0.9, 12: 1.5}
+
+FIRST_NAMES = ('Budi', 'Siti', 'Agus', 'Dewi', 'Rizky', 'Putri', 'Andi', 'Rina', 'Fajar', 'Ayu', 'Dimas', 'Nur')
+LAST_NAMES = ('Santoso', 'Wijaya', 'Saputra', 'Lestari', 'Pratama', 'Hidayat', 'Kusuma', 'Siregar', 'Nasution', 'Halim')
+PRODUCT_KINDS = ('Tenda', 'Carrier', 'Sleeping Bag', 'Kompor Portable', 'Matras', 'Headlamp', 'Flysheet', 'Trekking Pole')
+PRODUCT_TRAITS = ('Ultralight', 'Dome', 'Waterproof', '2 Orang', '4 Orang', '60L', 'Outdoor', 'Lipat')
+CITIES = ('Bandung', 'Jakarta', 'Malang', 'Yogyakarta', 'Bogor', 'Semarang', 'Denpasar', 'Medan')
+
+
+def plan(users, **overrides):
+    """Jumlah baris per tabel utama untuk `users` user; nilai lain bisa di-override."""
+    counts = {
+        'users': users,
+        'shops': max(1, int(users * DEFAULT_RATIOS['shops'])),
+        'categories': CATEGORIES,
+        'products': max(1, int(users * DEFAULT_RATIOS['products'])),
+        'orders': int(users * DEFAULT_RATIOS['orders']),
+    }
+    counts.update({key: value for key, value in overrides.items() if value is not None})
+    counts['shops'] = min(counts['shops'], counts['users'] - 1)  # User pertama adalah admin
+    counts['discounts'] = int(counts['products'] * DEFAULT_RATIOS['discounts'])
+    return counts
+
+
+@contextmanager
+def muted_signals():
+    """Matikan receiver sinyal model (cache katalog, claim user) selama load massal."""
+    signals = (pre_save, post_save, pre_delete, post_delete, m2m_changed)
+    saved = [signal.receivers for signal in signals]
+    try:
+        for signal in signals:
+            signal.receivers = []
+            signal.sender_receivers_cache.clear()
+        yield
+    finally:
+        for signal, receivers in zip(signals, saved):
+            signal.receivers = receivers
+            signal.sender_receivers_cache.clear()
+
+
+@contextmanager
+def explicit_timestamps(*models):
+    """Matikan `auto_now`/`auto_now_add` agar created_at/updated_at sintetis tidak ditimpa waktu sekarang."""
+    fields = [
+        (field, field.auto_now, field.auto_now_add)
+        for model in models for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)
+    ]
+    try:
+        for field, _, _ in fields:
+            field.auto_now = field.auto_now_add = False
+        yield
+    finally:
+        for field, auto_now, auto_now_add in fields:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+@contextmanager
+def fast_sqlite_load():
+    """`synchronous=OFF` selama load di SQLite; dikembalikan seperti semula setelahnya."""
+    if connection.vendor != 'sqlite' or connection.in_atomic_block:  # Pragma ini ditolak di dalam transaksi
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA synchronous')
+        synchronous = cursor.fetchone()[0]
+        cursor.execute('PRAGMA synchronous=OFF')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA synchronous={int(synchronous)}')
+
+
+def _unit(index, salt):
+    """Bilangan semu [0, 1) dari `index` tanpa state: harga dan stok bisa dihitung ulang di mana saja."""
+    value = (index * 2654435761 + salt * 40503) & 0xFFFFFFFF
+    value ^= value >> 16
+    value = (value * 0x45D9F3B) & 0xFFFFFFFF
+    value ^= value >> 16
+    return value / 2 ** 32
+
+
+class Generator:
+    """
+    Generator data sintetis berskala besar untuk skema marketplace.
+
+    Deterministik untuk `seed`, jumlah baris dan `anchor` yang sama. Setiap tabel
+    memakai RNG sendiri (`seed:tabel`) dan id eksplisit setelah id terbesar yang ada,
+    sehingga FK dapat dihitung tanpa membaca balik baris yang baru ditulis. Baris
+    dibangun dan ditulis per `chunk_size` dengan `bulk_create` dalam transaksinya
+    sendiri; memori yang tetap hanya sebanding dengan jumlah toko.
+
+    Distribusi miring: ukuran toko mengikuti Zipf (power seller), produk di keranjang
+    dan order dipilih dengan popularitas power-law, pembeli aktif lebih sering order,
+    dan tanggal sewa mengikuti `MONTH_WEIGHTS`.
+    """
+
+    PASSWORD = 'Synthetic-password-123'
+
+    def __init__(self, counts, seed=1, chunk_size=20000, anchor=None, stdout=None):
+        self.counts = counts
+        self.seed = seed
+        self.chunk_size = chunk_size
+        self.anchor = anchor or timezone.localdate()
+        self.stdout = stdout
+        self.created = {}
+        self.prefix = f'syn{seed}'
+
+    def rng(self, table):
+        return random.Random(f'{self.seed}:{table}')
+
+    def log(self, message):
+        if self.stdout is not None:
+            self.stdout.write(message)
+
+    def run(self):
+        from shops.models import Category, Discount, Inventory, Product, Shop
+        from shops.search import rebuild_index, suspended_triggers
+        from shops.importing import invalidate_products
+        from shops import pricing
+        from rentals.models import Booking, Cart, Order, OrderItem, Shipping
+        from users.models import CustomUser
+
+        models = (CustomUser, Shop, Category, Product, Inventory, Discount, Cart, Order, OrderItem, Booking, Shipping)
+        self.base = {model: model.objects.aggregate(last=Max('pk'))['last'] or 0 for model in models}
+        self.base[Product.categories.through] = Product.categories.through.objects.aggregate(last=Max('pk'))['last'] or 0
+        if CustomUser.objects.filter(email=self._email(0)).exists():
+            raise ValueError(f"Data sintetis untuk seed {self.seed} sudah ada.")
+
+        self._prepare()
+        start = time.perf_counter()
+        with muted_signals(), explicit_timestamps(*models), suspended_triggers(), fast_sqlite_load():
+            self._write(CustomUser, self._users())
+            self._write(Shop, self._shops())
+            self._write(Category, self._categories())
+            self._write(Product, self._products())
+            self._write(Product.categories.through, self._product_categories(), label='product_categories')
+            self._write(Inventory, self._inventories())
+            self._write(Discount, self._discounts())
+            self._write(Cart, self._carts())
+            self._write_orders(Order, OrderItem, Booking, Shipping)
+
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), models):
+                cursor.execute(sql)  # Sequence PostgreSQL tertinggal karena id eksplisit
+        self.log("Membangun ulang indeks pencarian produk...")
+        rebuild_index()
+        invalidate_products()
+        pricing.invalidate()
+        self.elapsed = time.perf_counter() - start
+        return self.created
+
+    # Persiapan: struktur kecil yang dipakai bersama oleh beberapa tabel
+
+    def _prepare(self):
+        counts = self.counts
+        # Zipf s=1.1 untuk ukuran toko; batas kumulatif memetakan indeks produk ke toko
+        weights = [1 / (rank + 1) ** 1.1 for rank in range(counts['shops'])]
+        total = sum(weights)
+        self.shop_bounds = [round(counts['products'] * cumulative / total) for cumulative in accumulate(weights)]
+        # Langkah koprima: produk populer tersebar ke banyak toko, bukan menumpuk di toko pertama
+        self.stride = next(
+            step for step in (7919, 104729, 1299709, 15485863, 1)
+            if math.gcd(step, counts['products']) == 1
+        )
+        start = self.anchor - timedelta(days=WINDOW_DAYS)
+        self.days = [start + timedelta(days=offset) for offset in range(WINDOW_DAYS + 60)]  # + order mendatang
+        self.day_weights = list(accumulate(MONTH_WEIGHTS[day.month] for day in self.days))
+        self.password = make_password(self.PASSWORD)  # Satu hash untuk semua user non-admin
+        self.admin_password = make_password(None)  # Admin sintetis tidak bisa login dengan password yang diketahui
+
+    def _email(self, index):
+        return f'{self.prefix}-u{index}@example.com'
+
+    def _moment(self, index, count):
+        """created_at naik seiring id dalam jendela data, seperti data yang tumbuh alami."""
+        offset = (index + _unit(index, 7)) / max(count, 1) * WINDOW_DAYS
+        start = datetime.combine(self.anchor - timedelta(days=WINDOW_DAYS), clock(), tzinfo=timezone.get_current_timezone())
+        return start + timedelta(days=offset)
+
+    def _product_of_shop(self, index):
+        return bisect_right(self.shop_bounds, index)
+
+    def _popular_product(self, rng):
+        """Indeks produk dengan popularitas power-law: ~20% produk menerima sebagian besar sewa."""
+        rank = int(self.counts['products'] * rng.random() ** 3)
+        return rank * self.stride % self.counts['products']
+
+    def _price(self, index):
+        # Log-uniform 15rb-1,5jt, dibulatkan ke 500 rupiah
+        return Decimal(round(15000 * 100 ** _unit(index, 1) / 500) * 500)
+
+    # Baris per tabel; setiap generator menghasilkan instance model satu per satu
+
+    def _users(self):
+        from users.models import CustomUser
+        rng, base, count = self.rng('users'), self.base[CustomUser], self.counts['users']
+        sellers = self.counts['shops']
+        for index in range(count):
+            moment = self._moment(index, count)
+            yield CustomUser(
+                id=base + index + 1, email=self._email(index), username=f'{self.prefix}-u{index}',
+                full_name=f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}',
+                password=self.admin_password if index == 0 else self.password,
+                role='admin' if index == 0 else 'user', is_staff=index == 0, is_seller=1 <= index <= sellers,
+                created_at=moment, updated_at=moment,
+            )
+
+    def _shops(self):
+        from shops.models import Shop
+        from users.models import CustomUser
+        rng, base, count = self.rng('shops'), self.base[Shop], self.counts['shops']
+        for index in range(count):
+            moment = self._moment(index, count)
+            city = rng.choice(CITIES)
+            yield Shop(
+                id=base + index + 1, user_id=self.base[CustomUser] + index + 2,  # Seller: user 1..shops
+                shop_name=f'{city} Adventure {self.prefix}-{index}', description=f'Sewa alat outdoor di {city}',
+                is_active=rng.random() > 0.05, address=f'Jl. Sintetis No. {index + 1}, {city}',
+                postal_code=f'{40000 + index % 60000}', contact=f'08{rng.randrange(10 ** 9, 10 ** 10)}',
+                created_at=moment, updated_at=moment,
+            )
+
+    def _categories(self):
+        from shops.models import Category
+        base = self.base[Category]
+        for index in range(self.counts['categories']):
+            moment = self._moment(index, self.counts['categories'])
+            kind = PRODUCT_KINDS[index % len(PRODUCT_KINDS)]
+            yield Category(
+                id=base + index + 1, name=f'{kind} {self.prefix}-{index}', description=f'Kategori {kind.lower()}',
+                created_at=moment, updated_at=moment,
+            )
+
+    def _products(self):
+        from shops.models import Product, Shop
+        rng, base, count = self.rng('products'), self.base[Product], self.counts['products']
+        statuses, status_weights = ('approved', 'pending', 'blocked'), (85, 12, 3)
+        availability, availability_weights = ('available', 'rented', 'unavailable'), (70, 25, 5)
+        for index in range(count):
+            moment = self._moment(index, count)
+            kind, trait = rng.choice(PRODUCT_KINDS), rng.choice(PRODUCT_TRAITS)
+            yield Product(
+                id=base + index + 1, shop_id=self.base[Shop] + self._product_of_shop(index) + 1,
+                name=f'{kind} {trait} {index}', description=f'{kind} {trait.lower()} siap sewa, kondisi terawat',
+                price=self._price(index), status=rng.choices(statuses, status_weights)[0],
+                availability_status=rng.choices(availability, availability_weights)[0],
+                created_at=moment, updated_at=moment,
+            )
+
+    def _product_categories(self):
+        from shops.models import Category, Product
+        through = Product.categories.through
+        rng, base = self.rng('product_categories'), self.base[through]
+        # Kategori juga Zipf: beberapa kategori memuat sebagian besar produk
+        weights = list(accumulate(1 / (rank + 1) for rank in range(self.counts['categories'])))
+        row_id = base
+        for index in range(self.counts['products']):
+            picked = set(rng.choices(range(self.counts['categories']), cum_weights=weights, k=rng.randint(1, 3)))
+            for category in sorted(picked):
+                row_id += 1
+                yield through(id=row_id, product_id=self.base[Product] + index + 1, category_id=self.base[Category] + category + 1)
+
+    def _inventories(self):
+        from shops.models import Inventory, Product
+        base = self.base[Inventory]
+        for index in range(self.counts['products']):
+            moment = self._moment(index, self.counts['products'])
+            yield Inventory(
+                id=base + index + 1, product_id=self.base[Product] + index + 1,
+                quantity=1 + int(_unit(index, 2) * 10), created_at=moment, updated_at=moment,
+            )
+
+    def _discounts(self):
+        from shops.models import Category, Discount, Product
+        from users.models import CustomUser
+        rng, base, count = self.rng('discounts'), self.base[Discount], self.counts['discounts']
+        for index in range(count):
+            valid_from = rng.choices(self.days, cum_weights=self.day_weights)[0]  # Promo mengikuti musim ramai
+            moment = self._moment(index, count)
+            scoped_to_product = index % 2 == 0
+            yield Discount(
+                id=base + index + 1, code=f'{self.prefix.upper()}-{index}', percentage=Decimal(5 * rng.randint(1, 10)),
+                valid_from=valid_from, valid_until=valid_from + timedelta(days=rng.choice((7, 14, 30))),
+                product_id=self.base[Product] + self._popular_product(rng) + 1 if scoped_to_product else None,
+                category_id=None if scoped_to_product else self.base[Category] + rng.randrange(self.counts['categories']) + 1,
+                admin_id=self.base[CustomUser] + 1, created_at=moment, updated_at=moment,
+            )
+
+    def _carts(self):
+        from rentals.models import Cart
+        from shops.models import Product
+        from users.models import CustomUser
+        rng, row_id = self.rng('carts'), self.base[Cart]
+        for user in range(1, self.counts['users']):
+            if rng.random() >= DEFAULT_RATIOS['cart_users']:
+                continue
+            products = {self._popular_product(rng) for _ in range(rng.randint(1, 3))}  # Unik per user
+            for product in sorted(products):
+                quantity = rng.randint(1, 2)
+                row_id += 1
+                yield Cart(
+                    id=row_id, user_id=self.base[CustomUser] + user + 1, product_id=self.base[Product] + product + 1,
+                    quantity=quantity, total_price=self._price(product) * quantity,
+                )
+
+    def _write_orders(self, Order, OrderItem, Booking, Shipping):
+        """Order beserta baris, booking dan shipping-nya ditulis bersama per chunk."""
+        from shops.models import Product
+        from users.models import CustomUser
+        rng, count = self.rng('orders'), self.counts['orders']
+        ids = {model: self.base[model] for model in (OrderItem, Booking)}
+        for low in range(0, count, self.chunk_size):
+            orders, items, bookings, shippings = [], [], [], []
+            for index in range(low, min(low + self.chunk_size, count)):
+                order_id = self.base[Order] + index + 1
+                user = 1 + int((self.counts['users'] - 1) * rng.random() ** 2)  # Pembeli aktif lebih sering order
+                borrow = rng.choices(self.days, cum_weights=self.day_weights)[0]
+                deadline = borrow + timedelta(days=rng.choice((1, 2, 3, 3, 4, 7)))
+                if deadline < self.anchor:
+                    status = 'completed' if rng.random() < 0.9 else 'returning'
+                elif borrow <= self.anchor:
+                    status = 'borrowed'
+                else:
+                    status = rng.choice(('pending', 'approved'))
+                total = Decimal(0)
+                for product in {self._popular_product(rng) for _ in range(rng.randint(1, 3))}:
+                    quantity = rng.randint(1, 2)
+                    price = self._price(product)
+                    total += price * quantity
+                    ids[OrderItem] += 1
+                    ids[Booking] += 1
+                    items.append(OrderItem(
+                        id=ids[OrderItem], order_id=order_id, product_id=self.base[Product] + product + 1,
+                        quantity=quantity, price=price, total_price=price * quantity,
+                    ))
+                    bookings.append(Booking(
+                        id=ids[Booking], order_id=order_id, product_id=self.base[Product] + product + 1,
+                        quantity=quantity, start_date=borrow, end_date=deadline, is_active=status != 'completed',
+                    ))
+                moment = datetime.combine(borrow - timedelta(days=rng.randint(1, 14)), clock(12), tzinfo=timezone.get_current_timezone())
+                orders.append(Order(
+                    id=order_id, user_id=self.base[CustomUser] + user + 1, total_price=total, borrow_date=borrow,
+                    return_deadline=deadline, status=status, created_at=moment, updated_at=moment,
+                ))
+                shippings.append(Shipping(
+                    id=self.base[Shipping] + index + 1, order_id=order_id, address=f'Jl. Penyewa No. {user}',
+                    postal_code=f'{10000 + user % 90000}', phone_number=f'08{rng.randrange(10 ** 9, 10 ** 10)}',
+                    user_name=f'Penyewa {user}',
+                ))
+            with transaction.atomic():
+                for model, rows in ((Order, orders), (OrderItem, items), (Booking, bookings), (Shipping, shippings)):
+                    model.objects.bulk_create(rows)
+                    self.created[model._meta.model_name] = self.created.get(model._meta.model_name, 0) + len(rows)
+            self.log(f"order: {min(low + self.chunk_size, count)}/{count}")
+
+    def _write(self, model, rows, label=None):
+        label = label or model._meta.model_name
+        written = 0
+        while True:
+            chunk = [row for _, row in zip(range(self.chunk_size), rows)]
+            if not chunk:
+                break
+            with transaction.atomic():
+                model.objects.bulk_create(chunk)
+            written += len(chunk)
+            self.log(f"{label}: {written}")
+        self.created[label] = written
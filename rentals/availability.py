@@ -0,0 +1,87 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from shops.models import Inventory
+from .models import Booking
+
+
+def overlapping_bookings(product_ids, start, end):
+    """
+    Booking aktif yang beririsan dengan [start, end] (inklusif), dikelompokkan per produk.
+
+    Filter `end_date >= start` dipasang pertama agar `booking_overlap_idx`
+    melewati seluruh riwayat booking yang sudah selesai.
+    """
+    rows = (
+        Booking.objects.filter(
+            is_active=True,
+            product_id__in=product_ids,
+            end_date__gte=start,
+            start_date__lte=end,
+        )
+        .values_list('product_id', 'start_date', 'end_date', 'quantity')
+    )
+    grouped = defaultdict(list)
+    for product_id, booking_start, booking_end, quantity in rows:
+        grouped[product_id].append((booking_start, booking_end, quantity))
+    return grouped
+
+
+# Produk tanpa baris Inventory dianggap satu unit fisik, bukan stok tak terbatas
+DEFAULT_CAPACITY = 1
+
+
+def capacities(product_ids):
+    """Kapasitas sewa per produk dari Inventory; produk tanpa Inventory berkapasitas `DEFAULT_CAPACITY`."""
+    stock = dict(
+        Inventory.objects.filter(product_id__in=product_ids).values_list('product_id', 'quantity')
+    )
+    return {product_id: stock.get(product_id, DEFAULT_CAPACITY) for product_id in product_ids}
+
+
+def load_segments(bookings, start, end):
+    """Sweep-line: potong [start, end] menjadi segmen berurutan `(from, to, jumlah_tersewa)`."""
+    deltas = defaultdict(int)
+    for booking_start, booking_end, quantity in bookings:
+        deltas[max(booking_start, start)] += quantity
+        deltas[min(booking_end, end) + timedelta(days=1)] -= quantity
+
+    segments = []
+    load = 0
+    cursor = start
+    for day in sorted(deltas):
+        if day > cursor:
+            segments.append((cursor, day - timedelta(days=1), load))
+            cursor = day
+        load += deltas[day]
+    if cursor <= end:
+        segments.append((cursor, end, load))
+    return segments
+
+
+def peak_load(bookings, start, end):
+    """Jumlah unit tersewa tertinggi pada hari mana pun di [start, end]."""
+    return max((load for _, _, load in load_segments(bookings, start, end)), default=0)
+
+
+def availability(product_ids, start, end):
+    """
+    Rentang bebas dan sibuk per produk pada jendela [start, end].
+
+    Sebuah hari sibuk jika unit tersewa sudah mencapai kapasitas Inventory.
+    Total dua query berapa pun jumlah produk dan riwayat order.
+    """
+    bookings = overlapping_bookings(product_ids, start, end)
+    capacity = capacities(product_ids)
+    result = {}
+    for product_id in product_ids:
+        free, busy = [], []
+        for segment_start, segment_end, load in load_segments(bookings[product_id], start, end):
+            full = load >= capacity[product_id]
+            ranges = busy if full else free
+            if ranges and ranges[-1]['end'] == segment_start - timedelta(days=1):
+                ranges[-1]['end'] = segment_end  # Gabungkan segmen yang bersambung
+            else:
+                ranges.append({'start': segment_start, 'end': segment_end})
+        result[product_id] = {'capacity': capacity[product_id], 'free': free, 'busy': busy}
+    return result
@@ -0,0 +1,97 @@
+from django.db import connection
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import Coalesce
+from melar_project.sqlite import write_transaction
+from shops.models import Product
+from .models import Cart
+
+MODE_ADD = 'add'  # Quantity ditambahkan ke baris yang sudah ada
+MODE_SET = 'set'  # Quantity menggantikan baris yang sudah ada; 0 menghapus baris
+
+
+def merge_lines(lines, mode=MODE_ADD):
+    """Gabungkan baris dengan produk yang sama agar satu statement upsert tidak menyentuh baris dua kali."""
+    merged = {}
+    for product_id, quantity in lines:
+        if mode == MODE_ADD:
+            merged[product_id] = merged.get(product_id, 0) + quantity
+        else:
+            merged[product_id] = quantity
+    return merged
+
+
+def upsert_lines(user, lines, mode=MODE_ADD):
+    """
+    Tambah atau ubah banyak baris keranjang `user` sekaligus.
+
+    `lines` berisi `(product_id, quantity)` untuk produk yang sudah divalidasi.
+    Semua baris ditulis dengan satu `INSERT ... ON CONFLICT DO UPDATE`, dan
+    `total_price` dihitung di statement yang sama dari join ke harga produk.
+    """
+    merged = merge_lines(lines, mode)
+    removed = [product_id for product_id, quantity in merged.items() if quantity == 0]
+    rows = [(product_id, quantity) for product_id, quantity in merged.items() if quantity > 0]
+    with write_transaction():
+        if removed:
+            Cart.objects.filter(user=user, product_id__in=removed).delete()
+        if not rows:
+            return
+        if connection.vendor in ('sqlite', 'postgresql'):
+            _upsert_sql(user, rows, mode)
+        else:
+            _upsert_orm(user, rows, mode)
+
+
+def _upsert_sql(user, rows, mode):
+    qn = connection.ops.quote_name
+    cart, product = qn(Cart._meta.db_table), qn(Product._meta.db_table)
+    quantity = f'{cart}.quantity + excluded.quantity' if mode == MODE_ADD else 'excluded.quantity'
+    values = ', '.join(['(%s, %s)'] * len(rows))
+    # WHERE pada SELECT wajib di SQLite agar ON CONFLICT tidak dibaca sebagai klausa join
+    sql = f"""
+        WITH lines(product_id, quantity) AS (VALUES {values})
+        INSERT INTO {cart} (user_id, product_id, quantity, total_price)
+        SELECT %s, p.id, lines.quantity, p.price * lines.quantity
+        FROM lines JOIN {product} p ON p.id = lines.product_id
+        WHERE true
+        ON CONFLICT (user_id, product_id) DO UPDATE SET
+            quantity = {quantity},
+            total_price = (SELECT price FROM {product} WHERE id = excluded.product_id) * ({quantity})
+    """
+    params = [value for row in rows for value in row] + [user.pk]
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def _upsert_orm(user, rows, mode):
+    prices = dict(Product.objects.filter(id__in=[product_id for product_id, _ in rows]).values_list('id', 'price'))
+    existing = {
+        line.product_id: line
+        for line in Cart.objects.select_for_update().filter(user=user, product_id__in=prices)
+    }
+    created, updated = [], []
+    for product_id, quantity in rows:
+        if product_id not in prices:
+            continue
+        line = existing.get(product_id)
+        if line is None:
+            created.append(Cart(user=user, product_id=product_id, quantity=quantity, total_price=prices[product_id] * quantity))
+            continue
+        line.quantity = line.quantity + quantity if mode == MODE_ADD else quantity
+        line.total_price = prices[product_id] * line.quantity
+        updated.append(line)
+    Cart.objects.bulk_create(created)
+    Cart.objects.bulk_update(updated, ['quantity', 'total_price'])
+
+
+def cart_summary(user):
+    """Jumlah baris, jumlah item dan total harga keranjang terkini dalam satu agregat."""
+    return Cart.objects.filter(user=user).aggregate(
+        lines=Count('id'),
+        items=Coalesce(Sum('quantity'), 0),
+        total_price=Coalesce(
+            Sum(F('product__price') * F('quantity'), output_field=DecimalField(max_digits=12, decimal_places=2)),
+            0,
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+    )
@@ -0,0 +1,83 @@
+from melar_project.sqlite import write_transaction
+from shops.models import Inventory, Product
+from shops.pricing import price_lines, product_categories
+from .availability import DEFAULT_CAPACITY, overlapping_bookings, peak_load
+from .models import Booking, Cart, Order, OrderItem
+
+
+class CheckoutError(Exception):
+    """Checkout ditolak; pesan dikembalikan ke klien sebagai `detail`."""
+
+
+def checkout_cart(user, borrow_date, return_deadline):
+    """
+    Ubah isi keranjang `user` menjadi satu Order dalam satu transaksi.
+
+    Jumlah query konstan berapa pun banyaknya baris keranjang: baris keranjang,
+    produk dan stok inventaris dikunci (di SQLite lewat kunci tulis di awal
+    transaksi, di backend lain dengan `select_for_update`), booking yang beririsan
+    dicek terhadap kapasitas, diskon terbaik per produk pada `borrow_date` diresolusi di memori,
+    order, barisnya dan booking ditulis secara bulk, lalu keranjang dihapus sekaligus.
+    """
+    with write_transaction(serialize=True):
+        cart = Cart.objects.filter(user=user)
+        lines = list(cart.select_for_update().values('product_id', 'quantity'))
+        if not lines:
+            raise CheckoutError("Cart is empty")
+
+        product_ids = {line['product_id'] for line in lines}
+        prices = dict(
+            Product.objects.select_for_update()
+            .filter(id__in=product_ids)
+            .values_list('id', 'price')
+        )
+        requested = {}
+        for line in lines:
+            requested[line['product_id']] = requested.get(line['product_id'], 0) + line['quantity']
+        stock = dict(
+            Inventory.objects.select_for_update()
+            .filter(product_id__in=product_ids)
+            .values_list('product_id', 'quantity')
+        )
+        # Cek overlap memakai indeks booking yang sama dengan kalender ketersediaan
+        bookings = overlapping_bookings(list(product_ids), borrow_date, return_deadline)
+        for product_id, quantity in requested.items():
+            capacity = stock.get(product_id, DEFAULT_CAPACITY)
+            if peak_load(bookings[product_id], borrow_date, return_deadline) + quantity > capacity:
+                raise CheckoutError(f"Product {product_id} is not available for the requested dates")
+
+        # Harga sudah dikunci di atas; diskon dihitung dari harga yang sama
+        quotes = price_lines(
+            [(line['product_id'], line['quantity'], borrow_date) for line in lines],
+            prices,
+            product_categories(product_ids),
+        )
+
+        order = Order.objects.create(
+            user=user,
+            total_price=sum(quote['total_price'] for quote in quotes),
+            borrow_date=borrow_date,
+            return_deadline=return_deadline,
+        )
+        OrderItem.objects.bulk_create([
+            OrderItem(
+                order=order,
+                product_id=quote['product'],
+                quantity=quote['quantity'],
+                price=quote['unit_price'],
+                total_price=quote['total_price'],
+            )
+            for quote in quotes
+        ])
+        Booking.objects.bulk_create([
+            Booking(
+                product_id=product_id,
+                order=order,
+                quantity=quantity,
+                start_date=borrow_date,
+                end_date=return_deadline,
+            )
+            for product_id, quantity in requested.items()
+        ])
+        cart.delete()
+    return order
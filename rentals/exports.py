@@ -0,0 +1,253 @@
+import csv
+import fcntl
+import gzip
+import io
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import ExportJob, Order, OrderItem
+
+DEFAULTS = {
+    'DIRECTORY': None,       # None = <BASE_DIR>/exports
+    'CHUNK_SIZE': 2000,      # Baris per fetch iterator dan per checkpoint
+    'WORKER_THREADS': 1,     # Thread ekspor per proses web; 0 = hanya `manage.py run_export_jobs`
+    'STALE_AFTER': 300,      # Detik tanpa heartbeat sebelum job running diambil alih worker lain
+    'MAX_ACTIVE_PER_USER': 3,
+}
+
+CONTENT_TYPES = {'csv': 'text/csv', 'jsonl': 'application/x-ndjson'}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'EXPORTS', {})}
+
+
+def _orders():
+    items = (
+        OrderItem.objects.filter(order_id=OuterRef('pk')).order_by()
+        .values('order_id').annotate(total=Count('*')).values('total')
+    )
+    return Order.objects.annotate(item_count=Coalesce(Subquery(items, output_field=IntegerField()), 0))
+
+
+def _products():
+    from shops.models import Product
+    return Product.objects.all()
+
+
+def _users():
+    from django.contrib.auth import get_user_model
+    return get_user_model().objects.all()
+
+
+# jenis -> (queryset, [(header, lookup)]). Kolom diambil dengan values_list dan join datar,
+# bukan serializer bersarang: satu query per chunk berapa pun jumlah relasinya.
+EXPORTS = {
+    'orders': (_orders, [
+        ('id', 'id'), ('user_id', 'user_id'), ('user_email', 'user__email'), ('status', 'status'),
+        ('borrow_date', 'borrow_date'), ('return_deadline', 'return_deadline'), ('total_price', 'total_price'),
+        ('item_count', 'item_count'), ('shipping_name', 'shipping__user_name'),
+        ('shipping_address', 'shipping__address'), ('shipping_postal_code', 'shipping__postal_code'),
+        ('shipping_phone', 'shipping__phone_number'), ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ]),
+    'products': (_products, [
+        ('id', 'id'), ('shop_id', 'shop_id'), ('shop_name', 'shop__shop_name'), ('name', 'name'),
+        ('price', 'price'), ('status', 'status'), ('availability_status', 'availability_status'),
+        ('stock', 'inventory__quantity'), ('created_at', 'created_at'), ('updated_at', 'updated_at'),
+    ]),
+    'users': (_users, [
+        ('id', 'id'), ('email', 'email'), ('username', 'username'), ('full_name', 'full_name'),
+        ('role', 'role'), ('is_seller', 'is_seller'), ('is_active', 'is_active'), ('is_staff', 'is_staff'),
+        ('created_at', 'created_at'),
+    ]),
+}
+
+
+def directory():
+    return str(get_config()['DIRECTORY'] or os.path.join(settings.BASE_DIR, 'exports'))
+
+
+def file_path(job):
+    return os.path.join(directory(), f'export-{job.pk}.{job.format}.gz')
+
+
+def file_name(job):
+    return f'{job.kind}-{job.pk}.{job.format}.gz'
+
+
+def _cell(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    return value
+
+
+def _encode(fmt, headers, rows):
+    if fmt == 'jsonl':
+        return ''.join(json.dumps(dict(zip(headers, map(_cell, row)))) + '\n' for row in rows).encode()
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows([_cell(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def _write_member(file, data):
+    """Tulis `data` sebagai satu member gzip; member yang utuh tetap bisa dibaca meski proses mati setelahnya."""
+    with gzip.GzipFile(fileobj=file, mode='wb', mtime=0) as member:
+        member.write(data)
+    file.flush()
+    os.fsync(file.fileno())
+    return file.tell()
+
+
+class JobLost(Exception):
+    """Job sudah diklaim ulang worker lain; worker lama berhenti tanpa menyentuh status job."""
+
+
+def export(job, owner):
+    """
+    Tulis file ekspor untuk `job` mulai dari checkpoint-nya.
+
+    Queryset dibaca dengan `iterator(chunk_size=...)` berurutan menurut id. Setiap
+    `CHUNK_SIZE` baris ditulis sebagai member gzip tersendiri lalu checkpoint
+    (`last_id`, `rows`, `size`) disimpan. Saat dilanjutkan, file dipotong ke `size`
+    sehingga member setengah jadi dari percobaan sebelumnya dibuang, dan baris
+    setelah `last_id` ditulis ulang. Hasil akhirnya satu file gzip multi-member
+    yang dibaca utuh oleh `gzip`/`zcat` biasa.
+
+    Setiap update progres difilter dengan token `owner` dari `claim()`. Jika job
+    sudah diambil alih (0 baris cocok), `JobLost` dilempar. Kunci `flock` pada
+    file membuat pemilik baru menunggu sampai worker lama yang masih hidup
+    berhenti, sehingga keduanya tidak pernah menulis file yang sama bersamaan.
+    """
+    config = get_config()
+    queryset, columns = EXPORTS[job.kind]
+    headers = [header for header, _ in columns]
+    lookups = [lookup for _, lookup in columns]
+    path = file_path(job)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def save(**fields):
+        if not ExportJob.objects.filter(pk=job.pk, owner=owner).update(heartbeat_at=timezone.now(), **fields):
+            raise JobLost(job.pk)
+
+    if job.total is None:
+        job.total = queryset().count()
+        save(total=job.total)
+    # Dibuka tanpa memotong: isi file baru boleh diubah setelah kuncinya didapat
+    with open(os.open(path, os.O_RDWR | os.O_CREAT, 0o644), 'r+b') as file:
+        fcntl.flock(file, fcntl.LOCK_EX)
+        # Checkpoint dibaca ulang setelah worker lama (jika ada) melepas kunci
+        progress = ExportJob.objects.filter(pk=job.pk, owner=owner).values('rows', 'last_id', 'size').first()
+        if progress is None:
+            raise JobLost(job.pk)
+        job.rows, job.last_id, job.size = progress['rows'], progress['last_id'], progress['size']
+        resume = 0 < job.size <= os.fstat(file.fileno()).st_size
+        if resume:
+            file.truncate(job.size)
+            file.seek(job.size)
+        else:
+            file.truncate(0)
+            job.size, job.rows, job.last_id = 0, 0, 0
+            if job.format == 'csv':
+                job.size = _write_member(file, _encode('csv', headers, [headers]))
+
+        def checkpoint(chunk):
+            job.size = _write_member(file, _encode(job.format, headers, chunk))
+            job.rows += len(chunk)
+            job.last_id = chunk[-1][0]  # Kolom pertama setiap ekspor adalah id
+            save(rows=job.rows, last_id=job.last_id, size=job.size)
+
+        rows = queryset().filter(pk__gt=job.last_id).order_by('pk').values_list(*lookups)
+        chunk = []
+        for row in rows.iterator(chunk_size=config['CHUNK_SIZE']):
+            chunk.append(row)
+            if len(chunk) >= config['CHUNK_SIZE']:
+                checkpoint(chunk)
+                chunk = []
+        if chunk:
+            checkpoint(chunk)
+    return job
+
+
+def _claimable():
+    """Job pending, atau running yang heartbeat-nya sudah basi (worker-nya mati)."""
+    stale = timezone.now() - timedelta(seconds=get_config()['STALE_AFTER'])
+    return Q(status='pending') | Q(status='running', heartbeat_at__lt=stale)
+
+
+def claim(job_id):
+    """
+    Ambil job secara atomik; hanya satu worker yang berhasil untuk job yang sama.
+
+    Kembalikan token pemilik baru, atau None jika job tidak bisa diklaim. Klaim
+    atas job basi mengganti token sehingga tulisan worker lama ditolak.
+    """
+    owner = uuid.uuid4().hex
+    claimed = ExportJob.objects.filter(_claimable(), pk=job_id).update(
+        status='running', heartbeat_at=timezone.now(), owner=owner,
+    )
+    return owner if claimed else None
+
+
+def run_job(job_id):
+    """Jalankan satu job bila berhasil diklaim; True jika job ini yang menyelesaikannya."""
+    owner = claim(job_id)
+    if owner is None:
+        return False
+    job = ExportJob.objects.get(pk=job_id)
+    try:
+        export(job, owner)
+    except JobLost:
+        return False  # Status job kini milik worker yang mengambil alih
+    except Exception as e:
+        ExportJob.objects.filter(pk=job_id, owner=owner).update(status='failed', error=str(e), heartbeat_at=None)
+        raise
+    return bool(ExportJob.objects.filter(pk=job_id, owner=owner).update(
+        status='completed', finished_at=timezone.now(), heartbeat_at=None,
+    ))
+
+
+def claimable_ids():
+    return list(ExportJob.objects.filter(_claimable()).order_by('created_at', 'id').values_list('id', flat=True))
+
+
+_lock = threading.Lock()
+_executor = None
+
+
+def _run_in_thread(job_id):
+    try:
+        run_job(job_id)
+    except Exception:
+        pass  # Sudah dicatat di job sebagai failed
+    finally:
+        connection.close()  # Koneksi milik thread worker
+
+
+def enqueue(job):
+    """
+    Jadwalkan job setelah transaksi pembuatannya commit.
+
+    Dengan `WORKER_THREADS` > 0, job dikerjakan thread latar di proses ini sehingga
+    request langsung kembali 202. Dengan 0, job menunggu `manage.py run_export_jobs`.
+    """
+    global _executor
+    threads = get_config()['WORKER_THREADS']
+    if not threads:
+        return
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='export')
+    transaction.on_commit(lambda: _executor.submit(_run_in_thread, job.pk))
@@ -0,0 +1,51 @@
+import statistics
+import time
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from shops.models import Inventory, Product, Shop
+from rentals.checkout import checkout_cart
+from rentals.models import Cart
+
+
+class Command(BaseCommand):
+    help = "Benchmark jumlah query dan latensi per checkout. Semua data dibuat dalam transaksi yang di-rollback."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--checkouts', type=int, default=200)
+        parser.add_argument('--lines', type=int, default=10, help="Jumlah baris keranjang per checkout")
+
+    def handle(self, *args, **options):
+        checkouts, lines = options['checkouts'], options['lines']
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                email='bench-checkout@example.com', username='bench-checkout', full_name='Bench'
+            )
+            shop = Shop.objects.create(user=user, shop_name='Bench Checkout Shop', address='-', postal_code='-', contact='-')
+            products = Product.objects.bulk_create([
+                Product(shop=shop, name=f'Bench {i}', price=10 + i) for i in range(lines)
+            ])
+            Inventory.objects.bulk_create([Inventory(product=p, quantity=checkouts) for p in products])
+
+            timings, query_counts = [], []
+            for _ in range(checkouts):
+                Cart.objects.bulk_create([
+                    Cart(user=user, product=p, quantity=1, total_price=p.price) for p in products
+                ])
+                with CaptureQueriesContext(connection) as queries:
+                    start = time.perf_counter()
+                    checkout_cart(user, date(2024, 12, 1), date(2024, 12, 10))
+                    timings.append((time.perf_counter() - start) * 1000)
+                query_counts.append(len(queries))
+            transaction.set_rollback(True)
+
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"checkouts={checkouts} lines={lines} "
+            f"queries/checkout={max(query_counts)} "
+            f"p50={statistics.median(timings):.2f}ms p95={p95:.2f}ms max={timings[-1]:.2f}ms"
+        )
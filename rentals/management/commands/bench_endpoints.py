@@ -0,0 +1,114 @@
+import json
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import override_settings
+from melar_project import benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark semua route di shops, rentals, users dan seller_requests pada database uji "
+        "berisi dataset tetap: latensi p50/p95/p99, jumlah query dan puncak memori per skenario. "
+        "Hasil dibandingkan dengan baseline JSON; perintah gagal jika budget dilanggar."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scenario', action='append', help="Prefix nama skenario, bisa berulang (default semua)")
+        parser.add_argument('--iterations', type=int, help="Default BENCHMARKS['ITERATIONS']")
+        parser.add_argument('--warmup', type=int)
+        parser.add_argument('--baseline', help="Default BENCHMARKS['BASELINE']")
+        parser.add_argument('--update-baseline', action='store_true', help="Tulis hasil sebagai baseline baru")
+        parser.add_argument('--output', help="Simpan hasil mentah sebagai JSON")
+        parser.add_argument('--retries', type=int, default=1, help="Ukur ulang skenario yang melanggar budget sebanyak ini")
+        parser.add_argument('--cache', action='store_true', help="Aktifkan cache respons katalog")
+        parser.add_argument('--list', action='store_true', help="Tampilkan skenario dan route yang belum tercakup")
+
+    def handle(self, *args, **options):
+        config = benchmarks.get_config()
+        scenarios = [
+            scenario for scenario in benchmarks.SCENARIOS
+            if not options['scenario'] or scenario.name.startswith(tuple(options['scenario']))
+        ]
+        uncovered = benchmarks.uncovered_routes()
+        if options['list']:
+            for scenario in scenarios:
+                self.stdout.write(scenario.name)
+            for name in uncovered:
+                self.stdout.write(self.style.WARNING(f"tanpa skenario: {name}"))
+            return
+        if not scenarios:
+            raise CommandError("Tidak ada skenario yang cocok.")
+        for name in uncovered:
+            self.stderr.write(self.style.WARNING(f"Route tanpa skenario: {name}"))
+
+        path = options['baseline'] or config['BASELINE']
+        meta, baseline = {}, {}
+        if path and not options['update_baseline']:
+            try:
+                meta, baseline = benchmarks.load_baseline(path)
+            except FileNotFoundError:
+                self.stderr.write(self.style.WARNING(f"Baseline {path} belum ada; hanya BUDGETS yang diperiksa."))
+
+        overrides = {'DEBUG': False, 'ALLOWED_HOSTS': ['testserver']}
+        if not options['cache']:
+            overrides['CATALOG_CACHE'] = {'ENABLED': False}
+        iterations = options['iterations'] or config['ITERATIONS']
+        calibration_ms = benchmarks.calibrate()
+        speed = calibration_ms / meta['calibration_ms'] if meta.get('calibration_ms') else 1.0
+        self.stdout.write(f"Kalibrasi {calibration_ms:.1f}ms (x{speed:.2f} terhadap mesin baseline)")
+        speed = max(speed, 1.0)  # Kalibrasi juga berisik: hanya dipakai untuk melonggarkan batas
+
+        # File ekspor dataset ke direktori sementara; job hanya dikerjakan sinkron oleh seed
+        export_dir = tempfile.mkdtemp(prefix='melar-bench-exports-')
+        overrides['EXPORTS'] = {**getattr(settings, 'EXPORTS', {}), 'DIRECTORY': export_dir, 'WORKER_THREADS': 0}
+        # Database uji terpisah (SQLite: di memori); database kerja tidak disentuh
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            with override_settings(**overrides):
+                dataset = benchmarks.seed()
+                results = benchmarks.run(scenarios, dataset, iterations=iterations, warmup=options['warmup'])
+                violations = {} if options['update_baseline'] else benchmarks.compare(results, baseline, config, speed)
+                # Ukur ulang skenario yang melanggar; lonjakan sesaat di mesin bersama tidak dihitung regresi
+                for _ in range(options['retries']):
+                    if not violations:
+                        break
+                    retried = [scenario for scenario in scenarios if scenario.name in violations]
+                    rerun = benchmarks.run(retried, dataset, iterations=iterations, warmup=options['warmup'])
+                    for name, result in rerun.items():
+                        results[name] = {
+                            key: min(value, results[name][key]) if key.endswith(('_ms', '_kib')) else value
+                            for key, value in result.items()
+                        }
+                    violations = benchmarks.compare(results, baseline, config, speed)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            shutil.rmtree(export_dir, ignore_errors=True)
+
+        for name, result in results.items():
+            self.stdout.write(benchmarks.format_result(name, result, baseline.get(name)))
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+        if options['update_baseline']:
+            if not path:
+                raise CommandError("Isi --baseline atau BENCHMARKS['BASELINE'].")
+            if options['scenario']:
+                # Skenario yang tidak dijalankan tetap memakai angka baseline lama
+                try:
+                    results = {**benchmarks.load_baseline(path)[1], **results}
+                except FileNotFoundError:
+                    pass
+            benchmarks.write_baseline(path, results, iterations, calibration_ms)
+            self.stdout.write(self.style.SUCCESS(f"Baseline {len(results)} skenario ditulis ke {path}."))
+            return
+
+        if violations:
+            for name, messages in violations.items():
+                for message in messages:
+                    self.stderr.write(self.style.ERROR(f"{name}: {message}"))
+            raise CommandError(f"{len(violations)} skenario melanggar budget benchmark.")
+        self.stdout.write(self.style.SUCCESS(f"{len(results)} skenario dalam budget."))
@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rentals import exports
+from rentals.models import ExportJob
+
+
+class Command(BaseCommand):
+    help = (
+        "Worker ekspor: kerjakan job ekspor yang pending, dan lanjutkan dari checkpoint job running "
+        "yang heartbeat-nya basi (worker sebelumnya mati). Tanpa --once, terus memantau antrean."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--once', action='store_true', help="Kerjakan antrean saat ini lalu keluar")
+        parser.add_argument('--interval', type=float, default=2.0, help="Detik antar pemeriksaan antrean")
+
+    def handle(self, *args, **options):
+        while True:
+            for job_id in exports.claimable_ids():
+                try:
+                    if exports.run_job(job_id):
+                        job = ExportJob.objects.get(pk=job_id)
+                        self.stdout.write(f"Export #{job.pk} ({job.kind}, {job.format}): {job.rows} baris, {job.size} byte.")
+                except Exception as e:
+                    self.stderr.write(f"Export #{job_id} gagal: {e}")
+            if options['once']:
+                break
+            time.sleep(options['interval'])
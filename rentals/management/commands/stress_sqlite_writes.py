@@ -0,0 +1,143 @@
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, OperationalError, connections
+from django.test import override_settings
+from melar_project.sqlite import WriteLaneBusy, connection_options
+from shops.models import Inventory, Product, Shop
+from rentals.cart import upsert_lines
+from rentals.checkout import CheckoutError, checkout_cart
+
+MODES = ('default', 'production')
+
+
+class Command(BaseCommand):
+    help = (
+        "Stress test tulis SQLite bersamaan (upsert keranjang dan checkout) di salinan database sementara. "
+        "Membandingkan mode default Django dengan mode produksi (WAL, pragma, jalur tulis BEGIN IMMEDIATE): "
+        "throughput dan persentase error `database is locked`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--seconds', type=float, default=10.0, help="Durasi per mode")
+        parser.add_argument('--products', type=int, default=50)
+        parser.add_argument('--checkout-ratio', type=float, default=0.2, help="Porsi operasi yang berupa checkout")
+        parser.add_argument('--mode', choices=MODES, action='append', help="Bisa berulang (default keduanya)")
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        database = settings.DATABASES[DEFAULT_DB_ALIAS]
+        if database['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError("Stress test ini khusus SQLite.")
+        original = {'NAME': database['NAME'], 'OPTIONS': database.get('OPTIONS', {})}
+        workdir = tempfile.mkdtemp(prefix='melar-stress-')
+        try:
+            # Skema dan data dibuat sekali dalam journal default, lalu disalin per mode
+            template = os.path.join(workdir, 'template.sqlite3')
+            self._use(template, {})
+            call_command('migrate', verbosity=0)
+            user_ids, product_ids = self._seed(options)
+            for mode in options['mode'] or MODES:
+                path = os.path.join(workdir, f'{mode}.sqlite3')
+                shutil.copyfile(template, path)
+                production = mode == 'production'
+                sqlite_mode = {**getattr(settings, 'SQLITE_MODE', {}), 'ENABLED': production}
+                self._use(path, connection_options(sqlite_mode) if production else {})
+                with override_settings(SQLITE_MODE=sqlite_mode):
+                    self._report(mode, self._run(user_ids, product_ids, options))
+        finally:
+            self._use(original['NAME'], original['OPTIONS'])
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    @staticmethod
+    def _use(name, db_options):
+        """Arahkan alias default ke file lain; koneksi thread baru membaca settings yang sama."""
+        connections.close_all()
+        settings_dict = connections.settings[DEFAULT_DB_ALIAS]
+        settings_dict['NAME'] = name
+        settings_dict['OPTIONS'] = db_options
+
+    @staticmethod
+    def _seed(options):
+        User = get_user_model()
+        owner = User.objects.create_user(email='stress-owner@example.com', username='stress-owner', full_name='Owner')
+        shop = Shop.objects.create(user=owner, shop_name='Stress Shop', address='-', postal_code='-', contact='-')
+        products = Product.objects.bulk_create([
+            Product(shop=shop, name=f'Stress {i}', price=10 + i) for i in range(options['products'])
+        ])
+        # Stok besar: yang diukur adalah locking, bukan penolakan karena stok habis
+        Inventory.objects.bulk_create([Inventory(product=product, quantity=10 ** 9) for product in products])
+        users = User.objects.bulk_create([
+            User(email=f'stress{i}@example.com', username=f'stress{i}', full_name='Stress')
+            for i in range(options['threads'])
+        ])
+        return [user.pk for user in users], [product.pk for product in products]
+
+    @staticmethod
+    def _run(user_ids, product_ids, options):
+        results = {'ok': 0, 'locked': 0, 'busy': 0, 'rejected': 0, 'latencies': []}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['seconds']
+        borrow = date.today() + timedelta(days=30)
+
+        def worker(index, user_id):
+            rng = random.Random(options['seed'] + index)
+            user = get_user_model().objects.get(pk=user_id)
+            counts = {'ok': 0, 'locked': 0, 'busy': 0, 'rejected': 0}
+            latencies = []
+            try:
+                while time.monotonic() < deadline:
+                    start = time.perf_counter()
+                    try:
+                        if rng.random() < options['checkout_ratio']:
+                            upsert_lines(user, [(rng.choice(product_ids), 1)])
+                            checkout_cart(user, borrow, borrow + timedelta(days=rng.randint(1, 7)))
+                        else:
+                            upsert_lines(user, [(rng.choice(product_ids), rng.randint(1, 3))])
+                        counts['ok'] += 1
+                    except OperationalError as e:
+                        if 'locked' not in str(e) and 'busy' not in str(e):
+                            raise
+                        counts['locked'] += 1
+                    except WriteLaneBusy:
+                        counts['busy'] += 1
+                    except CheckoutError:
+                        counts['rejected'] += 1
+                    latencies.append(time.perf_counter() - start)
+            finally:
+                connections.close_all()
+            with lock:
+                for key, value in counts.items():
+                    results[key] += value
+                results['latencies'].extend(latencies)
+
+        threads = [threading.Thread(target=worker, args=(i, user_id)) for i, user_id in enumerate(user_ids)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        results['elapsed'] = time.perf_counter() - started
+        return results
+
+    def _report(self, mode, results):
+        attempts = results['ok'] + results['locked'] + results['busy'] + results['rejected']
+        latencies = sorted(results['latencies']) or [0.0]
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        self.stdout.write(
+            f"{mode:<10} ops/s={results['ok'] / results['elapsed']:8.1f} "
+            f"locked={results['locked']} ({100 * results['locked'] / max(attempts, 1):.1f}%) "
+            f"busy={results['busy']} rejected={results['rejected']} "
+            f"p50={statistics.median(latencies) * 1000:6.1f}ms p99={p99 * 1000:6.1f}ms"
+        )
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:33
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_bookings(apps, schema_editor):
+    OrderItem = apps.get_model('rentals', 'OrderItem')
+    Booking = apps.get_model('rentals', 'Booking')
+    items = OrderItem.objects.select_related('order').iterator(chunk_size=2000)
+    batch = []
+    for item in items:
+        batch.append(Booking(
+            product_id=item.product_id,
+            order_id=item.order_id,
+            quantity=item.quantity,
+            start_date=item.order.borrow_date,
+            end_date=item.order.return_deadline,
+            is_active=item.order.status != 'completed',
+        ))
+        if len(batch) >= 2000:
+            Booking.objects.bulk_create(batch)
+            batch = []
+    Booking.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0003_orderitem'),
+        ('shops', '0005_category_category_created_keyset_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Booking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('is_active', models.BooleanField(default=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='rentals.order')),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='shops.product')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('is_active', True)), fields=['product', 'end_date', 'start_date'], name='booking_overlap_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_bookings, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:56
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicate_lines(apps, schema_editor):
+    Cart = apps.get_model('rentals', 'Cart')
+    Product = apps.get_model('shops', 'Product')
+    OrderCart = apps.get_model('rentals', 'Order').cart_items.through
+    duplicates = (
+        Cart.objects.values('user_id', 'product_id')
+        .annotate(rows=Count('id'), keep=Min('id'), quantity=Sum('quantity'))
+        .filter(rows__gt=1)
+    )
+    for group in duplicates:
+        others = list(
+            Cart.objects.filter(user_id=group['user_id'], product_id=group['product_id'])
+            .exclude(id=group['keep']).values_list('id', flat=True)
+        )
+        # Order lama yang menautkan baris duplikat dipindah ke baris yang dipertahankan
+        linked = set(OrderCart.objects.filter(cart_id=group['keep']).values_list('order_id', flat=True))
+        for order_id in set(OrderCart.objects.filter(cart_id__in=others).values_list('order_id', flat=True)) - linked:
+            OrderCart.objects.create(order_id=order_id, cart_id=group['keep'])
+        Cart.objects.filter(id__in=others).delete()
+        price = Product.objects.values_list('price', flat=True).get(id=group['product_id'])
+        Cart.objects.filter(id=group['keep']).update(quantity=group['quantity'], total_price=price * group['quantity'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('rentals', '0004_booking'),
+        ('shops', '0007_product_facet_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_lines, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='cart',
+            constraint=models.UniqueConstraint(fields=('user', 'product'), name='cart_user_product_uniq'),
+        ),
+    ]
@@ -10,8 +10,19 @@ class Cart(models.Model):
     quantity = models.PositiveIntegerField(default=1)
     total_price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
 
+    class Meta:
+        constraints = [
+            # Satu baris per produk per user; tambah ulang menaikkan quantity (lihat rentals.cart)
+            models.UniqueConstraint(fields=['user', 'product'], name='cart_user_product_uniq'),
+        ]
+
     def save(self, *args, **kwargs):
-        self.total_price = self.product.price * self.quantity
+        # Pakai produk yang sudah dimuat; jika belum, ambil kolom harga saja
+        if Cart.product.is_cached(self):
+            price = self.product.price
+        else:
+            price = Product.objects.values_list('price', flat=True).get(pk=self.product_id)
+        self.total_price = price * self.quantity
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -28,6 +39,9 @@ class Order(models.Model):
         ('completed', 'Completed'),
     ]
 
+    # Status yang membebaskan produk kembali; status lain menahan interval booking
+    RELEASED_STATUSES = ('completed',)
+
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='orders')
     cart_items = models.ManyToManyField(Cart, related_name='orders')
     total_price = models.DecimalField(max_digits=10, decimal_places=2)
@@ -37,10 +51,65 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='order_created_keyset_idx'),
+            models.Index(fields=['user', 'created_at', 'id'], name='order_user_created_keyset_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_status = instance.__dict__.get('status')
+        return instance
+
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+        if not adding and self.status != getattr(self, '_saved_status', None):
+            # Sinkronkan interval booking hanya saat status berubah
+            self.bookings.update(is_active=self.status not in self.RELEASED_STATUSES)
+        self._saved_status = self.status
+
     def __str__(self):
         return f"Order {self.id} by {self.user.username}"
 
 
+class OrderItem(models.Model):
+    """Baris order yang disalin dari keranjang saat checkout (keranjang lalu dikosongkan)."""
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='items')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='order_items')
+    quantity = models.PositiveIntegerField()
+    price = models.DecimalField(max_digits=10, decimal_places=2)  # Harga satuan saat checkout
+    total_price = models.DecimalField(max_digits=10, decimal_places=2)
+
+    def __str__(self):
+        return f"{self.quantity} x {self.product_id} in Order {self.order_id}"
+
+
+class Booking(models.Model):
+    """Interval sewa per produk (inklusif), diindeks untuk query overlap ketersediaan."""
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='bookings')
+    order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name='bookings')
+    quantity = models.PositiveIntegerField(default=1)
+    start_date = models.DateField()
+    end_date = models.DateField()
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        indexes = [
+            # Overlap [start, end]: end_date >= start AND start_date <= end, hanya booking aktif
+            models.Index(
+                fields=['product', 'end_date', 'start_date'],
+                name='booking_overlap_idx',
+                condition=models.Q(is_active=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f"Product {self.product_id}: {self.start_date} - {self.end_date}"
+
+
 class Shipping(models.Model):
     order = models.OneToOneField(Order, on_delete=models.CASCADE, related_name='shipping')
     address = models.TextField()
@@ -50,3 +119,47 @@ class Shipping(models.Model):
 
     def __str__(self):
         return f"Shipping for Order {self.order.id}"
+
+
+class ExportJob(models.Model):
+    """Ekspor laporan di latar belakang; progres disimpan per chunk agar bisa dilanjutkan (lihat rentals.exports)."""
+    KIND_CHOICES = [
+        ('orders', 'Orders'),
+        ('products', 'Products'),
+        ('users', 'Users'),
+    ]
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('jsonl', 'JSONL'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+    ACTIVE_STATUSES = ('pending', 'running')
+
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='export_jobs')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default='csv')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    total = models.PositiveBigIntegerField(null=True, blank=True)  # Jumlah baris saat job mulai
+    rows = models.PositiveBigIntegerField(default=0)  # Baris yang sudah ditulis sampai checkpoint
+    last_id = models.BigIntegerField(default=0)  # Checkpoint: id terakhir yang sudah ditulis
+    size = models.PositiveBigIntegerField(default=0)  # Ukuran file (byte) pada checkpoint
+    error = models.TextField(blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)  # Job running tanpa heartbeat dianggap macet
+    owner = models.CharField(max_length=32, blank=True)  # Token klaim terakhir; hanya pemiliknya yang boleh menulis progres
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='exportjob_created_keyset_idx'),
+            models.Index(fields=['status', 'heartbeat_at'], name='exportjob_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Export {self.kind} #{self.id} ({self.status})"
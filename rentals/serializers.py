@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Cart, Order, Shipping
+from django.urls import reverse
+from .models import Cart, ExportJob, Order, OrderItem, Shipping
 from shops.models import Product
 
 
@@ -8,15 +9,68 @@ class CartSerializer(serializers.ModelSerializer):
         model = Cart
         fields = ['id', 'user', 'product', 'quantity', 'total_price']
         read_only_fields = ['user', 'total_price']
+        extra_kwargs = {'quantity': {'min_value': 1}}  # Menghapus baris lewat DELETE atau bulk mode=set
+
+    def validate_product(self, product):
+        # Pindah ke produk yang sudah ada di keranjang akan melanggar cart_user_product_uniq
+        if self.instance is not None and product.pk != self.instance.product_id:
+            if Cart.objects.filter(user_id=self.instance.user_id, product=product).exists():
+                raise serializers.ValidationError("Produk ini sudah ada di keranjang.")
+        return product
+
+
+class CartLineSerializer(serializers.Serializer):
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=0, default=1)
+
+
+class CartBulkSerializer(serializers.Serializer):
+    """Banyak baris keranjang sekaligus; `mode=set` mengganti quantity dan quantity 0 menghapus baris."""
+    MAX_LINES = 500
+
+    lines = CartLineSerializer(many=True, allow_empty=False, max_length=MAX_LINES)
+    mode = serializers.ChoiceField(choices=['add', 'set'], default='add')
+
+    def validate(self, attrs):
+        product_ids = {line['product'] for line in attrs['lines']}
+        existing = set(Product.objects.filter(id__in=product_ids).values_list('id', flat=True))
+        errors = []
+        for line in attrs['lines']:
+            error = {}
+            if line['product'] not in existing:
+                error['product'] = [f"Produk {line['product']} tidak ditemukan."]
+            if attrs['mode'] == 'add' and line['quantity'] < 1:
+                error['quantity'] = ["quantity minimal 1 untuk mode add."]
+            errors.append(error)
+        if any(errors):
+            raise serializers.ValidationError({'lines': errors})
+        return attrs
+
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OrderItem
+        fields = ['id', 'product', 'quantity', 'price', 'total_price']
+
+
+class CheckoutSerializer(serializers.Serializer):
+    borrow_date = serializers.DateField()
+    return_deadline = serializers.DateField()
+
+    def validate(self, attrs):
+        if attrs['return_deadline'] < attrs['borrow_date']:
+            raise serializers.ValidationError("return_deadline tidak boleh sebelum borrow_date.")
+        return attrs
 
 
 class OrderSerializer(serializers.ModelSerializer):
     cart_items = CartSerializer(many=True, read_only=True)
+    items = OrderItemSerializer(many=True, read_only=True)  # Baris order hasil checkout
     total_price = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
 
     class Meta:
         model = Order
-        fields = ['id', 'user', 'cart_items', 'total_price', 'borrow_date', 'return_deadline', 'status', 'created_at', 'updated_at']
+        fields = ['id', 'user', 'cart_items', 'items', 'total_price', 'borrow_date', 'return_deadline', 'status', 'created_at', 'updated_at']
         read_only_fields = ['user', 'status', 'created_at', 'updated_at']
 
     def create(self, validated_data):
@@ -49,3 +103,80 @@ class ShippingSerializer(serializers.ModelSerializer):
     class Meta:
         model = Shipping
         fields = ['id', 'order', 'address', 'postal_code', 'phone_number', 'user_name']
+
+
+class AvailabilityQuerySerializer(serializers.Serializer):
+    MAX_PRODUCTS = 100
+    MAX_DAYS = 366
+
+    product = serializers.CharField()  # Satu id atau beberapa id dipisah koma
+    start = serializers.DateField()
+    end = serializers.DateField()
+
+    def validate_product(self, value):
+        try:
+            ids = list(dict.fromkeys(int(part) for part in value.split(',') if part.strip()))
+        except ValueError:
+            raise serializers.ValidationError("product harus berupa id atau daftar id dipisah koma.")
+        if not ids or len(ids) > self.MAX_PRODUCTS:
+            raise serializers.ValidationError(f"Jumlah produk harus 1 sampai {self.MAX_PRODUCTS}.")
+        return ids
+
+    def validate(self, attrs):
+        days = (attrs['end'] - attrs['start']).days
+        if days < 0:
+            raise serializers.ValidationError("end tidak boleh sebelum start.")
+        if days >= self.MAX_DAYS:
+            raise serializers.ValidationError(f"Jendela maksimal {self.MAX_DAYS} hari.")
+        return attrs
+
+
+class QuoteLineSerializer(serializers.Serializer):
+    product = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1, default=1)
+    start = serializers.DateField()
+    end = serializers.DateField()
+
+    def validate(self, attrs):
+        if attrs['end'] < attrs['start']:
+            raise serializers.ValidationError("end tidak boleh sebelum start.")
+        return attrs
+
+
+class QuoteSerializer(serializers.Serializer):
+    """Isi `lines` untuk daftar produk + rentang tanggal, atau `start`/`end` untuk seluruh keranjang."""
+    MAX_LINES = 10000
+
+    lines = QuoteLineSerializer(many=True, required=False, max_length=MAX_LINES)
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        if 'lines' in attrs:
+            if not attrs['lines']:
+                raise serializers.ValidationError("lines tidak boleh kosong.")
+            return attrs
+        if 'start' not in attrs or 'end' not in attrs:
+            raise serializers.ValidationError("Isi lines, atau start dan end untuk menghitung keranjang.")
+        if attrs['end'] < attrs['start']:
+            raise serializers.ValidationError("end tidak boleh sebelum start.")
+        return attrs
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            'id', 'kind', 'format', 'status', 'total', 'rows', 'size', 'error',
+            'download_url', 'created_at', 'updated_at', 'finished_at',
+        ]
+        read_only_fields = ['status', 'total', 'rows', 'size', 'error', 'created_at', 'updated_at', 'finished_at']
+
+    def get_download_url(self, obj):
+        if obj.status != 'completed':
+            return None
+        url = reverse('export-download', args=[obj.pk])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
@@ -1,12 +1,51 @@
+import json
+import gzip
+import os
+import shutil
+import tempfile
+import threading
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, models, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
-from rest_framework import status
-from shops.models import Product, Shop
-from .models import Cart, Order, Shipping
+from rest_framework import serializers, status
+from rest_framework.response import Response
+from rest_framework_simplejwt.tokens import AccessToken
+from melar_project import benchmarks, metrics, nplusone, routers, synthetic
+from melar_project.cache import CachedResponseMixin, check_shared_caches
+from melar_project.routers import DatabaseRoutingMiddleware, PrimaryReplicaRouter, use_database
+from melar_project.sqlite import WriteLane, connection_options, write_transaction
+from shops import pricing
+from shops.models import Category, Discount, Inventory, Product, Shop
+from shops.search import search_products
+from . import exports
+from .checkout import CheckoutError, checkout_cart
+from .models import Booking, Cart, ExportJob, Order, OrderItem, Shipping
 
 User = get_user_model() 
 
+
+def temporary_exports(testcase):
+    """EXPORTS ke direktori sementara tanpa thread latar; dibersihkan setelah test."""
+    directory = tempfile.mkdtemp(prefix='melar-test-exports-')
+    testcase.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+    override = override_settings(EXPORTS={**settings.EXPORTS, 'DIRECTORY': directory, 'WORKER_THREADS': 0})
+    override.enable()
+    testcase.addCleanup(override.disable)
+    return directory
+
 class CartOrderShippingTests(APITestCase):
 
     def setUp(self):
@@ -117,3 +156,891 @@ class CartOrderShippingTests(APITestCase):
         shipping = Shipping.objects.first()
         self.assertEqual(shipping.order, order)
         self.assertEqual(shipping.address, "123 Main St")
+
+
+class ListQueryCountTests(APITestCase):
+    """Every rentals list endpoint costs the same number of queries at 10 and 10,000 rows."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='planner', email='planner@gmail.com', password='password123')
+        self.token = AccessToken.for_user(self.user)
+        self.shop = Shop.objects.create(user=self.user, shop_name="Planner Shop", address="Test Address", postal_code="12345", contact="123456789")
+        self.product = Product.objects.create(shop=self.shop, name="Planner Product", price=100.00)
+
+    def _seed(self, n):
+        # Keranjang unik per (user, product), jadi setiap baris butuh produk sendiri
+        products = Product.objects.bulk_create([
+            Product(shop=self.shop, name="Planner Product", price=100.00) for _ in range(n)
+        ])
+        carts = Cart.objects.bulk_create([
+            Cart(user=self.user, product=product, quantity=1, total_price=100) for product in products
+        ])
+        orders = Order.objects.bulk_create([
+            Order(user=self.user, total_price=100, borrow_date="2024-12-01", return_deadline="2024-12-10")
+            for _ in range(n)
+        ])
+        Order.cart_items.through.objects.bulk_create([
+            Order.cart_items.through(order_id=o.id, cart_id=c.id) for o, c in zip(orders, carts)
+        ])
+        Shipping.objects.bulk_create([
+            Shipping(order=o, address="Jl. Test", postal_code="12345", phone_number="0800", user_name="Planner")
+            for o in orders
+        ])
+
+    def test_list_endpoints(self):
+        expected = {
+            'cart-list': 2,
+            'order-list': 5,  # + validator ETag, prefetch cart_items dan items
+            'shipping-list': 2,
+        }
+        for rows in (10, 10000 - 10):
+            self._seed(rows)
+            for url_name, queries in expected.items():
+                with self.subTest(url_name=url_name, rows=Order.objects.count()):
+                    with self.assertNumQueries(queries):
+                        response = self.client.get(reverse(url_name), HTTP_AUTHORIZATION=f'Bearer {self.token}')
+                    self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class CartUpsertTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='shopper', email='shopper@gmail.com', password='password123')
+        self.token = AccessToken.for_user(self.user)
+        self.shop = Shop.objects.create(user=self.user, shop_name="Upsert Shop", address="Test Address", postal_code="12345", contact="123456789")
+        self.products = Product.objects.bulk_create([
+            Product(shop=self.shop, name=f"Item {i}", price=10 + i) for i in range(30)
+        ])
+        self.bulk_url = f"{reverse('cart-list')}bulk/"
+
+    def _post(self, url, payload):
+        return self.client.post(url, payload, format='json', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def test_adding_same_product_increments_quantity(self):
+        product = self.products[0]
+        self._post(reverse('cart-list'), {"product": product.id, "quantity": 1})
+        response = self._post(reverse('cart-list'), {"product": product.id, "quantity": 2})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['quantity'], 3)
+        self.assertEqual(response.data['total_price'], '30.00')
+        self.assertEqual(Cart.objects.filter(user=self.user).count(), 1)
+
+    def test_create_rejects_zero_quantity(self):
+        product = self.products[0]
+        response = self._post(reverse('cart-list'), {"product": product.id, "quantity": 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self._post(reverse('cart-list'), {"product": product.id, "quantity": 2})
+        response = self._post(reverse('cart-list'), {"product": product.id, "quantity": 0})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Cart.objects.get(user=self.user, product=product).quantity, 2)  # Baris tidak terhapus
+
+    def test_patch_to_product_already_in_cart_is_400(self):
+        first = self._post(reverse('cart-list'), {"product": self.products[0].id, "quantity": 1}).data
+        self._post(reverse('cart-list'), {"product": self.products[1].id, "quantity": 1})
+        response = self.client.patch(
+            reverse('cart-detail', args=[first['id']]), {"product": self.products[1].id},
+            format='json', HTTP_AUTHORIZATION=f'Bearer {self.token}',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('product', response.data)
+
+    def test_bulk_add_is_constant_queries(self):
+        lines = [{"product": p.id, "quantity": 2} for p in self.products]
+        with self.assertNumQueries(7):  # JWT, validasi produk, savepoint x2, upsert, baris, ringkasan
+            response = self._post(self.bulk_url, {"lines": lines})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['summary']['lines'], 30)
+        self.assertEqual(response.data['summary']['items'], 60)
+        self.assertEqual(response.data['summary']['total_price'], sum(p.price * 2 for p in self.products))
+
+        response = self._post(self.bulk_url, {"lines": lines[:2] + lines[:1]})
+        self.assertEqual(Cart.objects.get(user=self.user, product=self.products[0]).quantity, 6)
+        self.assertEqual(Cart.objects.get(user=self.user, product=self.products[1]).total_price, Decimal('44.00'))
+
+    def test_bulk_set_replaces_and_removes(self):
+        self._post(self.bulk_url, {"lines": [{"product": p.id, "quantity": 2} for p in self.products[:3]]})
+        response = self._post(self.bulk_url, {"mode": "set", "lines": [
+            {"product": self.products[0].id, "quantity": 5},
+            {"product": self.products[1].id, "quantity": 0},
+        ]})
+        quantities = {line['product']: line['quantity'] for line in response.data['lines']}
+        self.assertEqual(quantities, {self.products[0].id: 5, self.products[2].id: 2})
+
+    def test_bulk_reports_per_line_errors(self):
+        response = self._post(self.bulk_url, {"lines": [
+            {"product": self.products[0].id, "quantity": 1},
+            {"product": 9999, "quantity": 1},
+            {"product": self.products[1].id, "quantity": 0},
+        ]})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        errors = response.data['lines']
+        self.assertEqual(errors[0], {})
+        self.assertIn('product', errors[1])
+        self.assertIn('quantity', errors[2])
+        self.assertFalse(Cart.objects.exists())
+
+    def test_summary_uses_current_price(self):
+        self._post(self.bulk_url, {"lines": [{"product": self.products[0].id, "quantity": 3}]})
+        Product.objects.filter(id=self.products[0].id).update(price=20)
+        with self.assertNumQueries(2):  # JWT user + agregat
+            response = self.client.get(f"{reverse('cart-list')}summary/", HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(response.data, {'lines': 1, 'items': 3, 'total_price': Decimal('60.00')})
+
+
+class CheckoutTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='buyer', email='buyer@gmail.com', password='password123')
+        self.token = AccessToken.for_user(self.user)
+        self.shop = Shop.objects.create(user=self.user, shop_name="Checkout Shop", address="Test Address", postal_code="12345", contact="123456789")
+        self.checkout_url = f"{reverse('cart-list')}checkout/"
+        self.payload = {"borrow_date": "2024-12-01", "return_deadline": "2024-12-10"}
+        pricing.invalidate()
+        pricing.get_index()  # Indeks diskon dibangun di luar query yang dihitung
+
+    def _fill_cart(self, lines, stock=2):
+        products = Product.objects.bulk_create([
+            Product(shop=self.shop, name=f"Item {i}", price=10 + i) for i in range(lines)
+        ])
+        if stock:
+            Inventory.objects.bulk_create([Inventory(product=product, quantity=stock) for product in products])
+        for product in products:
+            Cart.objects.create(user=self.user, product=product, quantity=2)
+        return products
+
+    def _checkout(self, payload=None):
+        return self.client.post(self.checkout_url, payload or self.payload, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def test_checkout_writes_order_lines_and_clears_cart(self):
+        products = self._fill_cart(3)
+        response = self._checkout()
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        order = Order.objects.get(id=response.data['order_id'])
+        self.assertEqual(order.total_price, sum((p.price * 2 for p in products)))
+        self.assertEqual(order.items.count(), 3)
+        self.assertFalse(Cart.objects.filter(user=self.user).exists())
+
+    def test_query_count_is_constant(self):
+        self._fill_cart(1)
+        with CaptureQueriesContext(connection) as small:
+            self._checkout()
+        self._fill_cart(30)
+        with CaptureQueriesContext(connection) as large:
+            self._checkout()
+        self.assertEqual(len(small), len(large))
+
+    def test_insufficient_stock_rolls_back(self):
+        self._fill_cart(1, stock=1)
+        response = self._checkout()
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Order.objects.exists())
+        self.assertTrue(Cart.objects.filter(user=self.user).exists())
+
+    def test_product_without_inventory_has_capacity_one(self):
+        self._fill_cart(1, stock=None)  # Dua unit diminta, tanpa baris Inventory
+        self.assertEqual(self._checkout().status_code, status.HTTP_400_BAD_REQUEST)
+        Cart.objects.filter(user=self.user).update(quantity=1)
+        self.assertEqual(self._checkout().status_code, status.HTTP_201_CREATED)
+
+    def test_empty_cart_and_invalid_dates(self):
+        self.assertEqual(self._checkout().status_code, status.HTTP_400_BAD_REQUEST)
+        self._fill_cart(1)
+        response = self._checkout({"borrow_date": "2024-12-10", "return_deadline": "2024-12-01"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class CheckoutRaceTests(TransactionTestCase):
+
+    def test_racing_checkouts_cannot_oversell_last_unit(self):
+        owner = User.objects.create_user(username='racer-owner', email='racer-owner@gmail.com', password='password123')
+        shop = Shop.objects.create(user=owner, shop_name="Race Shop", address="Test Address", postal_code="12345", contact="123456789")
+        product = Product.objects.create(shop=shop, name="Last Unit", price=10)
+        Inventory.objects.create(product=product, quantity=1)
+        buyers = [
+            User.objects.create_user(username=f'racer-{i}', email=f'racer-{i}@gmail.com', password='password123')
+            for i in range(2)
+        ]
+        for buyer in buyers:
+            Cart.objects.create(user=buyer, product=product, quantity=1)
+        pricing.invalidate()
+
+        barrier = threading.Barrier(len(buyers))
+        results = []
+
+        def buyer_checkout(buyer):
+            try:
+                barrier.wait(timeout=5)
+                checkout_cart(buyer, date(2024, 12, 1), date(2024, 12, 10))
+                results.append('ok')
+            except CheckoutError:
+                results.append('rejected')
+            finally:
+                connection.close()  # Koneksi milik thread
+
+        threads = [threading.Thread(target=buyer_checkout, args=(buyer,)) for buyer in buyers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(sorted(results), ['ok', 'rejected'])
+        self.assertEqual(Order.objects.count(), 1)
+        self.assertEqual(Booking.objects.filter(product=product).count(), 1)
+
+
+class QuoteTests(APITestCase):
+
+    def setUp(self):
+        pricing.invalidate()
+        self.user = User.objects.create_user(username='quoter', email='quoter@gmail.com', password='password123')
+        self.token = AccessToken.for_user(self.user)
+        self.shop = Shop.objects.create(user=self.user, shop_name="Quote Shop", address="Test Address", postal_code="12345", contact="123456789")
+        self.category = Category.objects.create(name="Camping")
+        self.tent = Product.objects.create(shop=self.shop, name="Tent", price=100)
+        self.tent.categories.add(self.category)
+        self.stove = Product.objects.create(shop=self.shop, name="Stove", price=40)
+        self.start = timezone.localdate() + timedelta(days=1)
+        Discount.objects.create(
+            code="CAMP20", percentage=20, admin=self.user, category=self.category,
+            valid_from=self.start, valid_until=self.start + timedelta(days=5),
+        )
+
+    def _quote(self, payload):
+        return self.client.post(reverse('quote'), payload, format='json', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def test_quote_lines(self):
+        end = self.start + timedelta(days=2)
+        response = self._quote({"lines": [
+            {"product": self.tent.id, "quantity": 2, "start": self.start, "end": end},
+            {"product": self.stove.id, "start": self.start, "end": end},
+            {"product": self.tent.id, "start": self.start + timedelta(days=10), "end": self.start + timedelta(days=11)},
+        ]})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        tent, stove, later = response.data['lines']
+        self.assertEqual((tent['discount_code'], tent['unit_price'], tent['total_price']), ("CAMP20", Decimal('80.00'), Decimal('160.00')))
+        self.assertIsNone(stove['discount_code'])
+        self.assertIsNone(later['discount_code'])
+        self.assertEqual(response.data['total_price'], Decimal('300.00'))
+
+    def test_quote_cart_and_checkout_apply_discount(self):
+        Cart.objects.create(user=self.user, product=self.tent, quantity=1)
+        Cart.objects.create(user=self.user, product=self.stove, quantity=1)
+        end = self.start + timedelta(days=3)
+        response = self._quote({"start": self.start, "end": end})
+        self.assertEqual(response.data['total_price'], Decimal('120.00'))
+        checkout = self.client.post(
+            f"{reverse('cart-list')}checkout/",
+            {"borrow_date": self.start, "return_deadline": end},
+            HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+        order = Order.objects.get(id=checkout.data['order_id'])
+        self.assertEqual(order.total_price, Decimal('120.00'))
+        self.assertEqual(order.items.get(product=self.tent).price, Decimal('80.00'))
+
+    def test_quote_query_count_is_constant(self):
+        products = Product.objects.bulk_create([Product(shop=self.shop, name=f"Item {i}", price=5) for i in range(50)])
+        self._quote({"lines": [{"product": self.tent.id, "start": self.start, "end": self.start}]})
+        lines = [{"product": p.id, "start": self.start, "end": self.start} for p in products]
+        with self.assertNumQueries(3):  # JWT user + harga + kategori
+            response = self._quote({"lines": lines})
+        self.assertEqual(len(response.data['lines']), 50)
+
+    def test_invalid_requests(self):
+        self.assertEqual(self._quote({}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self._quote({"start": self.start, "end": self.start}).status_code, status.HTTP_400_BAD_REQUEST)  # Keranjang kosong
+        response = self._quote({"lines": [{"product": 9999, "start": self.start, "end": self.start}]})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AvailabilityTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='renter', email='renter@gmail.com', password='password123')
+        self.token = AccessToken.for_user(self.user)
+        self.shop = Shop.objects.create(user=self.user, shop_name="Calendar Shop", address="Test Address", postal_code="12345", contact="123456789")
+        self.product = Product.objects.create(shop=self.shop, name="Tent", price=50)
+        Inventory.objects.create(product=self.product, quantity=1)
+        self.checkout_url = f"{reverse('cart-list')}checkout/"
+
+    def _checkout(self, borrow_date, return_deadline):
+        Cart.objects.create(user=self.user, product=self.product, quantity=1)
+        return self.client.post(
+            self.checkout_url,
+            {"borrow_date": borrow_date, "return_deadline": return_deadline},
+            HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+
+    def _calendar(self, start, end, products=None):
+        products = products or [self.product.id]
+        return self.client.get(
+            reverse('availability'),
+            {"product": ",".join(str(p) for p in products), "start": start, "end": end},
+            HTTP_AUTHORIZATION=f'Bearer {self.token}'
+        )
+
+    def test_checkout_rejects_overlapping_booking(self):
+        self.assertEqual(self._checkout("2024-12-05", "2024-12-10").status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self._checkout("2024-12-10", "2024-12-12").status_code, status.HTTP_400_BAD_REQUEST)
+        Cart.objects.filter(user=self.user).delete()  # Keranjang tetap utuh setelah checkout ditolak
+        self.assertEqual(self._checkout("2024-12-11", "2024-12-12").status_code, status.HTTP_201_CREATED)
+
+    def test_calendar_reports_free_and_busy_ranges(self):
+        self._checkout("2024-12-05", "2024-12-10")
+        response = self._calendar("2024-12-01", "2024-12-31")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        calendar = response.data['products'][0]
+        self.assertEqual(calendar['busy'], [{'start': date(2024, 12, 5), 'end': date(2024, 12, 10)}])
+        self.assertEqual(calendar['free'], [
+            {'start': date(2024, 12, 1), 'end': date(2024, 12, 4)},
+            {'start': date(2024, 12, 11), 'end': date(2024, 12, 31)},
+        ])
+
+    def test_completed_order_releases_range(self):
+        order_id = self._checkout("2024-12-05", "2024-12-10").data['order_id']
+        order = Order.objects.get(id=order_id)
+        order.status = 'completed'
+        order.save()
+        calendar = self._calendar("2024-12-01", "2024-12-31").data['products'][0]
+        self.assertEqual(calendar['busy'], [])
+
+    def test_order_save_touches_bookings_only_on_status_change(self):
+        order = Order.objects.get(id=self._checkout("2024-12-05", "2024-12-10").data['order_id'])
+        with self.assertNumQueries(1):  # UPDATE order saja
+            order.save()
+        order.status = 'completed'
+        with self.assertNumQueries(2):  # UPDATE order + UPDATE booking
+            order.save()
+
+    def test_batch_query_count_is_constant(self):
+        others = Product.objects.bulk_create([Product(shop=self.shop, name=f"Item {i}", price=5) for i in range(20)])
+        self._checkout("2024-12-05", "2024-12-10")
+        with self.assertNumQueries(3):  # JWT user + booking overlap + inventory
+            response = self._calendar("2024-12-01", "2024-12-31", [self.product.id] + [p.id for p in others])
+        self.assertEqual(len(response.data['products']), 21)
+
+
+@override_settings(DATABASE_ROUTING={'REPLICAS': ['replica1', 'replica2'], 'STICKY_SECONDS': 60})
+class DatabaseRoutingTests(APITestCase):
+    """Keputusan router; alias replika tidak benar-benar di-query di sini."""
+
+    def setUp(self):
+        cache.clear()  # Pin sticky disimpan di cache dan id user berulang antar test
+        self.router = PrimaryReplicaRouter()
+        self.user = User.objects.create_user(username='buyer', email='buyer@example.com', password='password123')
+        self.other = User.objects.create_user(username='other', email='other@example.com', password='password123')
+        self.factory = RequestFactory()
+
+    def _route(self, method='get', user=None, status_code=200, view=None):
+        """Jalankan request lewat middleware dan kembalikan alias baca yang dipilih router di view."""
+        middleware = DatabaseRoutingMiddleware(lambda request: handle(request))
+        seen = {}
+
+        def handle(request):
+            request.user = user or AnonymousUser()  # Seperti DRF setelah autentikasi
+            if view is not None:
+                middleware.process_view(request, view, (), {})
+            seen['alias'] = self.router.db_for_read(Order)
+            return HttpResponse(status=status_code)
+
+        middleware(getattr(self.factory, method)('/api/orders/'))
+        return seen['alias']
+
+    def test_reads_outside_request_use_primary(self):
+        self.assertEqual(self.router.db_for_read(Order), 'default')
+        self.assertEqual(self.router.db_for_write(Order), 'default')
+
+    def test_safe_reads_use_replica(self):
+        self.assertIn(self._route(user=self.user), ['replica1', 'replica2'])
+        self.assertEqual(self._route('post', user=self.user, status_code=400), 'default')
+
+    def test_reads_stick_to_primary_after_write(self):
+        self._route('post', user=self.user, status_code=201)
+        self.assertEqual(self._route(user=self.user), 'default')
+        self.assertIn(self._route(user=self.other), ['replica1', 'replica2'])
+
+    def test_failed_write_does_not_pin(self):
+        self._route('post', user=self.user, status_code=400)
+        self.assertIn(self._route(user=self.user), ['replica1', 'replica2'])
+
+    @override_settings(DATABASE_ROUTING={'REPLICAS': ['replica1'], 'STICKY_SECONDS': 0})
+    def test_sticky_window_can_be_disabled(self):
+        self._route('post', user=self.user, status_code=201)
+        self.assertEqual(self._route(user=self.user), 'replica1')
+
+    def test_view_override_and_context_manager(self):
+        class PrimaryView:
+            database_routing = 'primary'
+
+        def view():
+            pass
+        view.cls = PrimaryView  # Seperti hasil `as_view()` DRF
+        self.assertEqual(self._route(user=self.user, view=view), 'default')
+
+        with use_database('replica'):
+            self.assertIn(self.router.db_for_read(Order), ['replica1', 'replica2'])
+
+    def test_reads_inside_atomic_use_primary(self):
+        middleware = DatabaseRoutingMiddleware(lambda request: HttpResponse(self._atomic_read()))
+        request = self.factory.get('/api/orders/')
+        request.user = self.user
+        self.assertEqual(middleware(request).content, b'default')
+
+    def _atomic_read(self):
+        with transaction.atomic():
+            return self.router.db_for_read(Order)
+
+    def test_cache_fill_reads_primary(self):
+        router, seen = self.router, {}
+
+        class ListView:
+            def list(self, request, *args, **kwargs):
+                seen['alias'] = router.db_for_read(Order)
+                return Response({}, status=200)
+
+        class CachedView(CachedResponseMixin, ListView):
+            cache_resource = 'routing-test'
+
+        middleware = DatabaseRoutingMiddleware(lambda request: CachedView().list(request))
+        request = self.factory.get('/api/orders/')
+        request.user = self.user
+        self.assertEqual(middleware(request).status_code, 200)
+        self.assertEqual(seen['alias'], 'default')  # Replika yang tertinggal tidak mengisi cache
+
+    def test_deploy_check_requires_shared_cache(self):
+        self.assertIn('melar.E003', [error.id for error in check_shared_caches(None)])
+        with override_settings(DATABASE_ROUTING={'REPLICAS': []}):
+            self.assertNotIn('melar.E003', [error.id for error in check_shared_caches(None)])
+
+    @override_settings(DATABASE_ROUTING={'REPLICAS': []})
+    def test_without_replicas_router_is_inert(self):
+        self.assertIsNone(self._route(user=self.user))
+
+
+class SqliteModeTests(APITestCase):
+
+    def test_connection_options_set_pragmas(self):
+        options = connection_options({'ENABLED': True, 'BUSY_TIMEOUT_MS': 2000, 'CACHE_SIZE_KIB': 1024})
+        self.assertIn('PRAGMA journal_mode=WAL', options['init_command'])
+        self.assertIn('PRAGMA synchronous=NORMAL', options['init_command'])
+        self.assertIn('PRAGMA busy_timeout=2000', options['init_command'])
+        self.assertIn('PRAGMA cache_size=-1024', options['init_command'])
+        self.assertIn('PRAGMA foreign_keys=ON', options['init_command'])
+        self.assertEqual(options['timeout'], 2)
+
+    @override_settings(SQLITE_MODE={'ENABLED': True})
+    def test_nested_write_transaction_is_plain_atomic(self):
+        # Di dalam atomic (di sini: transaksi TestCase) tidak ada antrean maupun BEGIN IMMEDIATE
+        with write_transaction():
+            self.assertTrue(connection.in_atomic_block)
+            User.objects.create_user(username='lane', email='lane@gmail.com', password='password123')
+        self.assertTrue(User.objects.filter(email='lane@gmail.com').exists())
+
+    def test_write_lane_times_out_when_full(self):
+        lane = WriteLane(1)
+        self.assertTrue(lane.acquire(timeout=0))
+        self.assertFalse(lane.acquire(timeout=0.01))
+        lane.release()
+        self.assertTrue(lane.acquire(timeout=0))
+        lane.release()
+
+    def test_write_lane_serves_waiters_in_order(self):
+        lane = WriteLane(1)
+        lane.acquire()
+        served = []
+
+        def writer(name):
+            lane.acquire(timeout=5)
+            served.append(name)
+            lane.release()
+
+        threads = []
+        for name in ('first', 'second', 'third'):
+            thread = threading.Thread(target=writer, args=(name,))
+            thread.start()
+            threads.append(thread)
+            while len(lane._waiters) < len(threads):  # Pastikan urutan antre deterministik
+                threading.Event().wait(0.001)
+        lane.release()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(served, ['first', 'second', 'third'])
+
+
+class MetricsTests(APITestCase):
+
+    def setUp(self):
+        self.staff = User.objects.create_user(username='ops', email='ops@gmail.com', password='password123', is_staff=True)
+        self.user = User.objects.create_user(username='renter', email='renter@gmail.com', password='password123')
+        shop = Shop.objects.create(user=self.user, shop_name="Metric Shop", address="Test Address", postal_code="12345", contact="123456789")
+        product = Product.objects.create(shop=shop, name="Tent", price=10)
+        Cart.objects.create(user=self.user, product=product, quantity=1)
+
+    def _get(self, url, user):
+        return self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(user)}')
+
+    def test_server_timing_only_for_staff(self):
+        response = self._get(reverse('cart-list'), self.user)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('Server-Timing', response)
+
+        response = self._get(reverse('cart-list'), self.staff)
+        timing = response['Server-Timing']
+        for name in ('db;dur=', 'serialize;dur=', 'render;dur=', 'total;dur='):
+            self.assertIn(name, timing)
+        self.assertIn(f'size;desc="{len(response.content)} bytes"', timing)
+
+    @override_settings(METRICS={'SERVER_TIMING': 'all'})
+    def test_server_timing_counts_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self._get(reverse('cart-list'), self.user)
+        self.assertIn(f'desc="{len(queries)} queries"', response['Server-Timing'])
+
+    def test_metrics_endpoint_exposes_view_histograms(self):
+        self._get(reverse('cart-list'), self.user)
+        self.assertEqual(self._get(reverse('metrics'), self.user).status_code, status.HTTP_403_FORBIDDEN)
+
+        response = self._get(reverse('metrics'), self.staff)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = response.content.decode()
+        self.assertIn('# TYPE melar_request_duration_seconds histogram', body)
+        self.assertIn('melar_request_duration_seconds_bucket{view="CartViewSet.list",method="GET",status="200",le="+Inf"}', body)
+        self.assertIn('melar_db_queries_count{view="CartViewSet.list"}', body)
+        self.assertIn('melar_catalog_cache_events_total{event="hits"}', body)
+        self.assertIn('melar_token_table_rows{table="outstanding"}', body)
+
+    def test_snapshots_from_other_processes_are_merged(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(METRICS={'DIRECTORY': directory}):
+            other = metrics.snapshot()
+            other['histograms'] = [['melar_db_queries', ['OtherViewSet.list'], [0, 0, 0, 2] + [0] * 7 + [6.0]]]
+            with open(os.path.join(directory, '999999.json'), 'w') as f:
+                json.dump(other, f)
+            self._get(reverse('cart-list'), self.user)
+
+            histograms, _ = metrics.collect()
+            self.assertEqual(histograms[('melar_db_queries', ('OtherViewSet.list',))][-1], 6.0)
+            self.assertIn(('melar_db_queries', ('CartViewSet.list',)), histograms)
+            self.assertTrue(os.path.exists(os.path.join(directory, f'{os.getpid()}.json')))
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'], CATALOG_CACHE={'ENABLED': False})
+class BenchmarkSuiteTests(APITestCase):
+
+    def setUp(self):
+        temporary_exports(self)
+
+    def test_every_route_has_scenario(self):
+        self.assertEqual(benchmarks.uncovered_routes(), [])
+
+    def test_baseline_has_no_server_errors(self):
+        # Baseline yang mengukur error 500 akan melaporkan perbaikannya sebagai regresi status
+        _, baseline = benchmarks.load_baseline(settings.BENCHMARKS['BASELINE'])
+        self.assertEqual({name: result['status'] for name, result in baseline.items() if result['status'] >= 400}, {})
+        self.assertEqual(sorted(baseline), sorted(scenario.name for scenario in benchmarks.SCENARIOS))
+
+    def test_run_rolls_back_each_request(self):
+        dataset = benchmarks.seed()
+        scenarios = [scenario for scenario in benchmarks.SCENARIOS if scenario.name in ('cart-checkout.post', 'cart-list.get')]
+        results = benchmarks.run(scenarios, dataset, iterations=2, warmup=0, memory_iterations=1)
+
+        self.assertEqual(results['cart-checkout.post']['status'], status.HTTP_201_CREATED)
+        self.assertEqual(results['cart-list.get']['status'], status.HTTP_200_OK)
+        self.assertEqual(results['cart-list.get']['queries'], 1)
+        self.assertGreater(results['cart-list.get']['peak_kib'], 0)
+        # Checkout di setiap iterasi tidak mengosongkan keranjang dataset
+        self.assertEqual(Cart.objects.filter(user=dataset.customer).count(), 5)
+        self.assertEqual(Order.objects.filter(user=dataset.customer).count(), 20)
+
+    def test_compare_flags_regressions(self):
+        base = {'status': 200, 'queries': 3, 'p50_ms': 10.0, 'p95_ms': 12.0, 'p99_ms': 15.0, 'peak_kib': 100.0}
+        config = {**benchmarks.DEFAULTS, 'BUDGETS': {'b': {'queries': 2}}}
+        results = {
+            'a': {**base, 'p50_ms': 16.0},                       # Dalam toleransi 50% + 2ms
+            'b': {**base, 'queries': 4, 'status': 500},
+            'c': {**base, 'p50_ms': 30.0, 'peak_kib': 500.0},
+            'new': {**base},                                     # Belum ada di baseline
+        }
+        violations = benchmarks.compare(results, {'a': base, 'b': base, 'c': base}, config)
+
+        self.assertEqual(sorted(violations), ['b', 'c'])
+        self.assertEqual(len(violations['b']), 3)  # Status, query relatif baseline, dan budget absolut
+        self.assertEqual(len(violations['c']), 2)
+        self.assertNotIn('c', benchmarks.compare({'c': {**base, 'p50_ms': 30.0}}, {'c': base}, config, speed=2.0))
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'], CATALOG_CACHE={'ENABLED': False})
+class SyntheticDataTests(APITestCase):
+
+    def _generate(self, seed=7):
+        counts = synthetic.plan(200, shops=10, orders=300)
+        return synthetic.Generator(counts, seed=seed, chunk_size=64, anchor=date(2026, 7, 1)).run()
+
+    def _rows(self):
+        """Baris hasil generator dengan id relatif terhadap id pertama tiap tabel."""
+        first = {model: model.objects.order_by('pk').first().pk for model in (Shop, Product, Order)}
+        first[get_user_model()] = get_user_model().objects.order_by('pk').first().pk
+        return (
+            [(shop - first[Shop], name, price, product_status) for shop, name, price, product_status
+             in Product.objects.order_by('pk').values_list('shop_id', 'name', 'price', 'status')],
+            [(order - first[Order], product - first[Product], quantity) for order, product, quantity
+             in OrderItem.objects.order_by('pk').values_list('order_id', 'product_id', 'quantity')],
+            [(user - first[get_user_model()], *rest) for user, *rest
+             in Order.objects.order_by('pk').values_list('user_id', 'borrow_date', 'status', 'total_price')],
+        )
+
+    def test_same_seed_same_rows(self):
+        created = self._generate()
+        first = self._rows()
+        with self.assertRaises(ValueError):
+            self._generate()  # Seed yang sama tidak dimuat dua kali
+        get_user_model().objects.all().delete()
+        Category.objects.all().delete()
+        self._generate()
+
+        self.assertEqual(created['customuser'], 200)
+        self.assertEqual(created['shipping'], 300)
+        self.assertEqual(self._rows(), first)
+
+    def test_admin_has_unusable_password(self):
+        self._generate()
+        admin = get_user_model().objects.get(role='admin')
+        self.assertFalse(admin.has_usable_password())
+        self.assertTrue(get_user_model().objects.exclude(pk=admin.pk).first().check_password(synthetic.Generator.PASSWORD))
+
+    def test_command_refuses_without_debug(self):
+        with self.assertRaises(CommandError):
+            call_command('generate_synthetic', users=20, stdout=StringIO())  # DEBUG mati selama test
+        self.assertFalse(get_user_model().objects.exists())
+        call_command('generate_synthetic', users=20, dry_run=True, stdout=StringIO())
+        call_command('generate_synthetic', users=20, yes_i_know=True, anchor=date(2026, 7, 1), stdout=StringIO())
+        self.assertEqual(get_user_model().objects.count(), 20)
+
+    def test_relations_and_skew(self):
+        self._generate()
+
+        self.assertFalse(Order.objects.filter(shipping__isnull=True).exists())
+        self.assertEqual(Booking.objects.count(), OrderItem.objects.count())
+        self.assertEqual(Inventory.objects.count(), Product.objects.count())
+        for order in Order.objects.prefetch_related('items')[:20]:
+            self.assertEqual(order.total_price, sum(item.total_price for item in order.items.all()))
+        self.assertFalse(Order.objects.filter(borrow_date__lt=date(2026, 7, 1), status__in=['pending', 'approved']).exists())
+        # Power seller: toko terbesar memegang porsi produk jauh di atas rata-rata
+        sizes = sorted(Shop.objects.annotate(total=models.Count('products')).values_list('total', flat=True))
+        self.assertGreater(sizes[-1], 3 * sum(sizes) / len(sizes))
+        # Produk populer: 10% produk teratas menerima lebih dari 30% baris order
+        per_product = sorted(OrderItem.objects.values('product').annotate(total=models.Count('id')).values_list('total', flat=True))
+        self.assertGreater(sum(per_product[-20:]), 0.3 * sum(per_product))
+        # Trigger FTS terpasang kembali dan indeks sudah dibangun ulang
+        product = Product.objects.filter(status='approved').last()
+        self.assertIn(product.pk, [row[0].pk for row in search_products(product.name, status='approved', limit=500)])
+        Product.objects.create(shop=product.shop, name='Zyxwv Unik', price=1, status='approved')
+        self.assertEqual(len(search_products('zyxwv')), 1)
+
+
+class ProductShopSerializer(serializers.ModelSerializer):
+    shop_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Product
+        fields = ['id', 'shop_name']
+
+    def get_shop_name(self, obj):
+        return Shop.objects.get(pk=obj.shop_id).shop_name  # N+1 yang disengaja
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'], CATALOG_CACHE={'ENABLED': False})
+class NPlusOneDetectorTests(APITestCase):
+
+    def setUp(self):
+        temporary_exports(self)
+        self.dataset = benchmarks.seed()
+
+    def test_normalize(self):
+        self.assertEqual(
+            nplusone.normalize("SELECT * FROM t WHERE id IN (%s, %s,%s) AND name = 'a''b' LIMIT 21"),
+            nplusone.normalize("SELECT * FROM t\n WHERE id IN (%s) AND name = 'x' LIMIT 1"),
+        )
+
+    def test_reports_view_field_and_frame(self):
+        products = Product.objects.all()[:6]
+        with self.assertRaises(nplusone.NPlusOneError):
+            with nplusone.detect(action='raise'):
+                ProductShopSerializer(products, many=True).data
+
+        with self.assertLogs('melar_project.nplusone', 'WARNING'):
+            with nplusone.detect(action='log') as detector:
+                ProductShopSerializer(products, many=True).data
+        offender, = detector.offenders.values()
+        self.assertEqual(offender.count, 6)
+        self.assertEqual(offender.field, 'ProductShopSerializer.shop_name')
+        self.assertTrue(offender.frame.startswith('rentals/tests.py:'))
+        self.assertTrue(offender.frame.endswith('in get_shop_name'))
+
+        with nplusone.detect(action='raise', allowlist=['ProductShopSerializer.*']) as detector:
+            ProductShopSerializer(products, many=True).data
+        self.assertEqual(detector.offenders, {})
+
+    @override_settings(NPLUSONE={'ENABLED': True, 'ACTION': 'log', 'THRESHOLD': 3})
+    def test_middleware_counts_per_request(self):
+        def product_shops(request):
+            return HttpResponse(len(ProductShopSerializer(Product.objects.all()[:6], many=True).data))
+
+        def get_response(request):
+            middleware.process_view(request, product_shops, (), {})
+            return product_shops(request)
+
+        middleware = nplusone.NPlusOneMiddleware(get_response)
+        with self.assertLogs('melar_project.nplusone', 'WARNING') as logs:
+            middleware(RequestFactory().get('/produk-toko/'))
+        self.assertIn('product_shops', logs.output[0])
+        self.assertIn('ProductShopSerializer.shop_name', logs.output[0])
+
+    def test_api_has_no_n_plus_one(self):
+        # Setiap route (skenario benchmark) dengan dataset berisi banyak baris per daftar
+        with nplusone.detect(action='log') as detector:
+            benchmarks.run(benchmarks.SCENARIOS, self.dataset, iterations=1, warmup=0, memory_iterations=1)
+        self.assertEqual([str(offender) for offender in detector.offenders.values()], [])
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ExportJobTests(APITestCase):
+
+    def setUp(self):
+        self.directory = temporary_exports(self)
+        self.admin = User.objects.create_user(
+            username='reporter', email='reporter@gmail.com', password='password123', is_staff=True,
+        )
+        self.customer = User.objects.create_user(username='penyewa', email='penyewa@gmail.com', password='password123')
+        self.shop = Shop.objects.create(user=self.admin, shop_name="Export Shop", address="Jl. Test", postal_code="12345", contact="0800")
+        self.product = Product.objects.create(shop=self.shop, name="Tenda", price=100)
+        orders = Order.objects.bulk_create([
+            Order(user=self.customer, total_price=100 * i, borrow_date="2026-12-01", return_deadline="2026-12-03")
+            for i in range(1, 8)
+        ])
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, product=self.product, quantity=1, price=100, total_price=100) for order in orders for _ in range(2)
+        ])
+        Shipping.objects.create(order=orders[0], address="Jl. Kirim", postal_code="40111", phone_number="0812", user_name="Penyewa")
+        self.orders = orders
+
+    def _auth(self, user):
+        return {'HTTP_AUTHORIZATION': f'Bearer {AccessToken.for_user(user)}'}
+
+    def _read(self, job):
+        with gzip.open(exports.file_path(job), 'rt') as f:
+            return f.read()
+
+    def test_create_poll_and_download(self):
+        url = reverse('export-list')
+        self.assertEqual(self.client.post(url, {'kind': 'orders'}, **self._auth(self.customer)).status_code, status.HTTP_403_FORBIDDEN)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(url, {'kind': 'orders', 'format': 'csv'}, **self._auth(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertIsNone(response.data['download_url'])
+        detail = reverse('export-detail', args=[response.data['id']])
+        download = reverse('export-download', args=[response.data['id']])
+        self.assertEqual(self.client.get(download, **self._auth(self.admin)).status_code, status.HTTP_409_CONFLICT)
+
+        self.assertTrue(exports.run_job(response.data['id']))
+        job = self.client.get(detail, **self._auth(self.admin)).data
+        self.assertEqual((job['status'], job['rows'], job['total']), ('completed', 7, 7))
+        self.assertTrue(job['download_url'].endswith(download))
+
+        full = self.client.get(download, **self._auth(self.admin))
+        self.assertEqual(full.status_code, status.HTTP_200_OK)
+        body = b''.join(full.streaming_content)
+        self.assertEqual(len(body), job['size'])
+        lines = gzip.decompress(body).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'user_id', 'user_email'])
+        first = lines[1].split(',')
+        self.assertEqual(first[:4], [str(self.orders[0].id), str(self.customer.id), 'penyewa@gmail.com', 'pending'])
+        self.assertEqual(first[7:9], ['2', 'Penyewa'])  # item_count dan shipping_name dari join datar
+
+        # Unduhan bertahap dengan Range
+        part = self.client.get(download, HTTP_RANGE='bytes=10-', **self._auth(self.admin))
+        self.assertEqual(part.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(part['Content-Range'], f"bytes 10-{len(body) - 1}/{len(body)}")
+        self.assertEqual(b''.join(part.streaming_content), body[10:])
+        tail = self.client.get(download, HTTP_RANGE='bytes=-5', **self._auth(self.admin))
+        self.assertEqual(b''.join(tail.streaming_content), body[-5:])
+        invalid = self.client.get(download, HTTP_RANGE=f'bytes={len(body)}-', **self._auth(self.admin))
+        self.assertEqual(invalid.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        # Job milik staff lain tidak terlihat
+        other = User.objects.create_user(username='lain', email='lain@gmail.com', password='password123', is_staff=True)
+        self.assertEqual(self.client.get(detail, **self._auth(other)).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_resume_from_checkpoint(self):
+        job = ExportJob.objects.create(user=self.admin, kind='orders', format='jsonl')
+        calls = 0
+        original = exports._write_member
+
+        def crash_on_third_chunk(file, data):
+            nonlocal calls
+            calls += 1
+            if calls == 3:
+                file.write(b'member setengah jadi')  # Proses mati di tengah penulisan chunk
+                raise OSError("disk penuh")
+            return original(file, data)
+
+        with self.settings(EXPORTS={**settings.EXPORTS, 'CHUNK_SIZE': 3}):
+            exports._write_member = crash_on_third_chunk
+            try:
+                with self.assertRaises(OSError):
+                    exports.run_job(job.pk)
+            finally:
+                exports._write_member = original
+            job.refresh_from_db()
+            self.assertEqual((job.status, job.rows, job.last_id), ('failed', 6, self.orders[5].id))
+
+            # Worker mati saat running: job basi diambil alih dan dilanjutkan dari checkpoint
+            ExportJob.objects.filter(pk=job.pk).update(status='running', heartbeat_at=timezone.now() - timedelta(hours=1))
+            self.assertEqual(exports.claimable_ids(), [job.pk])
+            with CaptureQueriesContext(connection) as queries:
+                self.assertTrue(exports.run_job(job.pk))
+            self.assertFalse(exports.run_job(job.pk))  # Sudah selesai, tidak diklaim lagi
+        self.assertTrue(any(f'"rentals_order"."id" > {self.orders[5].id}' in query['sql'] for query in queries.captured_queries))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.rows), ('completed', 7))
+        rows = [json.loads(line) for line in self._read(job).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [order.id for order in self.orders])
+        self.assertEqual(rows[0]['shipping_postal_code'], '40111')
+        self.assertIsNone(rows[1]['shipping_postal_code'])
+
+    def test_stale_takeover_fences_old_worker(self):
+        job = ExportJob.objects.create(user=self.admin, kind='orders', format='jsonl')
+        calls = 0
+        original = exports._write_member
+        owners = []
+
+        def taken_over_on_second_chunk(file, data):
+            nonlocal calls
+            calls += 1
+            if calls == 2:
+                # Worker ini dianggap macet dan job diklaim ulang worker lain
+                ExportJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+                owners.append(exports.claim(job.pk))
+            return original(file, data)
+
+        with self.settings(EXPORTS={**settings.EXPORTS, 'CHUNK_SIZE': 3}):
+            exports._write_member = taken_over_on_second_chunk
+            try:
+                self.assertFalse(exports.run_job(job.pk))
+            finally:
+                exports._write_member = original
+            job.refresh_from_db()
+            self.assertIsNotNone(owners[0])
+            # Checkpoint worker lama ditolak dan status tidak ditandai failed
+            self.assertEqual((job.status, job.owner, job.rows, job.last_id), ('running', owners[0], 3, self.orders[2].id))
+
+            ExportJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+            self.assertTrue(exports.run_job(job.pk))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.rows), ('completed', 7))
+        self.assertNotEqual(job.owner, owners[0])
+        rows = [json.loads(line) for line in self._read(job).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [order.id for order in self.orders])
+
+    def test_active_job_limit(self):
+        ExportJob.objects.bulk_create([ExportJob(user=self.admin, kind='users') for _ in range(3)])
+        response = self.client.post(reverse('export-list'), {'kind': 'users'}, **self._auth(self.admin))
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
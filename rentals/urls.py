@@ -1,12 +1,15 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import CartViewSet, OrderViewSet, ShippingViewSet
+from .views import AvailabilityView, CartViewSet, ExportJobViewSet, OrderViewSet, QuoteView, ShippingViewSet
 
 router = DefaultRouter()
 router.register(r'cart', CartViewSet, basename='cart')
 router.register(r'order', OrderViewSet, basename='order')
 router.register(r'shipping', ShippingViewSet, basename='shipping')
+router.register(r'exports', ExportJobViewSet, basename='export')
 
 urlpatterns = [
+    path('availability/', AvailabilityView.as_view(), name='availability'),
+    path('quote/', QuoteView.as_view(), name='quote'),
     path('', include(router.urls)),
 ]
@@ -1,42 +1,85 @@
-from rest_framework import viewsets
-from rest_framework.permissions import IsAuthenticated
+import os
+import re
+
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from rest_framework import mixins, viewsets
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from melar_project.conditional import ConditionalGetMixin
+from melar_project.mixins import QueryPlanMixin
+from melar_project.sqlite import write_transaction
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from .models import Cart, Order, Shipping
-from .serializers import CartSerializer, OrderSerializer, ShippingSerializer
+from .models import Cart, ExportJob, Order, Shipping
+from shops.pricing import quote
+from .serializers import (
+    AvailabilityQuerySerializer, CartBulkSerializer, CartSerializer, CheckoutSerializer, ExportJobSerializer, OrderSerializer,
+    QuoteSerializer, ShippingSerializer,
+)
+from .availability import availability
+from .cart import cart_summary, upsert_lines
+from .checkout import CheckoutError, checkout_cart
+from . import exports
 from .permissions import IsOrderOwnerOrReadOnly, IsOwnerOrReadOnly
 
 
-class CartViewSet(viewsets.ModelViewSet):
+class CartViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Cart.objects.all()
     serializer_class = CartSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = None  # Keranjang milik satu user selalu dikembalikan utuh
 
     def get_queryset(self):
         return Cart.objects.filter(user=self.request.user)
 
-    def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+    def perform_update(self, serializer):
+        with write_transaction():
+            serializer.save()
+
+    def perform_destroy(self, instance):
+        with write_transaction():
+            instance.delete()
+
+    def create(self, request, *args, **kwargs):
+        # Produk yang sudah ada di keranjang menambah quantity, bukan membuat baris baru
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        product = serializer.validated_data['product']
+        upsert_lines(request.user, [(product.id, serializer.validated_data.get('quantity', 1))])
+        line = Cart.objects.get(user=request.user, product=product)
+        return Response(self.get_serializer(line).data, status=201)
 
     @action(detail=False, methods=['post'])
-    def checkout(self, request):
-        user_cart = Cart.objects.filter(user=request.user)
-        if not user_cart.exists():
-            return Response({"detail": "Cart is empty"}, status=400)
-
-        total_price = sum(item.product.price * item.quantity for item in user_cart)
-        order = Order.objects.create(
-            user=request.user,
-            total_price=total_price,
-            borrow_date=request.data.get('borrow_date'),
-            return_deadline=request.data.get('return_deadline'),
+    def bulk(self, request):
+        serializer = CartBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upsert_lines(
+            request.user,
+            [(line['product'], line['quantity']) for line in serializer.validated_data['lines']],
+            mode=serializer.validated_data['mode'],
         )
-        order.cart_items.set(user_cart)
-        user_cart.delete()
+        lines = self.get_queryset().order_by('id')
+        return Response({
+            "lines": CartSerializer(lines, many=True).data,
+            "summary": cart_summary(request.user),
+        })
+
+    @action(detail=False, methods=['get'])
+    def summary(self, request):
+        return Response(cart_summary(request.user))
+
+    @action(detail=False, methods=['post'])
+    def checkout(self, request):
+        serializer = CheckoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            order = checkout_cart(request.user, **serializer.validated_data)
+        except CheckoutError as e:
+            return Response({"detail": str(e)}, status=400)
         return Response({"detail": "Order created", "order_id": order.id}, status=201)
 
 
-class OrderViewSet(viewsets.ModelViewSet):
+class OrderViewSet(ConditionalGetMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
     permission_classes = [IsAuthenticated, IsOrderOwnerOrReadOnly]
@@ -76,7 +119,153 @@ class OrderViewSet(viewsets.ModelViewSet):
         return Response({"detail": "Order confirmed as borrowed"}, status=200)
 
 
-class ShippingViewSet(viewsets.ModelViewSet):
+class ShippingViewSet(QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Shipping.objects.all()
     serializer_class = ShippingSerializer
     permission_classes = [IsAuthenticated, IsOrderOwnerOrReadOnly]
+    keyset_ordering = ('-id',)  # Shipping tidak memiliki created_at
+
+
+class AvailabilityView(APIView):
+    """Kalender ketersediaan: rentang bebas dan sibuk untuk satu atau beberapa produk."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        query = AvailabilityQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        product_ids = query.validated_data['product']
+        calendar = availability(product_ids, query.validated_data['start'], query.validated_data['end'])
+        return Response({
+            "start": query.validated_data['start'],
+            "end": query.validated_data['end'],
+            "products": [{"product": product_id, **calendar[product_id]} for product_id in product_ids],
+        })
+
+
+class QuoteView(APIView):
+    """
+    Harga banyak baris sekaligus dengan diskon terbaik yang berlaku pada tanggal mulai sewa.
+
+    Tanpa `lines`, seluruh keranjang user dihitung untuk rentang `start`-`end`.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = QuoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+        if 'lines' in data:
+            lines = data['lines']
+        else:
+            lines = [
+                {**line, 'start': data['start'], 'end': data['end']}
+                for line in Cart.objects.filter(user=request.user).order_by('id').values('product', 'quantity')
+            ]
+            if not lines:
+                return Response({"detail": "Cart is empty"}, status=400)
+
+        quotes = quote([(line['product'], line['quantity'], line['start']) for line in lines])
+        missing = sorted({line['product'] for line, result in zip(lines, quotes) if result is None})
+        if missing:
+            return Response({"detail": f"Product not found: {', '.join(map(str, missing))}"}, status=400)
+
+        results = [
+            {
+                "product": line['product'],
+                "quantity": line['quantity'],
+                "start": line['start'],
+                "end": line['end'],
+                "price": result['price'],
+                "discount_code": result['discount_code'],
+                "discount_percentage": result['discount_percentage'],
+                "unit_price": result['unit_price'],
+                "total_price": result['total_price'],
+            }
+            for line, result in zip(lines, quotes)
+        ]
+        return Response({
+            "lines": results,
+            "total_price": sum(result['total_price'] for result in results),
+        })
+
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def _file_range(file, start, length, block_size=64 * 1024):
+    try:
+        file.seek(start)
+        while length > 0:
+            data = file.read(min(block_size, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        file.close()
+
+
+class ExportJobViewSet(QueryPlanMixin, mixins.CreateModelMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin,
+                       viewsets.GenericViewSet):
+    """
+    Ekspor orders/products/users ke CSV atau JSONL (gzip) di latar belakang.
+
+    POST membuat job dan langsung kembali 202; klien memantau status lewat detail
+    lalu mengunduh file lewat `download`, yang mendukung header `Range` agar file
+    besar bisa diunduh bertahap atau dilanjutkan.
+    """
+    serializer_class = ExportJobSerializer
+    permission_classes = [IsAdminUser]
+    database_routing = 'primary'  # Progres ditulis worker latar; replika bisa tertinggal
+
+    def get_queryset(self):
+        return ExportJob.objects.filter(user=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        active = ExportJob.objects.filter(user=request.user, status__in=ExportJob.ACTIVE_STATUSES).count()
+        if active >= exports.get_config()['MAX_ACTIVE_PER_USER']:
+            return Response({"detail": "Too many export jobs in progress"}, status=429)
+        with write_transaction():
+            job = serializer.save(user=request.user)
+            exports.enqueue(job)
+        return Response(self.get_serializer(job).data, status=202)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != 'completed':
+            return Response({"detail": "Export is not finished yet"}, status=409)
+        path = exports.file_path(job)
+        if not os.path.exists(path):
+            return Response({"detail": "Export file is no longer available"}, status=410)
+
+        size = job.size
+        etag = f'"export-{job.pk}-{size}"'
+        match = RANGE.match(request.headers.get('Range', '').strip())
+        if_range = request.headers.get('If-Range')
+        if match is None or (if_range is not None and if_range != etag):
+            # Tanpa Range (atau banyak range / If-Range tidak cocok): seluruh file
+            response = FileResponse(open(path, 'rb'), as_attachment=True, filename=exports.file_name(job))
+            response['Content-Length'] = size
+        else:
+            first, last = match.groups()
+            if first:
+                start, end = int(first), min(int(last), size - 1) if last else size - 1
+            elif last:
+                start, end = max(size - int(last), 0), size - 1  # Suffix: N byte terakhir
+            else:
+                start, end = 1, 0
+            if start > end:
+                response = HttpResponse(status=416)
+                response['Content-Range'] = f'bytes */{size}'
+                return response
+            response = StreamingHttpResponse(_file_range(open(path, 'rb'), start, end - start + 1), status=206)
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+            response['Content-Length'] = end - start + 1
+            response['Content-Disposition'] = f'attachment; filename="{exports.file_name(job)}"'
+        response['Content-Type'] = 'application/gzip'
+        response['Accept-Ranges'] = 'bytes'
+        response['ETag'] = etag
+        return response
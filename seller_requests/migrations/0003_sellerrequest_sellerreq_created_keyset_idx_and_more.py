@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:26
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seller_requests', '0002_alter_sellerrequest_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sellerrequest',
+            index=models.Index(fields=['created_at', 'id'], name='sellerreq_created_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sellerrequest',
+            index=models.Index(fields=['user', 'created_at', 'id'], name='sellerreq_user_keyset_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('seller_requests', '0003_sellerrequest_sellerreq_created_keyset_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='sellerrequest',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='sellerreq_status_keyset_idx'),
+        ),
+    ]
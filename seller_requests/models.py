@@ -9,5 +9,12 @@ class SellerRequest(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='sellerreq_created_keyset_idx'),
+            models.Index(fields=['user', 'created_at', 'id'], name='sellerreq_user_keyset_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='sellerreq_status_keyset_idx'),  # Antrean moderasi
+        ]
+
     def __str__(self):
         return f"{self.user.email} - {self.status}"
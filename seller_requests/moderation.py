@@ -0,0 +1,42 @@
+from django.db import transaction
+from django.utils import timezone
+from melar_project.sqlite import write_transaction
+from users.claims import invalidate_user_claims
+from users.models import CustomUser
+from .models import SellerRequest
+
+DECISIONS = {'approve': 'approved', 'reject': 'rejected'}
+
+
+def moderate_seller_requests(ids, decision):
+    """
+    Terapkan `decision` (approve/reject) ke banyak permohonan seller sekaligus.
+
+    Satu transaksi dengan `UPDATE` berbasis himpunan: status permohonan, lalu
+    `is_seller` milik user yang disetujui. Hanya permohonan `pending` yang
+    diputuskan; id yang sudah diputuskan dilaporkan di `not_pending`, sehingga
+    menolak permohonan yang sudah disetujui tidak meninggalkan `is_seller=True`.
+    `update()` tidak memicu sinyal, jadi claim token user tersebut dibatalkan
+    manual setelah commit.
+    """
+    status = DECISIONS[decision]
+    now = timezone.now()
+    with write_transaction():
+        rows = list(SellerRequest.objects.filter(id__in=ids).values_list('id', 'user_id', 'status'))
+        pending = [(row_id, user_id) for row_id, user_id, row_status in rows if row_status == 'pending']
+        found = [row_id for row_id, _ in pending]
+        SellerRequest.objects.filter(id__in=found, status='pending').update(status=status, updated_at=now)
+        user_ids = []
+        if status == 'approved':
+            user_ids = list(
+                CustomUser.objects.filter(id__in={user_id for _, user_id in pending}, is_seller=False)
+                .values_list('id', flat=True)
+            )
+            CustomUser.objects.filter(id__in=user_ids).update(is_seller=True, updated_at=now)
+        transaction.on_commit(lambda: [invalidate_user_claims(user_id) for user_id in user_ids])
+    return {
+        'updated': len(found),
+        'missing': sorted(set(ids) - {row_id for row_id, _, _ in rows}),
+        'not_pending': sorted(row_id for row_id, _, row_status in rows if row_status != 'pending'),
+        'sellers_added': len(user_ids),
+    }
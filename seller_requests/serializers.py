@@ -2,8 +2,18 @@
 
 from rest_framework import serializers
 from .models import SellerRequest
+from .moderation import DECISIONS
 
 class SellerRequestSerializer(serializers.ModelSerializer):
     class Meta:
         model = SellerRequest
         fields = '__all__'
+
+
+class SellerRequestModerationSerializer(serializers.Serializer):
+    MAX_IDS = 5000
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=MAX_IDS
+    )
+    decision = serializers.ChoiceField(choices=sorted(DECISIONS))
@@ -62,3 +62,66 @@ class SellerRequestTests(TestCase):
         self.assertEqual(self.seller_request.status, 'approved', 
                          f"Expected seller request status to be 'approved', but got '{self.seller_request.status}'.")
         print(f"Admin {self.admin_user.email} successfully updated seller request to approved.")
+
+
+class SellerRequestModerationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = CustomUser.objects.create_user(
+            email='admin@example.com', username='admin', password='password', role='admin'
+        )
+        self.users = [
+            CustomUser.objects.create_user(email=f'user{i}@example.com', username=f'user{i}', password='password')
+            for i in range(30)
+        ]
+        self.requests = [SellerRequest.objects.create(user=user) for user in self.users]
+        self.url = '/api/moderation/seller-requests/'
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_queue_lists_pending_oldest_first_with_keyset(self):
+        SellerRequest.objects.filter(id=self.requests[0].id).update(status='approved')
+        response = self.client.get(self.url, {'page_size': 20})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [row['id'] for row in response.data['results']]
+        self.assertEqual(ids, [request.id for request in self.requests[1:21]])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([row['id'] for row in response.data['results']], [r.id for r in self.requests[21:]])
+        self.assertIsNone(response.data['next'])
+
+    def test_bulk_approve_updates_requests_and_users(self):
+        ids = [request.id for request in self.requests]
+        # select permohonan, update permohonan, select user, update user + savepoint
+        with self.assertNumQueries(6):
+            response = self.client.post(self.url, {'ids': ids + [999999], 'decision': 'approve'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 30)
+        self.assertEqual(response.data['missing'], [999999])
+        self.assertEqual(response.data['sellers_added'], 30)
+        self.assertFalse(SellerRequest.objects.filter(status='pending').exists())
+        self.assertEqual(CustomUser.objects.filter(is_seller=True).count(), 30)
+
+    def test_bulk_reject_keeps_users(self):
+        ids = [request.id for request in self.requests[:5]]
+        response = self.client.post(self.url, {'ids': ids, 'decision': 'reject'}, format='json')
+        self.assertEqual(response.data['updated'], 5)
+        self.assertEqual(SellerRequest.objects.filter(status='rejected').count(), 5)
+        self.assertFalse(CustomUser.objects.filter(is_seller=True).exists())
+
+    def test_rejecting_decided_request_keeps_seller(self):
+        first = self.requests[0].id
+        self.client.post(self.url, {'ids': [first], 'decision': 'approve'}, format='json')
+        response = self.client.post(self.url, {'ids': [first, self.requests[1].id], 'decision': 'reject'}, format='json')
+        self.assertEqual(response.data['updated'], 1)
+        self.assertEqual(response.data['not_pending'], [first])
+        self.assertEqual(response.data['missing'], [])
+        self.assertEqual(SellerRequest.objects.get(id=first).status, 'approved')
+        self.assertTrue(CustomUser.objects.get(id=self.users[0].id).is_seller)
+
+    def test_invalid_decision(self):
+        response = self.client.post(self.url, {'ids': [self.requests[0].id], 'decision': 'block'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_non_admin_forbidden(self):
+        self.client.force_authenticate(user=self.users[0])
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
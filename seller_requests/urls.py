@@ -2,11 +2,12 @@
 
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import SellerRequestViewSet
+from .views import SellerRequestModerationView, SellerRequestViewSet
 
 router = DefaultRouter()
 router.register(r'seller-requests', SellerRequestViewSet)
 
 urlpatterns = [
+    path('moderation/seller-requests/', SellerRequestModerationView.as_view(), name='moderation-seller-requests'),
     path('', include(router.urls)),
 ]
@@ -1,7 +1,8 @@
-from rest_framework import viewsets, permissions, status
+from rest_framework import generics, viewsets, permissions, status
 from rest_framework.response import Response
 from .models import SellerRequest
-from .serializers import SellerRequestSerializer
+from .moderation import moderate_seller_requests
+from .serializers import SellerRequestModerationSerializer, SellerRequestSerializer
 from users.permissions import IsAdmin  # Pastikan Anda memiliki permission ini
 
 class SellerRequestViewSet(viewsets.ModelViewSet):
@@ -14,14 +15,12 @@ class SellerRequestViewSet(viewsets.ModelViewSet):
         status = request.data.get('status')
 
         if status in ['approved', 'rejected']:
-            instance.status = status
-            instance.save()
-
-            # Update user status jika disetujui
-            if status == 'approved':
-                instance.user.is_seller = True
-                instance.user.save()  # Simpan perubahan pada user
-
+            # Status permohonan dan is_seller user diperbarui dalam satu transaksi
+            result = moderate_seller_requests([instance.id], 'approve' if status == 'approved' else 'reject')
+            if result['not_pending']:
+                # `status` di sini nilai dari request, bukan modul rest_framework.status
+                return Response({'error': 'Request has already been decided'}, status=400)
+            instance.refresh_from_db()
             serializer = self.get_serializer(instance)
             return Response(serializer.data)
 
@@ -33,3 +32,22 @@ class SellerRequestViewSet(viewsets.ModelViewSet):
         if user.role == 'admin':
             return SellerRequest.objects.all()
         return SellerRequest.objects.filter(user=user)
+
+
+class SellerRequestModerationView(generics.ListAPIView):
+    """
+    Antrean moderasi admin: GET menampilkan permohonan pending (terlama dulu,
+    keyset di atas indeks `(status, created_at, id)`), POST menerapkan
+    `{"ids": [...], "decision": "approve"|"reject"}` ke semua id sekaligus.
+    """
+    serializer_class = SellerRequestSerializer
+    permission_classes = [IsAdmin]
+    keyset_ordering = ('created_at', 'id')
+
+    def get_queryset(self):
+        return SellerRequest.objects.filter(status='pending')
+
+    def post(self, request):
+        serializer = SellerRequestModerationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(moderate_seller_requests(**serializer.validated_data))
@@ -0,0 +1,125 @@
+from django.http import HttpResponse
+from rest_framework import exceptions, status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from melar_project.cache import aresponse_key, get_cache, get_config
+from melar_project.mixins import plan_serializer
+from melar_project.pagination import KeysetPagination
+from melar_project.routers import PRIMARY, use_database
+from users.authentication import ClaimsJWTAuthentication
+from .filters import afacet_counts, filter_products
+from .models import Product, Shop
+from .serializers import CategorySerializer, ProductFilterSerializer, ProductSerializer, ShopSerializer
+from .views import category_queryset
+
+# View async native untuk endpoint baca katalog yang paling sering dipanggil.
+# Di bawah ASGI view ini berjalan langsung di event loop: autentikasi claim dan
+# cache memakai API async, query ORM async dijalankan di executor sehingga loop
+# tetap melayani request lain. ORM async Django menjalankan query satu per satu
+# di thread yang sama, jadi query dalam satu request tidak dibuat paralel.
+# Isi respons sama dengan viewset sync pada path tanpa prefix `async/`.
+
+
+def render(data, status_code=200, headers=None):
+    response = HttpResponse(JSONRenderer().render(data), status=status_code, content_type='application/json')
+    for name, value in (headers or {}).items():
+        response[name] = value
+    return response
+
+
+def unauthorized(detail):
+    return render(detail, status.HTTP_401_UNAUTHORIZED, {'WWW-Authenticate': 'Bearer realm="api"'})
+
+
+def read_only(view):
+    """Autentikasi JWT dan batasi ke GET; request DRF (tanpa autentikasi ulang) diteruskan ke view."""
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return render({'detail': 'Method "%s" not allowed.' % request.method}, status.HTTP_405_METHOD_NOT_ALLOWED)
+        try:
+            result = await ClaimsJWTAuthentication().aauthenticate(request)
+        except exceptions.AuthenticationFailed as e:
+            return unauthorized(e.detail if isinstance(e.detail, dict) else {'detail': e.detail})
+        if result is None:
+            return unauthorized({'detail': 'Authentication credentials were not provided.'})
+        drf_request = Request(request)
+        drf_request.user, drf_request.auth = result
+        return await view(drf_request, *args, **kwargs)
+    return wrapper
+
+
+async def cached(resource, request, compute, pk=None, per_user=False):
+    """Read-through cache respons dengan key dan versi invalidasi yang sama seperti `CachedResponseMixin`."""
+    if not get_config()['ENABLED']:
+        status_code, data = await compute()
+        return render(data, status_code)
+    key = await aresponse_key(resource, request, pk=pk, scope=request.user.pk if per_user else None, validator='async')
+    cache = get_cache()
+    entry = await cache.aget(key)
+    hit = entry is not None
+    if not hit:
+        # Sama seperti CachedResponseMixin: entri cache hanya diisi dari primary
+        with use_database(PRIMARY):
+            entry = await compute()
+        if entry[0] == 200:
+            await cache.aset(key, entry, get_config()['TIMEOUT'])
+    return render(entry[1], entry[0], {'X-Cache': 'HIT' if hit else 'MISS'})
+
+
+def product_queryset(user):
+    queryset = Product.objects.filter(shop__user=user)
+    return plan_serializer(ProductSerializer(), Product).apply(queryset)
+
+
+@read_only
+async def product_list(request):
+    params = ProductFilterSerializer(data=request.query_params)
+    if not params.is_valid():
+        return render(params.errors, status.HTTP_400_BAD_REQUEST)
+
+    async def compute():
+        queryset = filter_products(product_queryset(request.user), params.validated_data)
+        paginator = KeysetPagination()
+        rows = await paginator.apaginate_queryset(queryset, request)
+        facets = await afacet_counts(
+            filter_products(Product.objects.filter(shop__user=request.user), params.validated_data),
+            params.validated_data['price_bucket_size'],
+        )
+        data = paginator.get_paginated_response(ProductSerializer(rows, many=True).data).data
+        data['facets'] = facets
+        return 200, data
+
+    return await cached('product', request, compute, per_user=True)
+
+
+@read_only
+async def product_detail(request, pk):
+    async def compute():
+        product = await product_queryset(request.user).filter(pk=pk).afirst()
+        if product is None:
+            return 404, {'detail': 'No Product matches the given query.'}
+        return 200, ProductSerializer(product).data
+
+    return await cached('product', request, compute, pk=pk, per_user=True)
+
+
+@read_only
+async def category_list(request):
+    async def compute():
+        paginator = KeysetPagination()
+        rows = await paginator.apaginate_queryset(category_queryset(request), request)
+        data = CategorySerializer(rows, many=True, context={'request': request}).data
+        return 200, paginator.get_paginated_response(data).data
+
+    return await cached('category', request, compute)
+
+
+@read_only
+async def shop_detail(request, pk):
+    async def compute():
+        shop = await Shop.objects.filter(user=request.user, pk=pk).afirst()
+        if shop is None:
+            return 404, {'detail': 'No Shop matches the given query.'}
+        return 200, ShopSerializer(shop).data
+
+    return await cached('shop', request, compute, pk=pk, per_user=True)
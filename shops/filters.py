@@ -0,0 +1,81 @@
+from django.db.models import CharField, Count, F, IntegerField, Value
+from django.db.models.functions import Cast, Floor
+from .models import Product
+
+
+def filter_products(queryset, params):
+    """Terapkan filter katalog yang sudah divalidasi `ProductFilterSerializer`."""
+    if 'min_price' in params:
+        queryset = queryset.filter(price__gte=params['min_price'])
+    if 'max_price' in params:
+        queryset = queryset.filter(price__lte=params['max_price'])
+    if 'category' in params:
+        queryset = queryset.filter(categories__id=params['category'])
+    if 'shop' in params:
+        queryset = queryset.filter(shop_id=params['shop'])
+    if 'availability_status' in params:
+        queryset = queryset.filter(availability_status=params['availability_status'])
+    if 'status' in params:
+        queryset = queryset.filter(status=params['status'])
+    if params.get('shop_active') is not None:
+        queryset = queryset.filter(shop__is_active=params['shop_active'])
+    return queryset
+
+
+def facet_counts(queryset, price_bucket_size):
+    """
+    Hitung facet kategori, status ketersediaan dan histogram harga dalam satu query.
+
+    Ketiga GROUP BY digabung dengan UNION ALL di atas subquery id produk yang sudah
+    difilter, sehingga sidebar filter cukup satu round-trip ke database.
+    """
+    return collect_facets(facet_queryset(queryset, price_bucket_size), price_bucket_size)
+
+
+async def afacet_counts(queryset, price_bucket_size):
+    rows = [row async for row in facet_queryset(queryset, price_bucket_size)]
+    return collect_facets(rows, price_bucket_size)
+
+
+def facet_queryset(queryset, price_bucket_size):
+    """Query UNION ALL `(facet, key, total)` untuk `facet_counts`."""
+    product_ids = queryset.order_by().values('id')
+    through = Product.categories.through
+
+    categories = (
+        through.objects.filter(product_id__in=product_ids)
+        .annotate(facet=Value('category'), key=Cast('category_id', CharField()))
+        .values_list('facet', 'key')
+        .annotate(total=Count('*'))
+        .order_by()
+    )
+    availability = (
+        Product.objects.filter(id__in=product_ids)
+        .annotate(facet=Value('availability_status'), key=F('availability_status'))
+        .values_list('facet', 'key')
+        .annotate(total=Count('*'))
+        .order_by()
+    )
+    prices = (
+        Product.objects.filter(id__in=product_ids)
+        .annotate(
+            facet=Value('price'),
+            key=Cast(Cast(Floor(F('price') / price_bucket_size), IntegerField()), CharField()),
+        )
+        .values_list('facet', 'key')
+        .annotate(total=Count('*'))
+        .order_by()
+    )
+    return categories.union(availability, prices, all=True)
+
+
+def collect_facets(rows, price_bucket_size):
+    facets = {'category': {}, 'availability_status': {}, 'price': []}
+    for facet, key, total in rows:
+        if facet == 'price':
+            lower = int(key) * price_bucket_size
+            facets['price'].append({'min': lower, 'max': lower + price_bucket_size, 'count': total})
+        else:
+            facets[facet][key] = total
+    facets['price'].sort(key=lambda bucket: bucket['min'])
+    return facets
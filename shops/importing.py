@@ -0,0 +1,306 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from melar_project.cache import invalidate
+from users.hashing import hash_passwords, hashing_pool
+from .models import Category, ImportCheckpoint, Product, Shop
+
+FORMATS = {'.csv': 'csv', '.jsonl': 'jsonl', '.ndjson': 'jsonl'}
+CATEGORY_SEPARATOR = '|'  # Pemisah nama kategori di kolom CSV `categories`
+
+
+def detect_format(path):
+    return FORMATS.get(os.path.splitext(path)[1].lower())
+
+
+def read_records(path, fmt):
+    """Baca `(nomor_baris, dict)` satu per satu sehingga memori tetap konstan berapa pun ukuran file."""
+    with open(path, newline='', encoding='utf-8') as handle:
+        if fmt == 'csv':
+            reader = csv.DictReader(handle)
+            for record in reader:
+                yield reader.line_num, record
+        else:
+            for line_no, line in enumerate(handle, start=1):
+                if line.strip():
+                    yield line_no, json.loads(line)
+
+
+def resolve_categories(names):
+    """
+    Petakan nama kategori ke id dengan query berbasis himpunan.
+
+    Kategori yang belum ada dibuat sekaligus dengan `bulk_create`; konflik dari
+    proses lain diabaikan lalu id-nya dibaca ulang.
+    """
+    names = {name.strip() for name in names if name and name.strip()}
+    if not names:
+        return {}
+    found = dict(Category.objects.filter(name__in=names).values_list('name', 'id'))
+    missing = names - found.keys()
+    if missing:
+        Category.objects.bulk_create([Category(name=name) for name in missing], ignore_conflicts=True)
+        found.update(Category.objects.filter(name__in=missing).values_list('name', 'id'))
+    return found
+
+
+def insert_products(products, category_ids):
+    """
+    `bulk_create` produk beserta baris relasi kategorinya.
+
+    `category_ids` sejajar dengan `products` (himpunan id kategori per produk).
+    Sinyal m2m tidak terpicu, jadi `updated_at` kategori yang tersentuh diperbarui
+    di sini agar ETag-nya berubah; cache katalog dibuang dengan `invalidate_products`.
+    """
+    Product.objects.bulk_create(products)
+    through = Product.categories.through
+    through.objects.bulk_create([
+        through(product_id=product.id, category_id=category_id)
+        for product, ids in zip(products, category_ids)
+        for category_id in ids
+    ])
+    touched = set().union(*category_ids) if category_ids else set()
+    if touched:
+        Category.objects.filter(pk__in=touched).update(updated_at=timezone.now())
+    return products
+
+
+def create_products(shop_id, items):
+    """
+    Buat produk dari data tervalidasi `ProductSerializer` untuk satu toko.
+
+    Semua nama kategori di-resolve sekaligus (satu select, satu bulk insert untuk
+    yang belum ada), lalu produk dan relasinya di-insert massal.
+    """
+    names = [[name.strip() for name in item.get('categories', []) if name.strip()] for item in items]
+    categories = resolve_categories(name for item_names in names for name in item_names)
+    products = [
+        Product(shop_id=shop_id, **{key: value for key, value in item.items() if key != 'categories'})
+        for item in items
+    ]
+    return insert_products(products, [{categories[name] for name in item_names} for item_names in names])
+
+
+def invalidate_products():
+    # bulk_create tidak memicu sinyal; buang cache produk dan resource yang menanamkannya
+    for resource in ('product', 'category', 'discount', 'inventory'):
+        invalidate(resource)
+
+
+def clean_fields(model, record, names):
+    """Validasi nilai `record` dengan field model (`Field.clean`), kumpulkan error per field."""
+    cleaned, errors = {}, {}
+    for name in names:
+        field = model._meta.get_field(name)
+        value = record.get(name)
+        if value in ('', None):
+            if field.has_default():
+                continue
+            value = None if field.null else ''
+        try:
+            cleaned[name] = field.clean(value, None)
+        except ValidationError as e:
+            errors[name] = e.messages
+    if errors:
+        raise ValidationError(errors)
+    return cleaned
+
+
+class BaseImporter:
+    model = None
+    fields = ()
+
+    def __init__(self, executor=None):
+        self.executor = executor
+
+    def clean(self, record):
+        return clean_fields(self.model, record, self.fields)
+
+    def write(self, rows):
+        """Tulis satu batch `[(line_no, record, cleaned)]`; kembalikan `(created, skipped, errors)`."""
+        raise NotImplementedError
+
+    def finish(self):
+        pass
+
+
+class UserImporter(BaseImporter):
+    model = get_user_model()
+    fields = ('email', 'username', 'full_name', 'role', 'is_seller')
+
+    def clean(self, record):
+        cleaned = super().clean(record)
+        cleaned['email'] = self.model.objects.normalize_email(cleaned['email'])
+        return cleaned
+
+    def write(self, rows):
+        User = self.model
+        emails = {cleaned['email'] for _, _, cleaned in rows}
+        usernames = {cleaned['username'] for _, _, cleaned in rows}
+        taken = set(User.objects.filter(email__in=emails).values_list('email', flat=True))
+        taken |= set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+
+        fresh, skipped, errors, seen = [], 0, [], set()
+        for line_no, record, cleaned in rows:
+            if cleaned['email'] in taken or cleaned['username'] in taken:
+                skipped += 1  # Sudah diimpor (mis. saat melanjutkan impor yang gagal)
+            elif cleaned['email'] in seen or cleaned['username'] in seen:
+                errors.append((line_no, {'email': ["Duplikat di dalam file."]}))
+            else:
+                seen.update((cleaned['email'], cleaned['username']))
+                fresh.append((record.get('password'), cleaned))
+
+        hashes = hash_passwords([password for password, _ in fresh], self.executor)
+        User.objects.bulk_create([
+            User(password=hashed, **cleaned) for hashed, (_, cleaned) in zip(hashes, fresh)
+        ])
+        return len(fresh), skipped, errors
+
+
+class ShopImporter(BaseImporter):
+    model = Shop
+    fields = ('shop_name', 'description', 'is_active', 'address', 'postal_code', 'contact')
+
+    def write(self, rows):
+        owners = dict(
+            get_user_model().objects.filter(email__in={record.get('owner_email') for _, record, _ in rows})
+            .values_list('email', 'id')
+        )
+        taken = set(
+            Shop.objects.filter(shop_name__in={cleaned['shop_name'] for _, _, cleaned in rows})
+            .values_list('shop_name', flat=True)
+        )
+        shops, skipped, errors, seen = [], 0, [], set()
+        for line_no, record, cleaned in rows:
+            owner_id = owners.get(record.get('owner_email'))
+            if cleaned['shop_name'] in taken:
+                skipped += 1
+            elif owner_id is None:
+                errors.append((line_no, {'owner_email': ["User pemilik tidak ditemukan."]}))
+            elif cleaned['shop_name'] in seen:
+                errors.append((line_no, {'shop_name': ["Duplikat di dalam file."]}))
+            else:
+                seen.add(cleaned['shop_name'])
+                shops.append(Shop(user_id=owner_id, **cleaned))
+        Shop.objects.bulk_create(shops)
+        return len(shops), skipped, errors
+
+    def finish(self):
+        invalidate('shop')
+
+
+class ProductImporter(BaseImporter):
+    model = Product
+    fields = ('name', 'description', 'price', 'availability_status', 'status')
+
+    @staticmethod
+    def category_names(record):
+        names = record.get('categories') or []
+        if isinstance(names, str):
+            names = names.split(CATEGORY_SEPARATOR)
+        return [name.strip() for name in names if name and name.strip()]
+
+    def write(self, rows):
+        shops = dict(
+            Shop.objects.filter(shop_name__in={record.get('shop_name') for _, record, _ in rows})
+            .values_list('shop_name', 'id')
+        )
+        categories = resolve_categories(name for _, record, _ in rows for name in self.category_names(record))
+
+        products, links, errors = [], [], []
+        for line_no, record, cleaned in rows:
+            shop_id = shops.get(record.get('shop_name'))
+            if shop_id is None:
+                errors.append((line_no, {'shop_name': ["Toko tidak ditemukan."]}))
+                continue
+            products.append(Product(shop_id=shop_id, **cleaned))
+            links.append({categories[name] for name in self.category_names(record)})
+
+        insert_products(products, links)
+        return len(products), 0, errors
+
+    def finish(self):
+        invalidate_products()
+
+
+IMPORTERS = {
+    'users': UserImporter,
+    'shops': ShopImporter,
+    'products': ProductImporter,
+}
+
+
+def load_state(state_key, kind, path):
+    checkpoint = ImportCheckpoint.objects.filter(key=state_key).first() if state_key else None
+    if checkpoint is None:
+        return 0
+    if checkpoint.kind != kind or checkpoint.path != os.path.abspath(path):
+        raise ValueError(f"Checkpoint {state_key} milik impor lain ({checkpoint.kind} {checkpoint.path}).")
+    return checkpoint.records
+
+
+def save_state(state_key, kind, path, records):
+    # Dipanggil di dalam transaksi batch: checkpoint dan baris batch commit (atau batal) bersama
+    ImportCheckpoint.objects.update_or_create(
+        key=state_key, defaults={'kind': kind, 'path': os.path.abspath(path), 'records': records},
+    )
+
+
+def run_import(kind, path, fmt=None, batch_size=2000, state_path=None, resume=False,
+               hash_workers=0, on_error=None, stdout=None):
+    """
+    Impor `kind` (users, shops, products) dari CSV/JSONL secara streaming.
+
+    Setiap batch divalidasi, di-resolve dengan lookup berbasis himpunan dan ditulis
+    dengan `bulk_create` dalam transaksinya sendiri. Jumlah record yang sudah
+    diproses disimpan sebagai `ImportCheckpoint` ber-key `state_path` di transaksi
+    yang sama, sehingga proses yang mati di antara commit dan checkpoint tidak
+    mungkin terjadi dan `resume=True` melanjutkan tepat setelah batch terakhir
+    yang commit tanpa menduplikasi baris.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt not in ('csv', 'jsonl'):
+        raise ValueError("Format harus csv atau jsonl.")
+    done = load_state(state_path, kind, path) if resume else 0
+    totals = {'created': 0, 'skipped': 0, 'failed': 0, 'resumed_from': done}
+
+    executor = hashing_pool(hash_workers) if kind == 'users' and hash_workers else None
+    importer = IMPORTERS[kind](executor=executor)
+    records = islice(read_records(path, fmt), done, None)
+    try:
+        while True:
+            batch = list(islice(records, batch_size))
+            if not batch:
+                break
+            rows, errors = [], []
+            for line_no, record in batch:
+                try:
+                    rows.append((line_no, record, importer.clean(record)))
+                except ValidationError as e:
+                    errors.append((line_no, e.message_dict))
+            with transaction.atomic():
+                created, skipped, write_errors = importer.write(rows) if rows else (0, 0, [])
+                if state_path:
+                    save_state(state_path, kind, path, done + len(batch))
+            errors.extend(write_errors)
+
+            done += len(batch)
+            totals['created'] += created
+            totals['skipped'] += skipped
+            totals['failed'] += len(errors)
+            if on_error is not None:
+                for line_no, messages in sorted(errors, key=lambda error: error[0]):
+                    on_error(line_no, messages)
+            if stdout is not None:
+                stdout.write(f"{done} record diproses ({totals['created']} dibuat, {totals['failed']} gagal)")
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    importer.finish()
+    return totals
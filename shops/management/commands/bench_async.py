@@ -0,0 +1,77 @@
+import asyncio
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import AsyncClient, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+from shops.models import Category, Product, Shop
+from users.claims import add_claims
+
+ENDPOINTS = ('products', 'product', 'categories', 'shop')
+
+
+async def run(client, url, headers, total, concurrency):
+    """Kirim `total` GET ke `url` dengan `concurrency` request berjalan bersamaan lewat handler ASGI."""
+    latencies, statuses = [], {}
+    queue = iter(range(total))
+
+    async def worker():
+        for _ in queue:
+            start = time.perf_counter()
+            response = await client.get(url, headers=headers)
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - start, sorted(latencies), statuses
+
+
+class Command(BaseCommand):
+    help = (
+        "Bandingkan request/detik dan latensi p99 jalur baca sync (DRF lewat adapter thread) "
+        "dengan jalur async native di bawah handler ASGI, pada konkurensi tinggi."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--endpoint', choices=ENDPOINTS, action='append', help="Bisa berulang (default semua)")
+        parser.add_argument('--requests', type=int, default=1000)
+        parser.add_argument('--concurrency', type=int, default=100)
+        parser.add_argument('--user', help="Email pemilik toko yang dipakai (default toko pertama)")
+        parser.add_argument('--cache', action='store_true', help="Aktifkan cache respons katalog")
+
+    def handle(self, *args, **options):
+        shops = Shop.objects.select_related('user').order_by('id')
+        shop = (shops.filter(user__email=options['user']) if options['user'] else shops).first()
+        product = Product.objects.filter(shop=shop).order_by('id').first() if shop else None
+        if product is None or not Category.objects.exists():
+            raise CommandError("Butuh toko dengan produk dan kategori di database (mis. dari import_catalog).")
+
+        token = add_claims(AccessToken.for_user(shop.user), shop.user)  # Jalur claim seperti token login
+        headers = {'Authorization': f'Bearer {token}'}
+        urls = {
+            'products': (reverse('product-list'), reverse('async-product-list')),
+            'product': (reverse('product-detail', args=[product.id]), reverse('async-product-detail', args=[product.id])),
+            'categories': (reverse('category-list'), reverse('async-category-list')),
+            'shop': (reverse('shop-detail', args=[shop.id]), reverse('async-shop-detail', args=[shop.id])),
+        }
+        overrides = {'DEBUG': False, 'ALLOWED_HOSTS': ['testserver']}
+        if not options['cache']:
+            overrides['CATALOG_CACHE'] = {'ENABLED': False}
+
+        with override_settings(**overrides):
+            client = AsyncClient()
+            for endpoint in options['endpoint'] or ENDPOINTS:
+                for label, url in zip(('sync', 'async'), urls[endpoint]):
+                    asyncio.run(run(client, url, headers, min(20, options['requests']), 5))  # Pemanasan
+                    elapsed, latencies, statuses = asyncio.run(
+                        run(client, url, headers, options['requests'], options['concurrency'])
+                    )
+                    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+                    self.stdout.write(
+                        f"{endpoint:<10} {label:<5} rps={len(latencies) / elapsed:8.1f} "
+                        f"p50={statistics.median(latencies) * 1000:7.1f}ms p99={p99 * 1000:7.1f}ms "
+                        f"status={statuses}"
+                    )
@@ -0,0 +1,76 @@
+import random
+import statistics
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand, CommandError
+from shops.pricing import DiscountIndex, price_lines
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark resolusi diskon di memori untuk banyak baris quote dengan data sintetis. Yang diukur "
+        "hanya lookup DiscountIndex yang sudah dibangun; memuat indeks dari database (pricing.get_index) "
+        "tidak termasuk. Gagal (exit bukan 0) jika p95 melewati --budget-ms."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lines', type=int, default=10000)
+        parser.add_argument('--products', type=int, default=5000)
+        parser.add_argument('--categories', type=int, default=200)
+        parser.add_argument('--discounts', type=int, default=2000)
+        parser.add_argument('--runs', type=int, default=20)
+        parser.add_argument('--budget-ms', type=float, default=50.0)
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        products, categories = options['products'], options['categories']
+        today = date(2025, 1, 1)
+
+        discounts = []
+        for i in range(options['discounts']):
+            valid_from = today + timedelta(days=rng.randint(-30, 60))
+            on_product = rng.random() < 0.5
+            discounts.append((
+                f'BENCH{i}',
+                Decimal(rng.randint(5, 50)),
+                valid_from,
+                valid_from + timedelta(days=rng.randint(0, 30)),
+                rng.randint(1, products) if on_product else None,
+                None if on_product else rng.randint(1, categories),
+            ))
+        prices = {product_id: Decimal(rng.randint(10, 1000)) for product_id in range(1, products + 1)}
+        product_categories = {
+            product_id: rng.sample(range(1, categories + 1), rng.randint(0, 3)) for product_id in prices
+        }
+        lines = [
+            (rng.randint(1, products), rng.randint(1, 5), today + timedelta(days=rng.randint(0, 60)))
+            for _ in range(options['lines'])
+        ]
+
+        start = time.perf_counter()
+        index = DiscountIndex(discounts)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        # Run pertama membangun timeline per produk (memo di indeks); dilaporkan terpisah
+        start = time.perf_counter()
+        price_lines(lines, prices, product_categories, index)
+        cold_ms = (time.perf_counter() - start) * 1000
+
+        timings = []
+        for _ in range(options['runs']):
+            start = time.perf_counter()
+            price_lines(lines, prices, product_categories, index)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"lines={len(lines)} discounts={len(discounts)} build={build_ms:.2f}ms cold={cold_ms:.2f}ms "
+            f"p50={statistics.median(timings):.2f}ms p95={p95:.2f}ms max={timings[-1]:.2f}ms"
+        )
+        if p95 > options['budget_ms']:
+            raise CommandError(f"p95 {p95:.2f}ms melebihi budget {options['budget_ms']:.0f}ms")
+        self.stdout.write(self.style.SUCCESS(f"Dalam budget {options['budget_ms']:.0f}ms"))
@@ -0,0 +1,60 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from shops.importing import IMPORTERS, run_import
+
+
+class Command(BaseCommand):
+    help = (
+        "Impor users, shops atau products dari CSV/JSONL secara streaming dengan bulk_create per batch. "
+        "Kolom users: email, username, full_name, password, role, is_seller. "
+        "Kolom shops: owner_email, shop_name, address, postal_code, contact, description, is_active. "
+        "Kolom products: shop_name, name, price, description, availability_status, status, "
+        "categories (list JSON atau nama dipisah '|' di CSV)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS))
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], help="Default dari ekstensi file")
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument(
+            '--state', help="Nama checkpoint di database untuk melanjutkan impor (default: <path>.import-state)",
+        )
+        parser.add_argument('--resume', action='store_true', help="Lanjutkan dari batch terakhir yang berhasil")
+        parser.add_argument('--hash-workers', type=int, default=0, help="Proses untuk hashing password user")
+        parser.add_argument('--errors', help="Tulis baris gagal ke file JSONL ini (default: stderr)")
+
+    def handle(self, *args, **options):
+        state_path = options['state'] or f"{options['path']}.import-state"
+        error_file = open(options['errors'], 'a', encoding='utf-8') if options['errors'] else None
+
+        def on_error(line_no, messages):
+            line = json.dumps({'line': line_no, 'errors': messages})
+            if error_file is not None:
+                error_file.write(line + '\n')
+            else:
+                self.stderr.write(line)
+
+        try:
+            totals = run_import(
+                options['kind'],
+                options['path'],
+                fmt=options['format'],
+                batch_size=options['batch_size'],
+                state_path=state_path,
+                resume=options['resume'],
+                hash_workers=options['hash_workers'],
+                on_error=on_error,
+                stdout=self.stdout if options['verbosity'] > 1 else None,
+            )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        finally:
+            if error_file is not None:
+                error_file.close()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{totals['created']} dibuat, {totals['skipped']} dilewati (sudah ada), "
+            f"{totals['failed']} gagal; dimulai dari record {totals['resumed_from']}."
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from shops.search import is_supported, rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Bangun ulang indeks pencarian produk (FTS5) dari tabel produk, per rentang id."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=10000)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        if not is_supported(options['database']):
+            self.stdout.write(self.style.WARNING("Database ini bukan SQLite; indeks FTS5 tidak digunakan."))
+            return
+        indexed = rebuild_index(chunk_size=options['chunk_size'], using=options['database'], stdout=self.stdout)
+        self.stdout.write(self.style.SUCCESS(f"{indexed} produk terindeks."))
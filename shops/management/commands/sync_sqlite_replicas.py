@@ -0,0 +1,35 @@
+import sqlite3
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from melar_project.routers import get_config
+
+
+class Command(BaseCommand):
+    help = (
+        "Salin database SQLite primary ke file replika (DB_REPLICAS) dengan backup API SQLite, "
+        "untuk menguji routing baca/tulis secara lokal."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, default=1024, help="Halaman per langkah backup")
+
+    def handle(self, *args, **options):
+        config = get_config()
+        primary = settings.DATABASES[config['PRIMARY']]
+        if not config['REPLICAS']:
+            raise CommandError("Tidak ada replika; jalankan dengan DB_REPLICAS=N.")
+        if primary['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError("Hanya untuk primary SQLite; gunakan replikasi database sungguhan.")
+
+        for alias in config['REPLICAS']:
+            connections[alias].close()  # Jangan biarkan koneksi lama membaca file yang sedang ditimpa
+            source = sqlite3.connect(primary['NAME'])
+            target = sqlite3.connect(settings.DATABASES[alias]['NAME'])
+            try:
+                source.backup(target, pages=options['pages'])
+            finally:
+                target.close()
+                source.close()
+            self.stdout.write(self.style.SUCCESS(f"{alias} disalin dari {config['PRIMARY']}."))
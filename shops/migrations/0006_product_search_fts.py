@@ -0,0 +1,110 @@
+from django.db import migrations
+
+FTS_TABLE = 'shops_product_fts'
+
+CATEGORY_NAMES = """
+    COALESCE((
+        SELECT group_concat(c.name, ' ')
+        FROM shops_product_categories pc JOIN shops_category c ON c.id = pc.category_id
+        WHERE pc.product_id = {product}
+    ), '')
+"""
+
+FORWARD = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description, categories, shop_name,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER shops_product_fts_insert AFTER INSERT ON shops_product BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description, categories, shop_name)
+        VALUES (
+            new.id, new.name, COALESCE(new.description, ''), {CATEGORY_NAMES.format(product='new.id')},
+            (SELECT shop_name FROM shops_shop WHERE id = new.shop_id)
+        );
+    END
+    """,
+    f"""
+    CREATE TRIGGER shops_product_fts_update AFTER UPDATE OF name, description, shop_id ON shops_product BEGIN
+        UPDATE {FTS_TABLE} SET
+            name = new.name,
+            description = COALESCE(new.description, ''),
+            shop_name = (SELECT shop_name FROM shops_shop WHERE id = new.shop_id)
+        WHERE rowid = new.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER shops_product_fts_delete AFTER DELETE ON shops_product BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = old.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER shops_product_categories_fts_insert AFTER INSERT ON shops_product_categories BEGIN
+        UPDATE {FTS_TABLE} SET categories = {CATEGORY_NAMES.format(product='new.product_id')}
+        WHERE rowid = new.product_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER shops_product_categories_fts_delete AFTER DELETE ON shops_product_categories BEGIN
+        UPDATE {FTS_TABLE} SET categories = {CATEGORY_NAMES.format(product='old.product_id')}
+        WHERE rowid = old.product_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER shops_category_fts_update AFTER UPDATE OF name ON shops_category BEGIN
+        UPDATE {FTS_TABLE} SET categories = {CATEGORY_NAMES.format(product=f'{FTS_TABLE}.rowid')}
+        WHERE rowid IN (SELECT product_id FROM shops_product_categories WHERE category_id = new.id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER shops_shop_fts_update AFTER UPDATE OF shop_name ON shops_shop BEGIN
+        UPDATE {FTS_TABLE} SET shop_name = new.shop_name
+        WHERE rowid IN (SELECT id FROM shops_product WHERE shop_id = new.id);
+    END
+    """,
+]
+
+BACKWARD = [
+    'DROP TRIGGER IF EXISTS shops_shop_fts_update',
+    'DROP TRIGGER IF EXISTS shops_category_fts_update',
+    'DROP TRIGGER IF EXISTS shops_product_categories_fts_delete',
+    'DROP TRIGGER IF EXISTS shops_product_categories_fts_insert',
+    'DROP TRIGGER IF EXISTS shops_product_fts_delete',
+    'DROP TRIGGER IF EXISTS shops_product_fts_update',
+    'DROP TRIGGER IF EXISTS shops_product_fts_insert',
+    f'DROP TABLE IF EXISTS {FTS_TABLE}',
+]
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 khusus SQLite; backend lain memakai fallback icontains di shops.search
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in FORWARD:
+        schema_editor.execute(statement)
+    schema_editor.execute(f"""
+        INSERT INTO {FTS_TABLE}(rowid, name, description, categories, shop_name)
+        SELECT p.id, p.name, COALESCE(p.description, ''), {CATEGORY_NAMES.format(product='p.id')}, s.shop_name
+        FROM shops_product p JOIN shops_shop s ON s.id = p.shop_id
+    """)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in BACKWARD:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shops', '0005_category_category_created_keyset_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
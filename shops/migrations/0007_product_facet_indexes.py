@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('shops', '0006_product_search_fts'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['status', 'availability_status', 'price'], name='product_facet_filter_idx'),
+        ),
+        # Tabel relasi M2M dibuat otomatis oleh Django, jadi indeksnya ditambahkan lewat SQL
+        migrations.RunSQL(
+            'CREATE INDEX shops_product_categories_category_product_idx '
+            'ON shops_product_categories (category_id, product_id)',
+            'DROP INDEX shops_product_categories_category_product_idx',
+        ),
+    ]
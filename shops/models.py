@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Coalesce
 from django.conf import settings
 from django.utils import timezone
 
@@ -18,15 +19,43 @@ class Shop(models.Model):
     created_at = models.DateTimeField(default=timezone.now)  # Waktu pembuatan
     updated_at = models.DateTimeField(auto_now=True)  # Waktu pembaruan
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='shop_created_keyset_idx'),
+        ]
+
     def __str__(self):
         return self.shop_name
 
+class CategoryQuerySet(models.QuerySet):
+    def with_product_count(self):
+        """Anotasi `product_count` lewat subquery berindeks pada tabel relasi produk-kategori."""
+        through = Product.categories.through
+        counts = (
+            through.objects.filter(category_id=models.OuterRef('pk'))
+            .order_by()
+            .values('category_id')
+            .annotate(total=models.Count('*'))
+            .values('total')
+        )
+        return self.annotate(
+            product_count=Coalesce(models.Subquery(counts), 0)
+        )
+
+
 class Category(models.Model):
     name = models.CharField(max_length=255, unique=True)
     description = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CategoryQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='category_created_keyset_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
@@ -53,6 +82,13 @@ class Product(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='product_created_keyset_idx'),
+            models.Index(fields=['status', 'availability_status', 'price'], name='product_facet_filter_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='product_status_keyset_idx'),  # Antrean moderasi
+        ]
+
     def __str__(self):
         return self.name
 
@@ -67,6 +103,11 @@ class Discount(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='discount_created_keyset_idx'),
+        ]
+
     def __str__(self):
         return self.code
 
@@ -76,5 +117,21 @@ class Inventory(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='inventory_created_keyset_idx'),
+        ]
+
     def __str__(self):
         return f"{self.product.name} - {self.quantity} items"
+
+class ImportCheckpoint(models.Model):
+    """Jumlah record yang sudah commit untuk satu impor `import_catalog`; ditulis di transaksi batch yang sama."""
+    key = models.CharField(max_length=500, unique=True)
+    kind = models.CharField(max_length=20)
+    path = models.CharField(max_length=1000)
+    records = models.PositiveBigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.kind} {self.path} ({self.records} record)"
@@ -0,0 +1,26 @@
+from django.db import transaction
+from django.utils import timezone
+from melar_project.sqlite import write_transaction
+from .importing import invalidate_products
+from .models import Product
+
+DECISIONS = {'approve': 'approved', 'reject': 'blocked', 'block': 'blocked'}
+
+
+def moderate_products(ids, decision):
+    """
+    Ubah `Product.status` banyak produk pending dengan satu `UPDATE` dalam satu transaksi.
+
+    Produk yang sudah dimoderasi tidak disentuh dan dilaporkan di `not_pending`,
+    terpisah dari id yang tidak ada (`missing`).
+    """
+    with write_transaction():
+        rows = dict(Product.objects.filter(id__in=ids).values_list('id', 'status'))
+        found = [row_id for row_id, status in rows.items() if status == 'pending']
+        Product.objects.filter(id__in=found, status='pending').update(status=DECISIONS[decision], updated_at=timezone.now())
+        transaction.on_commit(invalidate_products)
+    return {
+        'updated': len(found),
+        'missing': sorted(set(ids) - rows.keys()),
+        'not_pending': sorted(row_id for row_id, status in rows.items() if status != 'pending'),
+    }
@@ -0,0 +1,203 @@
+import heapq
+import threading
+import time
+from bisect import bisect_right
+from collections import defaultdict
+from datetime import timedelta
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.utils import timezone
+from melar_project.cache import get_cache
+from .models import Discount, Product
+
+VERSION_KEY = 'pricing:discounts:version'
+CENT = Decimal('0.01')
+TIMELINE_MEMO_SIZE = 10000  # Batas memo timeline per indeks; dikosongkan saat penuh
+
+
+class DiscountIndex:
+    """
+    Indeks interval diskon per produk dan per kategori.
+
+    Setiap key dipecah menjadi segmen tanggal elementer dengan diskon terbaik yang
+    sudah dihitung di depan, sehingga satu lookup hanya `bisect` O(log n).
+    """
+
+    def __init__(self, discounts):
+        intervals = defaultdict(list)
+        for code, percentage, valid_from, valid_until, product_id, category_id in discounts:
+            entry = (valid_from, valid_until, percentage, code)
+            if product_id is not None:
+                intervals[('product', product_id)].append(entry)
+            if category_id is not None:
+                intervals[('category', category_id)].append(entry)
+        self._segments = {key: self._build(entries) for key, entries in intervals.items()}
+        self._timelines = {}
+
+    @staticmethod
+    def _build(entries):
+        boundaries = sorted({day for start, end, _, _ in entries for day in (start, end + timedelta(days=1))})
+        best = []
+        for day in boundaries:
+            covering = [(percentage, code) for start, end, percentage, code in entries if start <= day <= end]
+            best.append(max(covering) if covering else None)
+        return boundaries, best
+
+    def lookup(self, key, day):
+        segments = self._segments.get(key)
+        if segments is None:
+            return None
+        boundaries, best = segments
+        index = bisect_right(boundaries, day) - 1
+        return best[index] if index >= 0 else None
+
+    def timeline(self, product_id, category_ids):
+        """
+        Segmen diskon terbaik untuk satu produk, gabungan segmen produk dan kategorinya.
+
+        Hasilnya di-memo per `(product_id, category_ids)` sehingga resolusi baris
+        berikutnya untuk produk yang sama hanya satu `bisect`. Memo hidup selama
+        indeks ini (dibuang saat rebuild) dan dikosongkan bila mencapai
+        `TIMELINE_MEMO_SIZE` agar katalog besar tidak menumpuk memori.
+        """
+        memo_key = (product_id, tuple(category_ids))
+        timeline = self._timelines.get(memo_key)
+        if timeline is None:
+            if len(self._timelines) >= TIMELINE_MEMO_SIZE:
+                self._timelines = {}
+            keys = [('product', product_id)] + [('category', category_id) for category_id in category_ids]
+            keys = [key for key in keys if key in self._segments]
+            if len(keys) <= 1:
+                # Tanpa diskon atau hanya satu sumber: pakai segmennya langsung
+                timeline = self._timelines[memo_key] = self._segments[keys[0]] if keys else ((), ())
+                return timeline
+            # Sapu batas segmen semua sumber berurutan; nilai aktif tiap sumber diperbarui di batasnya
+            sources = [
+                [(day, position, value) for day, value in zip(*self._segments[key])]
+                for position, key in enumerate(keys)
+            ]
+            current = [None] * len(keys)
+            boundaries, best = [], []
+            for day, position, value in heapq.merge(*sources):
+                current[position] = value
+                if not boundaries or boundaries[-1] != day:
+                    boundaries.append(day)
+                    best.append(None)
+                active = [candidate for candidate in current if candidate is not None]
+                best[-1] = max(active) if active else None
+            timeline = self._timelines[memo_key] = (boundaries, best)
+        return timeline
+
+    def best(self, product_id, category_ids, day):
+        """Diskon `(percentage, code)` terbesar dari produk atau kategorinya yang berlaku pada `day`."""
+        boundaries, best = self.timeline(product_id, category_ids)
+        index = bisect_right(boundaries, day) - 1
+        return best[index] if index >= 0 else None
+
+
+_engine_lock = threading.Lock()
+_engine = {'version': None, 'index': None}
+
+
+def invalidate():
+    """
+    Tandai indeks diskon kadaluarsa di semua proses (dipanggil dari sinyal Discount).
+
+    Versi disimpan di cache katalog, yang wajib berupa cache bersama
+    (check deploy melar.E001); indeks proses ini langsung dibuang.
+    """
+    cache = get_cache()
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, time.time_ns(), None)
+    with _engine_lock:
+        _engine['index'] = None
+
+
+def _version():
+    """Versi indeks di cache; yang hilang (di-evict) diisi nilai baru, bukan None yang bisa sama dengan versi lama."""
+    cache = get_cache()
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time_ns(), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def get_index():
+    """Indeks diskon proses ini; dibangun ulang jika versi di cache berubah."""
+    version = _version()
+    with _engine_lock:
+        if _engine['index'] is None or _engine['version'] != version:
+            discounts = (
+                Discount.objects.filter(valid_until__gte=timezone.localdate())
+                .values_list('code', 'percentage', 'valid_from', 'valid_until', 'product_id', 'category_id')
+            )
+            _engine['index'] = DiscountIndex(discounts)
+            _engine['version'] = version
+        return _engine['index']
+
+
+def discounted(price, percentage):
+    return (price * (Decimal(100) - percentage) / Decimal(100)).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def quote(lines, index=None):
+    """
+    Harga banyak baris sekaligus: `lines` berisi `(product_id, quantity, day)`.
+
+    Harga dan kategori semua produk dimuat dengan dua query, lalu diskon diresolusi
+    di memori. Hasil berurutan sesuai `lines`; baris dengan produk yang tidak ada
+    bernilai `None`.
+    """
+    product_ids = {product_id for product_id, _, _ in lines}
+    prices = dict(Product.objects.filter(id__in=product_ids).values_list('id', 'price'))
+    return price_lines(lines, prices, product_categories(product_ids), index)
+
+
+def product_categories(product_ids):
+    categories = defaultdict(list)
+    for product_id, category_id in Product.categories.through.objects.filter(
+        product_id__in=product_ids
+    ).values_list('product_id', 'category_id'):
+        categories[product_id].append(category_id)
+    return categories
+
+
+def price_lines(lines, prices, categories, index=None):
+    """Resolusi diskon di memori untuk harga dan kategori yang sudah dimuat."""
+    index = index or get_index()
+    timelines = {}
+    unit_prices = {}  # (product_id, segmen) -> (persen, kode, harga satuan)
+    results = []
+    for product_id, quantity, day in lines:
+        timeline = timelines.get(product_id)
+        if timeline is None:
+            if product_id not in prices:
+                results.append(None)
+                continue
+            timeline = timelines[product_id] = index.timeline(product_id, categories.get(product_id, ()))
+        boundaries, best = timeline
+        segment = bisect_right(boundaries, day) - 1
+        resolved = unit_prices.get((product_id, segment))
+        if resolved is None:
+            price = prices[product_id]
+            discount = best[segment] if segment >= 0 else None
+            if discount is None:
+                resolved = (Decimal(0), None, price)
+            else:
+                resolved = (discount[0], discount[1], discounted(price, discount[0]))
+            unit_prices[(product_id, segment)] = resolved
+        percentage, code, unit_price = resolved
+        results.append({
+            'product': product_id,
+            'quantity': quantity,
+            'date': day,
+            'price': prices[product_id],
+            'discount_code': code,
+            'discount_percentage': percentage,
+            'unit_price': unit_price,
+            'total_price': unit_price * quantity,
+        })
+    return results
@@ -0,0 +1,180 @@
+import re
+from contextlib import contextmanager
+
+from django.db import connections, transaction
+from django.utils.html import escape
+from .models import Product
+
+FTS_TABLE = 'shops_product_fts'
+
+# Bobot bm25 per kolom: name, description, categories, shop_name
+BM25_WEIGHTS = (10.0, 1.0, 4.0, 2.0)
+
+CATEGORY_NAMES = """
+    COALESCE((
+        SELECT group_concat(c.name, ' ')
+        FROM shops_product_categories pc JOIN shops_category c ON c.id = pc.category_id
+        WHERE pc.product_id = p.id
+    ), '')
+"""
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Penanda highlight dari snippet(); diganti <b></b> setelah teks produk di-escape
+HIGHLIGHT_START, HIGHLIGHT_END = '\x02', '\x03'
+
+
+def is_supported(using='default'):
+    return connections[using].vendor == 'sqlite'
+
+
+def build_match_query(text):
+    """
+    Ubah input bebas menjadi ekspresi MATCH FTS5 yang aman.
+
+    Setiap kata dikutip agar operator FTS5 dari user tidak ikut dieksekusi, dan
+    kata terakhir dijadikan prefix (`"kame"*`) untuk pencarian sambil mengetik.
+    """
+    tokens = TOKEN_RE.findall(text)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def highlight(snippet):
+    """Escape teks snippet (isinya dari input seller) lalu ubah penanda highlight menjadi `<b>`."""
+    if snippet is None:
+        return None
+    return escape(snippet).replace(HIGHLIGHT_START, '<b>').replace(HIGHLIGHT_END, '</b>')
+
+
+def search_products(text, status=None, availability_status=None, limit=20, offset=0, using='default', queryset=None):
+    """
+    Cari produk dengan ranking BM25 dan snippet.
+
+    `queryset` membatasi hasil pada produk yang boleh dilihat pemanggil (mis.
+    queryset viewset); tanpa itu seluruh katalog dicari. Mengembalikan list
+    `(product, rank, snippet)` berurutan dari yang paling relevan.
+    """
+    match = build_match_query(text)
+    if match is None:
+        return []
+    queryset = (Product.objects.all() if queryset is None else queryset).using(using)
+    if not is_supported(using):
+        return _search_fallback(queryset, text, status, availability_status, limit, offset)
+
+    where = [f'{FTS_TABLE} MATCH %s']
+    params = [match]
+    if queryset.query.has_filters():
+        visible, visible_params = queryset.values('pk').query.get_compiler(using=using).as_sql()
+        where.append(f'p.id IN ({visible})')
+        params.extend(visible_params)
+    if status:
+        where.append('p.status = %s')
+        params.append(status)
+    if availability_status:
+        where.append('p.availability_status = %s')
+        params.append(availability_status)
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    sql = f"""
+        SELECT p.id, bm25({FTS_TABLE}, {weights}) AS score,
+               snippet({FTS_TABLE}, -1, %s, %s, '...', 12)
+        FROM {FTS_TABLE} JOIN shops_product p ON p.id = {FTS_TABLE}.rowid
+        WHERE {' AND '.join(where)}
+        ORDER BY score
+        LIMIT %s OFFSET %s
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(sql, [HIGHLIGHT_START, HIGHLIGHT_END] + params + [limit, offset])
+        hits = cursor.fetchall()
+
+    products = Product.objects.using(using).in_bulk([product_id for product_id, _, _ in hits])
+    return [
+        (products[product_id], rank, highlight(snippet))
+        for product_id, rank, snippet in hits
+        if product_id in products
+    ]
+
+
+def _search_fallback(queryset, text, status, availability_status, limit, offset):
+    queryset = queryset.filter(name__icontains=text)
+    if status:
+        queryset = queryset.filter(status=status)
+    if availability_status:
+        queryset = queryset.filter(availability_status=availability_status)
+    return [(product, None, None) for product in queryset.order_by('-created_at', '-id')[offset:offset + limit]]
+
+
+@contextmanager
+def suspended_triggers(using='default'):
+    """
+    Lepas trigger FTS selama load massal, lalu pasang kembali definisinya yang sama.
+
+    Trigger menjalankan subquery per baris produk dan relasi kategori; untuk jutaan
+    baris jauh lebih cepat mengisi tabel dulu lalu memanggil `rebuild_index`.
+    Jika proses mati di tengah jalan, pasang ulang dengan migrate `shops 0005` lalu `migrate`.
+    """
+    if not is_supported(using):
+        yield
+        return
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'trigger' AND sql LIKE %s",
+            [f'%{FTS_TABLE}%'],
+        )
+        triggers = cursor.fetchall()
+        for name, _ in triggers:
+            cursor.execute(f'DROP TRIGGER {name}')
+    try:
+        yield
+    finally:
+        with connections[using].cursor() as cursor:
+            for _, sql in triggers:
+                cursor.execute(sql)
+
+
+def rebuild_index(chunk_size=10000, using='default', stdout=None):
+    """
+    Segarkan tabel FTS dari tabel produk per rentang id agar lock tulis tetap pendek.
+
+    Tidak ada `DELETE` di awal: setiap rentang ditulis dengan `INSERT OR REPLACE`
+    dan baris yang produknya sudah hilang dihapus di rentang yang sama, jadi
+    pencarian tetap terisi selama rebuild dan insert dari trigger yang berjalan
+    bersamaan tidak bentrok dengan rowid yang sama.
+    """
+    if not is_supported(using):
+        return 0
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT COALESCE(MAX(id), 0) FROM shops_product')
+        max_id = cursor.fetchone()[0]
+
+    indexed = 0
+    for low in range(0, max_id, chunk_size):
+        high = low + chunk_size
+        with transaction.atomic(using=using), connection.cursor() as cursor:
+            cursor.execute(f"""
+                INSERT OR REPLACE INTO {FTS_TABLE}(rowid, name, description, categories, shop_name)
+                SELECT p.id, p.name, COALESCE(p.description, ''), {CATEGORY_NAMES}, s.shop_name
+                FROM shops_product p JOIN shops_shop s ON s.id = p.shop_id
+                WHERE p.id > %s AND p.id <= %s
+            """, [low, high])
+            indexed += cursor.rowcount
+            cursor.execute(f"""
+                DELETE FROM {FTS_TABLE}
+                WHERE rowid > %s AND rowid <= %s
+                  AND rowid NOT IN (SELECT id FROM shops_product WHERE id > %s AND id <= %s)
+            """, [low, high, low, high])
+        if stdout is not None:
+            stdout.write(f'Indexed up to id {min(high, max_id)}')
+
+    with connection.cursor() as cursor:
+        # Baris FTS di atas id terbesar yang produknya sudah tidak ada (mis. dihapus saat trigger dilepas)
+        cursor.execute(f"""
+            DELETE FROM {FTS_TABLE}
+            WHERE rowid > %s AND rowid NOT IN (SELECT id FROM shops_product WHERE id > %s)
+        """, [max_id, max_id])
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')")
+    return indexed
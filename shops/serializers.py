@@ -1,25 +1,54 @@
 from rest_framework import serializers
+from .importing import resolve_categories
 from .models import Shop, Category, Product, Discount, Inventory
 
+CATEGORY_PRODUCT_PREVIEW = 5  # Jumlah maksimum produk per kategori pada ?expand=products
+
+
+def wants_expansion(request, name):
+    """True jika query string `?expand=` meminta relasi `name`."""
+    if request is None:
+        return False
+    return name in request.query_params.get('expand', '').split(',')
+
+
 class ShopSerializer(serializers.ModelSerializer):
     class Meta:
         model = Shop
         fields = ['id', 'user', 'shop_name', 'description', 'is_active','address', 'postal_code', 'contact',  'created_at', 'updated_at']
         read_only_fields = ['user', 'created_at', 'updated_at']
 
+class CategorySummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Category
+        fields = ['id', 'name']
+
+
 class CategorySerializer(serializers.ModelSerializer):
-    products = serializers.SerializerMethodField()  # Tambahkan daftar produk terkait
+    product_count = serializers.SerializerMethodField()
+    products = serializers.SerializerMethodField()  # Hanya dengan ?expand=products
 
     class Meta:
         model = Category
-        fields = ['id', 'name', 'description', 'products', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'description', 'product_count', 'products', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
 
-    def get_products(self, obj):
-        # Ambil produk yang terkait dengan kategori ini
-        products = obj.products.all()  # Field related_name='products' pada ManyToManyField
-        return ProductSerializer(products, many=True).data  # Serialize data produk terkait
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not wants_expansion(self.context.get('request'), 'products'):
+            self.fields.pop('products')
+
+    def get_product_count(self, obj):
+        # Nilai dari anotasi `with_product_count`; fallback untuk instance hasil create/update
+        count = getattr(obj, 'product_count', None)
+        return obj.products.count() if count is None else count
 
+    def get_products(self, obj):
+        # Preview produk dari Prefetch berbatas di CategoryViewSet
+        products = getattr(obj, 'product_preview', None)
+        if products is None:
+            products = obj.products.order_by('-created_at', '-id')[:CATEGORY_PRODUCT_PREVIEW]
+        return ProductSerializer(products, many=True).data
 
 
 class ProductSerializer(serializers.ModelSerializer):
@@ -39,25 +68,42 @@ class ProductSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         category_names = validated_data.pop('categories', [])
         shop = validated_data.pop('shop')
-        # Buat atau ambil kategori berdasarkan nama
-        categories = []
-        for name in category_names:
-            category, created = Category.objects.get_or_create(name=name)
-            categories.append(category)
+        # Ambil kategori yang ada dengan satu query, buat yang belum ada dengan satu bulk insert
+        categories = resolve_categories(category_names)
         # Buat produk
         product = Product.objects.create(shop=shop, **validated_data)
-        product.categories.set(categories)  # Tetapkan kategori ke produk
+        product.categories.set(categories.values())  # Tetapkan kategori ke produk
         return product
 
 
 
+class ProductModerationSerializer(ProductSerializer):
+    class Meta(ProductSerializer.Meta):
+        fields = ProductSerializer.Meta.fields + ['status']
+
+
+class ProductModerationDecisionSerializer(serializers.Serializer):
+    MAX_IDS = 5000
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), allow_empty=False, max_length=MAX_IDS
+    )
+    decision = serializers.ChoiceField(choices=['approve', 'block', 'reject'])
+
+
+class ProductBulkSerializer(serializers.Serializer):
+    """Banyak produk sekaligus; tiap item divalidasi terpisah dengan `ProductSerializer`."""
+    MAX_ITEMS = 500
+
+    products = serializers.ListField(child=serializers.DictField(), allow_empty=False, max_length=MAX_ITEMS)
+
 
 class DiscountSerializer(serializers.ModelSerializer):
     product = ProductSerializer(read_only=True)  # Menampilkan informasi produk terkait diskon
     product_id = serializers.PrimaryKeyRelatedField(
         queryset=Product.objects.all(), source='product', write_only=True
     )  # Untuk input ID produk
-    category = CategorySerializer(read_only=True)  # Menampilkan kategori terkait diskon
+    category = CategorySummarySerializer(read_only=True)  # Menampilkan kategori terkait diskon (tanpa produk)
     category_id = serializers.PrimaryKeyRelatedField(
         queryset=Category.objects.all(), source='category', write_only=True
     )  # Untuk input ID kategori
@@ -83,3 +129,31 @@ class InventorySerializer(serializers.ModelSerializer):
         model = Inventory
         fields = ['id', 'product', 'product_id', 'quantity', 'created_at', 'updated_at']
         read_only_fields = ['created_at', 'updated_at']
+
+
+class ProductSearchQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(max_length=200)
+    status = serializers.ChoiceField(choices=Product.STATUS_CHOICES, required=False)
+    availability_status = serializers.ChoiceField(choices=Product.AVAILABILITY_CHOICES, required=False)
+    limit = serializers.IntegerField(min_value=1, max_value=100, default=20)
+    offset = serializers.IntegerField(min_value=0, max_value=1000, default=0)
+
+
+class ProductSearchResultSerializer(ProductSerializer):
+    rank = serializers.FloatField(read_only=True)
+    snippet = serializers.CharField(read_only=True)
+
+    class Meta(ProductSerializer.Meta):
+        fields = ProductSerializer.Meta.fields + ['status', 'rank', 'snippet']
+
+
+class ProductFilterSerializer(serializers.Serializer):
+    min_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    max_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+    category = serializers.IntegerField(required=False)
+    shop = serializers.IntegerField(required=False)
+    availability_status = serializers.ChoiceField(choices=Product.AVAILABILITY_CHOICES, required=False)
+    status = serializers.ChoiceField(choices=Product.STATUS_CHOICES, required=False)
+    # default None: BooleanField menganggap parameter query yang kosong sebagai False
+    shop_active = serializers.BooleanField(required=False, allow_null=True, default=None)
+    price_bucket_size = serializers.IntegerField(min_value=1, default=100)  # Lebar bucket histogram harga
@@ -0,0 +1,69 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+from melar_project.cache import invalidate
+from . import pricing
+from .models import Category, Discount, Inventory, Product, Shop
+
+# Resource lain yang menanamkan atau memfilter berdasarkan model ini,
+# sehingga seluruh cache-nya ikut dibuang saat model berubah.
+DEPENDENTS = {
+    Shop: ('product',),  # Filter shop_active pada daftar produk
+    Product: ('category', 'discount', 'inventory'),
+    Category: ('product', 'discount'),
+    Discount: (),
+    Inventory: (),
+}
+
+RESOURCES = {
+    Shop: 'shop',
+    Product: 'product',
+    Category: 'category',
+    Discount: 'discount',
+    Inventory: 'inventory',
+}
+
+
+def invalidate_instance(model, pk):
+    invalidate(RESOURCES[model], pk)
+    for resource in DEPENDENTS[model]:
+        invalidate(resource)
+
+
+def invalidate_catalog_cache(sender, instance, **kwargs):
+    invalidate_instance(sender, instance.pk)
+
+
+for model in RESOURCES:
+    post_save.connect(invalidate_catalog_cache, sender=model, dispatch_uid=f'catalog_cache_save_{model.__name__}')
+    post_delete.connect(invalidate_catalog_cache, sender=model, dispatch_uid=f'catalog_cache_delete_{model.__name__}')
+
+
+@receiver(post_save, sender=Discount, dispatch_uid='pricing_index_save')
+@receiver(post_delete, sender=Discount, dispatch_uid='pricing_index_delete')
+def invalidate_pricing_index(sender, **kwargs):
+    # Indeks diskon di memori tiap proses dibangun ulang pada quote berikutnya
+    pricing.invalidate()
+
+
+@receiver(m2m_changed, sender=Product.categories.through)
+def invalidate_product_categories(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    # reverse=True berarti perubahan dari sisi Category (category.products.add(...)).
+    # Untuk clear() pk_set None; resource lawan sudah dibuang lewat DEPENDENTS.
+    if reverse:
+        invalidate_instance(Category, instance.pk)
+        for pk in pk_set or ():
+            invalidate_instance(Product, pk)
+    else:
+        invalidate_instance(Product, instance.pk)
+        for pk in pk_set or ():
+            invalidate_instance(Category, pk)
+
+    # Relasi berubah berarti kedua sisi berubah: perbarui updated_at supaya
+    # ETag/Last-Modified (dan product_count) ikut berubah. update() tidak memicu post_save.
+    now = timezone.now()
+    category_ids, product_ids = (({instance.pk}, pk_set) if reverse else (pk_set, {instance.pk}))
+    Product.objects.filter(pk__in=product_ids or ()).update(updated_at=now)
+    Category.objects.filter(pk__in=category_ids or ()).update(updated_at=now)
@@ -1,8 +1,31 @@
+import base64
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core import checks
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import AccessToken
+from melar_project.cache import aresponse_key, check_shared_caches, invalidate, response_key, single_flight
+from . import importing, pricing
+from .search import FTS_TABLE, rebuild_index, suspended_triggers
+from .serializers import ProductBulkSerializer
 from .models import Shop, Category, Product, Discount, Inventory
 
 User = get_user_model()
@@ -82,3 +105,858 @@ class ShopViewSetTests(APITestCase):
             HTTP_AUTHORIZATION=f'Bearer {other_user_token}'
         )
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class KeysetPaginationTests(APITestCase):
+
+    def setUp(self):
+        """Setup a seller with enough products to span several pages."""
+        self.user = User.objects.create_user(
+            email='seller@example.com',
+            username='seller',
+            password='sellerpassword123'
+        )
+        self.token = AccessToken.for_user(self.user)
+        self.shop = Shop.objects.create(
+            user=self.user, shop_name='Paged Shop', address='Jl. Test', postal_code='12345', contact='0800'
+        )
+        self.products = [
+            Product.objects.create(shop=self.shop, name=f'Product {i}', price=10)
+            for i in range(7)
+        ]
+        self.product_url = reverse('product-list')
+
+    def test_pages_cover_every_row_once(self):
+        """Following next links returns every product exactly once, newest first."""
+        seen = []
+        url = f'{self.product_url}?page_size=3'
+        while url:
+            response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            seen.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(seen, [p.id for p in reversed(self.products)])
+
+    def test_previous_link_returns_prior_page(self):
+        """The previous cursor walks back to the same rows."""
+        first = self.client.get(f'{self.product_url}?page_size=3', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        second = self.client.get(first.data['next'], HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        back = self.client.get(second.data['previous'], HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(
+            [item['id'] for item in back.data['results']],
+            [item['id'] for item in first.data['results']]
+        )
+
+    def test_invalid_cursor(self):
+        """A malformed cursor is rejected with 404."""
+        response = self.client.get(f'{self.product_url}?cursor=not-a-cursor', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_tampered_cursor_values(self):
+        """A well-formed cursor with wrong-typed values is rejected with 404, not 500."""
+        for values in (['abc', 1], [{'a': 1}, 1], ['2024-01-01T00:00:00', 'x'], [None, 1], {'a': 1, 'b': 2}):
+            payload = json.dumps({'v': values, 'r': 0}).encode()
+            cursor = base64.urlsafe_b64encode(payload).decode()
+            response = self.client.get(f'{self.product_url}?cursor={cursor}', HTTP_AUTHORIZATION=f'Bearer {self.token}')
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND, values)
+
+
+class CategoryCatalogTests(APITestCase):
+
+    def setUp(self):
+        """Setup categories with products spread across them."""
+        self.user = User.objects.create_user(
+            email='catalog@example.com',
+            username='catalog',
+            password='catalogpassword123'
+        )
+        self.token = AccessToken.for_user(self.user)
+        self.shop = Shop.objects.create(
+            user=self.user, shop_name='Catalog Shop', address='Jl. Test', postal_code='12345', contact='0800'
+        )
+        self.category_url = reverse('category-list')
+
+    def _seed(self, categories, products_per_category):
+        for i in range(categories):
+            category = Category.objects.create(name=f'Category {Category.objects.count()}')
+            for j in range(products_per_category):
+                product = Product.objects.create(shop=self.shop, name=f'Item {i}-{j}', price=5)
+                product.categories.add(category)
+
+    def _get(self, url):
+        return self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def test_list_returns_product_count_without_products(self):
+        """The default list carries product_count and no embedded products."""
+        self._seed(2, 3)
+        response = self._get(self.category_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for category in response.data['results']:
+            self.assertEqual(category['product_count'], 3)
+            self.assertNotIn('products', category)
+
+    def test_query_count_is_constant(self):
+        """Listing categories costs the same number of queries for small and large catalogs."""
+        self._seed(2, 1)
+        with self.assertNumQueries(3):  # JWT user + validator ETag + categories
+            self._get(self.category_url)
+        with self.assertNumQueries(4):  # + one bounded preview query
+            self._get(f'{self.category_url}?expand=products')
+
+        self._seed(10, 8)
+        with self.assertNumQueries(3):
+            self._get(self.category_url)
+        with self.assertNumQueries(4):
+            response = self._get(f'{self.category_url}?expand=products')
+        for category in response.data['results']:
+            self.assertLessEqual(len(category['products']), 5)
+
+    def test_discount_embeds_category_summary_only(self):
+        """Discounts expose the category id and name, not its products."""
+        self._seed(1, 2)
+        category = Category.objects.first()
+        product = Product.objects.first()
+        Discount.objects.create(
+            code='HEMAT10', percentage=10, valid_from='2024-01-01', valid_until='2024-12-31',
+            product=product, category=category, admin=self.user
+        )
+        response = self._get(reverse('discount-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['category'], {'id': category.id, 'name': category.name})
+
+
+@override_settings(CATALOG_CACHE={'ENABLED': False})  # Data di-seed lewat bulk_create tanpa sinyal
+class ListQueryCountTests(APITestCase):
+    """Every list endpoint costs the same number of queries at 10 and 10,000 rows."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email='planner@example.com',
+            username='planner',
+            password='plannerpassword123'
+        )
+        self.token = AccessToken.for_user(self.user)
+
+    def _seed(self, n):
+        offset = Shop.objects.count()
+        shops = Shop.objects.bulk_create([
+            Shop(user=self.user, shop_name=f'Shop {offset + i}', address='Jl. Test', postal_code='12345', contact='0800')
+            for i in range(n)
+        ])
+        categories = Category.objects.bulk_create([Category(name=f'Category {offset + i}') for i in range(n)])
+        products = Product.objects.bulk_create([
+            Product(shop=shops[i], name=f'Product {offset + i}', price=10) for i in range(n)
+        ])
+        Product.categories.through.objects.bulk_create([
+            Product.categories.through(product_id=p.id, category_id=c.id) for p, c in zip(products, categories)
+        ])
+        Inventory.objects.bulk_create([Inventory(product=p, quantity=3) for p in products])
+        Discount.objects.bulk_create([
+            Discount(code=f'CODE{offset + i}', percentage=5, valid_from='2024-01-01', valid_until='2024-12-31',
+                     product=products[i], category=categories[i], admin=self.user)
+            for i in range(n)
+        ])
+
+    def _assert_constant(self, url_name, expected):
+        url = reverse(url_name)
+        with self.assertNumQueries(expected):
+            response = self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['results'])
+
+    def test_list_endpoints(self):
+        expected = {
+            'shop-list': 3,  # JWT user + validator ETag + halaman
+            'product-list': 4,  # + satu query facet
+            'category-list': 3,
+            'discount-list': 3,
+            'inventory-list': 3,
+        }
+        for rows in (10, 10000 - 10):
+            self._seed(rows)
+            for url_name, queries in expected.items():
+                with self.subTest(url_name=url_name, rows=Product.objects.count()):
+                    self._assert_constant(url_name, queries)
+
+
+class ProductSearchTests(APITestCase):
+
+    def setUp(self):
+        """Setup a small catalog indexed through the FTS triggers."""
+        self.user = User.objects.create_user(
+            email='search@example.com',
+            username='search',
+            password='searchpassword123'
+        )
+        self.token = AccessToken.for_user(self.user)
+        self.shop = Shop.objects.create(
+            user=self.user, shop_name='Outdoor Gear', address='Jl. Test', postal_code='12345', contact='0800'
+        )
+        self.tent = Product.objects.create(shop=self.shop, name='Dome Tent', description='Tenda untuk 4 orang', price=80, status='approved')
+        self.camera = Product.objects.create(shop=self.shop, name='Mirrorless Camera', description='Cocok untuk tent photography', price=150)
+        self.search_url = f"{reverse('product-list')}search/"
+
+    def _search(self, **params):
+        return self.client.get(self.search_url, params, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def test_name_match_ranks_first(self):
+        response = self._search(q='tent')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [item['id'] for item in response.data['results']]
+        self.assertEqual(ids, [self.tent.id, self.camera.id])
+        self.assertIn('<b>', response.data['results'][0]['snippet'])
+
+    def test_prefix_and_status_filter(self):
+        response = self._search(q='ten', status='approved')
+        self.assertEqual([item['id'] for item in response.data['results']], [self.tent.id])
+
+    def test_index_follows_categories_shop_and_deletes(self):
+        category = Category.objects.create(name='Camping')
+        self.camera.categories.add(category)
+        self.assertEqual([item['id'] for item in self._search(q='camping').data['results']], [self.camera.id])
+
+        category.name = 'Hiking'
+        category.save()
+        self.assertEqual(self._search(q='camping').data['results'], [])
+        self.assertEqual(len(self._search(q='hiking').data['results']), 1)
+
+        self.shop.shop_name = 'Lensa Store'
+        self.shop.save()
+        self.assertEqual(len(self._search(q='lensa').data['results']), 2)
+
+        self.camera.delete()
+        self.assertEqual(self._search(q='hiking').data['results'], [])
+
+    def test_search_uses_list_visibility(self):
+        other = User.objects.create_user(email='other@example.com', username='other', password='otherpassword123')
+        shop = Shop.objects.create(user=other, shop_name='Other Gear', address='Jl. Lain', postal_code='12345', contact='0801')
+        Product.objects.create(shop=shop, name='Pending Tent', price=60, status='pending')
+        Product.objects.create(shop=shop, name='Blocked Tent', price=60, status='blocked')
+        ids = [item['id'] for item in self._search(q='tent').data['results']]
+        self.assertEqual(ids, [self.tent.id, self.camera.id])  # Produk toko lain tidak ikut
+        with mock.patch('shops.search.is_supported', return_value=False):
+            ids = [item['id'] for item in self._search(q='Tent').data['results']]
+        self.assertEqual(ids, [self.tent.id])  # Fallback tanpa FTS memakai queryset yang sama
+
+    def test_operators_in_input_are_escaped(self):
+        response = self._search(q='tent" OR NEAR(')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_rebuild_command(self):
+        call_command('rebuild_product_search', stdout=StringIO())
+        self.assertEqual(len(self._search(q='tent').data['results']), 2)
+
+    def test_snippet_escapes_product_text(self):
+        self.tent.description = 'Tent <script>alert(1)</script> & poles'
+        self.tent.save()
+        snippet = self._search(q='poles').data['results'][0]['snippet']
+        self.assertNotIn('<script>', snippet)
+        self.assertIn('&lt;script&gt;', snippet)
+        self.assertIn('<b>poles</b>', snippet)
+
+    def test_rebuild_replaces_rows_and_drops_orphans(self):
+        with suspended_triggers():
+            Product.objects.filter(pk=self.camera.pk).delete()
+            Product.objects.filter(pk=self.tent.pk).update(name='Tunnel Tent')
+        self.assertEqual(len(self._search(q='photography').data['results']), 0)  # Produknya hilang dari join
+        rebuild_index(chunk_size=1)
+        self.assertEqual([item['id'] for item in self._search(q='tunnel').data['results']], [self.tent.id])
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT rowid FROM {FTS_TABLE}')
+            self.assertEqual([row[0] for row in cursor.fetchall()], [self.tent.id])
+
+
+class ProductFacetTests(APITestCase):
+
+    def setUp(self):
+        """Setup products across categories, prices and availability states."""
+        self.user = User.objects.create_user(
+            email='facets@example.com',
+            username='facets',
+            password='facetspassword123'
+        )
+        self.token = AccessToken.for_user(self.user)
+        self.shop = Shop.objects.create(
+            user=self.user, shop_name='Facet Shop', address='Jl. Test', postal_code='12345', contact='0800'
+        )
+        self.camping = Category.objects.create(name='Camping')
+        self.photo = Category.objects.create(name='Photo')
+        self.tent = Product.objects.create(shop=self.shop, name='Tent', price=40, status='approved')
+        self.stove = Product.objects.create(shop=self.shop, name='Stove', price=120, status='approved', availability_status='rented')
+        self.camera = Product.objects.create(shop=self.shop, name='Camera', price=250)
+        self.tent.categories.add(self.camping)
+        self.stove.categories.add(self.camping)
+        self.camera.categories.add(self.photo)
+        self.product_url = reverse('product-list')
+
+    def _list(self, **params):
+        return self.client.get(self.product_url, params, HTTP_AUTHORIZATION=f'Bearer {self.token}')
+
+    def test_facets_over_whole_catalog(self):
+        response = self._list()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        facets = response.data['facets']
+        self.assertEqual(facets['category'], {str(self.camping.id): 2, str(self.photo.id): 1})
+        self.assertEqual(facets['availability_status'], {'available': 2, 'rented': 1})
+        self.assertEqual(facets['price'], [
+            {'min': 0, 'max': 100, 'count': 1},
+            {'min': 100, 'max': 200, 'count': 1},
+            {'min': 200, 'max': 300, 'count': 1},
+        ])
+
+    def test_filters_narrow_results_and_facets(self):
+        response = self._list(category=self.camping.id, max_price=100, status='approved')
+        self.assertEqual([item['id'] for item in response.data['results']], [self.tent.id])
+        self.assertEqual(response.data['facets']['availability_status'], {'available': 1})
+
+    def test_invalid_filter(self):
+        self.assertEqual(self._list(status='unknown').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_facets_cost_one_query(self):
+        with self.assertNumQueries(4):  # JWT user + validator ETag + halaman produk + facets
+            self._list(shop_active=True, min_price=10, price_bucket_size=50)
+
+
+class CatalogCacheTests(APITestCase):
+
+    def setUp(self):
+        """Setup a seller with a product and its inventory."""
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='cache@example.com',
+            username='cache',
+            password='cachepassword123'
+        )
+        self.token = AccessToken.for_user(self.user)
+        self.shop = Shop.objects.create(
+            user=self.user, shop_name='Cache Shop', address='Jl. Test', postal_code='12345', contact='0800'
+        )
+        self.product = Product.objects.create(shop=self.shop, name='Kayak', price=90)
+        self.inventory = Inventory.objects.create(product=self.product, quantity=2)
+
+    def _get(self, url, token=None):
+        return self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {token or self.token}')
+
+    def test_second_read_is_served_from_cache(self):
+        url = reverse('product-detail', args=[self.product.id])
+        self.assertEqual(self._get(url)['X-Cache'], 'MISS')
+        with self.assertNumQueries(2):  # Hanya JWT user dan validator ETag
+            response = self._get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(response.data['name'], 'Kayak')
+
+    def test_product_change_invalidates_embedding_resources(self):
+        inventory_url = reverse('inventory-list')
+        self._get(inventory_url)
+        self.assertEqual(self._get(inventory_url)['X-Cache'], 'HIT')
+        self.product.name = 'Sea Kayak'
+        self.product.save()
+        response = self._get(inventory_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['results'][0]['product']['name'], 'Sea Kayak')
+
+    def test_detail_invalidation_is_per_object(self):
+        other = Product.objects.create(shop=self.shop, name='Paddle', price=10)
+        url = reverse('product-detail', args=[self.product.id])
+        self._get(url)
+        other.price = 12
+        other.save()
+        self.assertEqual(self._get(url)['X-Cache'], 'HIT')
+
+    def test_m2m_change_invalidates_categories(self):
+        category = Category.objects.create(name='Water')
+        url = reverse('category-list')
+        self.assertEqual(self._get(url).data['results'][0]['product_count'], 0)
+        self.product.categories.add(category)
+        self.assertEqual(self._get(url).data['results'][0]['product_count'], 1)
+
+    def test_entries_are_scoped_per_user(self):
+        other_user = User.objects.create_user(email='other@example.com', username='other', password='otherpassword123')
+        url = reverse('product-list')
+        self.assertEqual(len(self._get(url).data['results']), 1)
+        self.assertEqual(len(self._get(url, AccessToken.for_user(other_user)).data['results']), 0)
+
+    def test_evicted_version_does_not_revive_old_entries(self):
+        request = RequestFactory().get(reverse('product-list'))
+        first = response_key('products', request)
+        invalidate('products')
+        second = response_key('products', request)
+        cache.delete_many(['catalog:products:global', 'catalog:products:list'])  # Seolah di-evict
+        third = response_key('products', request)
+        self.assertEqual(len({first, second, third}), 3)
+
+    def test_async_response_key_matches_sync(self):
+        request = RequestFactory().get(reverse('product-list'))
+        self.assertEqual(async_to_sync(aresponse_key)('products', request), response_key('products', request))
+        invalidate('products')
+        self.assertEqual(async_to_sync(aresponse_key)('products', request), response_key('products', request))
+
+    def test_deploy_check_requires_shared_cache(self):
+        self.assertIn('melar.E001', [error.id for error in check_shared_caches(None)])
+        deploy = checks.run_checks(tags=[checks.Tags.caches], include_deployment_checks=True)
+        self.assertIn('melar.E001', [error.id for error in deploy])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache'}}):
+            self.assertEqual(check_shared_caches(None), [])
+
+    def test_single_flight_computes_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            time.sleep(0.2)
+            return 'value', True
+
+        threads = [threading.Thread(target=single_flight, args=('catalog:test:flight', compute)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(calls), 1)
+
+
+class ConditionalGetTests(APITestCase):
+
+    def setUp(self):
+        """Setup a seller with one product and its inventory."""
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='etag@example.com',
+            username='etag',
+            password='etagpassword123'
+        )
+        self.token = AccessToken.for_user(self.user)
+        self.shop = Shop.objects.create(
+            user=self.user, shop_name='ETag Shop', address='Jl. Test', postal_code='12345', contact='0800'
+        )
+        self.product = Product.objects.create(shop=self.shop, name='Drone', price=300)
+        self.inventory = Inventory.objects.create(product=self.product, quantity=1)
+
+    def _get(self, url, **headers):
+        return self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {self.token}', **headers)
+
+    def test_matching_etag_returns_304_without_rendering(self):
+        url = reverse('product-list')
+        etag = self._get(url)['ETag']
+        with self.assertNumQueries(3):  # JWT user + facet + validator
+            response = self._get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_update_changes_detail_etag(self):
+        url = reverse('product-detail', args=[self.product.id])
+        etag = self._get(url)['ETag']
+        Product.objects.filter(id=self.product.id).update(price=310, updated_at=timezone.now())
+        response = self._get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['price'], '310.00')  # Entri cache lama tidak dipakai
+
+    def test_embedded_relation_changes_etag(self):
+        url = reverse('inventory-list')
+        etag = self._get(url)['ETag']
+        self.product.name = 'Camera Drone'
+        self.product.save()
+        self.assertEqual(self._get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_if_modified_since(self):
+        url = reverse('inventory-detail', args=[self.inventory.id])
+        last_modified = self._get(url)['Last-Modified']
+        response = self._get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_list_validator_covers_current_page_only(self):
+        for name in ('Gimbal', 'Tripod'):
+            Product.objects.create(shop=self.shop, name=name, price=50)
+        url = f"{reverse('product-list')}?page_size=1"
+        etag = self._get(url)['ETag']
+        # Produk tertua di luar halaman pertama; nama tidak ikut facet, jadi respons tidak berubah
+        Product.objects.filter(id=self.product.id).update(name='Drone Lama', updated_at=timezone.now())
+        with CaptureQueriesContext(connection) as queries:
+            response = self._get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertIn('LIMIT', queries.captured_queries[-1]['sql'])
+        Product.objects.filter(name='Tripod').update(name='Tripod Mini', updated_at=timezone.now())
+        self.assertEqual(self._get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_delete_on_page_changes_list_etag(self):
+        for name in ('Gimbal', 'Tripod', 'Lensa', 'Mikrofon'):
+            Inventory.objects.create(product=Product.objects.create(shop=self.shop, name=name, price=50), quantity=1)
+        url = f"{reverse('inventory-list')}?page_size=3"
+        etag = self._get(url)['ETag']
+        # Bukan baris terbaru: MAX(updated_at) dan COUNT halaman (plus baris penanda) tetap sama
+        Inventory.objects.filter(product__name='Lensa').delete()
+        response = self._get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn('Lensa', [item['product']['name'] for item in response.data['results']])
+
+    def test_facet_change_outside_page_changes_etag(self):
+        for name in ('Gimbal', 'Tripod'):
+            Product.objects.create(shop=self.shop, name=name, price=50)
+        url = f"{reverse('product-list')}?page_size=1"
+        etag = self._get(url)['ETag']
+        Product.objects.filter(id=self.product.id).update(availability_status='rented')
+        response = self._get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['facets']['availability_status'].get('rented'), 1)
+
+    def test_missing_object_still_404(self):
+        response = self._get(reverse('product-detail', args=[9999]), HTTP_IF_NONE_MATCH='*')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class PricingEngineTests(APITestCase):
+
+    def setUp(self):
+        """Setup a product in two categories with overlapping discounts."""
+        pricing.invalidate()
+        self.admin = User.objects.create_user(email='pricing@example.com', username='pricing', password='pricing123')
+        self.shop = Shop.objects.create(
+            user=self.admin, shop_name='Pricing Shop', address='Jl. Test', postal_code='12345', contact='0800'
+        )
+        self.category = Category.objects.create(name='Outdoor')
+        self.product = Product.objects.create(shop=self.shop, name='Tenda', price=200)
+        self.product.categories.add(self.category)
+        self.today = timezone.localdate()
+
+    def _discount(self, code, percentage, start, end, **target):
+        return Discount.objects.create(
+            code=code, percentage=percentage, admin=self.admin,
+            valid_from=self.today + timedelta(days=start), valid_until=self.today + timedelta(days=end), **target
+        )
+
+    def _quote(self, day_offset):
+        return pricing.quote([(self.product.id, 2, self.today + timedelta(days=day_offset))])[0]
+
+    def test_best_discount_across_product_and_category(self):
+        self._discount('PRODUCT10', 10, 0, 10, product=self.product)
+        self._discount('CATEGORY25', 25, 5, 7, category=self.category)
+        self.assertEqual(self._quote(1)['discount_code'], 'PRODUCT10')
+        line = self._quote(6)
+        self.assertEqual(line['discount_code'], 'CATEGORY25')
+        self.assertEqual(line['unit_price'], Decimal('150.00'))
+        self.assertEqual(line['total_price'], Decimal('300.00'))
+        self.assertEqual(self._quote(8)['discount_code'], 'PRODUCT10')  # Batas valid_until inklusif
+        self.assertIsNone(self._quote(11)['discount_code'])
+
+    def test_discount_change_invalidates_index(self):
+        discount = self._discount('SALE', 10, 0, 3, product=self.product)
+        self.assertEqual(self._quote(0)['unit_price'], Decimal('180.00'))
+        discount.percentage = 50
+        discount.save()
+        self.assertEqual(self._quote(0)['unit_price'], Decimal('100.00'))
+        discount.delete()
+        self.assertEqual(self._quote(0)['unit_price'], Decimal('200.00'))
+
+    def test_index_is_reused_between_quotes(self):
+        self._discount('SALE', 10, 0, 3, product=self.product)
+        self._quote(0)
+        with self.assertNumQueries(2):  # Harga dan kategori; indeks diskon tidak dimuat ulang
+            self._quote(0)
+
+    def test_evicted_version_rebuilds_index(self):
+        index = pricing.get_index()
+        self.assertIs(pricing.get_index(), index)
+        cache.delete(pricing.VERSION_KEY)  # Seolah di-evict setelah proses lain meng-invalidate
+        self.assertIsNot(pricing.get_index(), index)
+
+    def test_timeline_memo_is_bounded(self):
+        index = pricing.DiscountIndex([])
+        with mock.patch.object(pricing, 'TIMELINE_MEMO_SIZE', 2):
+            for product_id in range(5):
+                index.timeline(product_id, ())
+        self.assertLessEqual(len(index._timelines), 2)
+
+    def test_unknown_product(self):
+        self.assertEqual(pricing.quote([(9999, 1, self.today)]), [None])
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('bench_pricing', lines=500, products=100, discounts=50, runs=2, stdout=out)
+        self.assertIn('lines=500', out.getvalue())
+        with self.assertRaisesMessage(CommandError, 'melebihi budget'):
+            call_command('bench_pricing', lines=500, products=100, discounts=50, runs=2, budget_ms=0, stdout=StringIO())
+
+
+@override_settings(PASSWORD_HASHERS=['django.contrib.auth.hashers.MD5PasswordHasher'])
+class ImportCatalogTests(APITestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _file(self, name, content):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(content)
+        return path
+
+    def _import(self, kind, path, *args):
+        out, err = StringIO(), StringIO()
+        call_command('import_catalog', kind, path, *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def _seed_users_and_shops(self):
+        users = self._file('users.jsonl', '\n'.join(json.dumps(row) for row in [
+            {'email': 'owner@example.com', 'username': 'owner', 'full_name': 'Owner', 'password': 'rahasia123', 'is_seller': True},
+            {'email': 'buyer@example.com', 'username': 'buyer', 'full_name': 'Buyer'},
+        ]))
+        self._import('users', users)
+        shops = self._file('shops.csv', (
+            "owner_email,shop_name,address,postal_code,contact\n"
+            "owner@example.com,Toko Satu,Jl. Satu,12345,0800\n"
+        ))
+        self._import('shops', shops)
+
+    def test_import_users_and_shops(self):
+        self._seed_users_and_shops()
+        owner = User.objects.get(email='owner@example.com')
+        self.assertTrue(owner.check_password('rahasia123'))
+        self.assertTrue(owner.is_seller)
+        self.assertFalse(User.objects.get(username='buyer').has_usable_password())
+        self.assertEqual(Shop.objects.get(shop_name='Toko Satu').user, owner)
+
+    def test_import_products_links_categories(self):
+        self._seed_users_and_shops()
+        Category.objects.create(name='Kamera')
+        path = self._file('products.csv', (
+            "shop_name,name,price,categories\n"
+            "Toko Satu,Kamera A,100.00,Kamera|Outdoor\n"
+            "Toko Satu,Tenda B,50.00,Outdoor\n"
+        ))
+        out, _ = self._import('products', path)
+        self.assertIn('2 dibuat', out)
+        self.assertEqual(Category.objects.filter(name='Outdoor').count(), 1)
+        camera = Product.objects.get(name='Kamera A')
+        self.assertEqual(sorted(camera.categories.values_list('name', flat=True)), ['Kamera', 'Outdoor'])
+        self.assertEqual(camera.price, Decimal('100.00'))
+
+    def test_invalid_rows_are_reported(self):
+        self._seed_users_and_shops()
+        path = self._file('products.jsonl', '\n'.join(json.dumps(row) for row in [
+            {'shop_name': 'Toko Satu', 'name': 'Valid', 'price': '10.00'},
+            {'shop_name': 'Toko Satu', 'name': 'Harga salah', 'price': 'abc'},
+            {'shop_name': 'Tidak Ada', 'name': 'Tanpa toko', 'price': '10.00'},
+        ]))
+        out, err = self._import('products', path)
+        self.assertIn('1 dibuat', out)
+        self.assertIn('2 gagal', out)
+        errors = [json.loads(line) for line in err.splitlines()]
+        self.assertEqual([error['line'] for error in errors], [2, 3])
+        self.assertIn('price', errors[0]['errors'])
+        self.assertIn('shop_name', errors[1]['errors'])
+
+    def test_resume_skips_committed_batches(self):
+        self._seed_users_and_shops()
+        rows = ''.join(f"Toko Satu,Produk {i},10.00\n" for i in range(5))
+        path = self._file('products.csv', "shop_name,name,price\n" + rows)
+        state = os.path.join(self.tmp.name, 'state.json')
+        self._import('products', path, '--batch-size', '2', '--state', state)
+        self.assertEqual(Product.objects.count(), 5)
+
+        # State menandai seluruh file selesai; resume tidak membuat duplikat
+        out, _ = self._import('products', path, '--state', state, '--resume')
+        self.assertIn('dimulai dari record 5', out)
+        self.assertEqual(Product.objects.count(), 5)
+
+    def test_crash_before_checkpoint_rolls_back_batch(self):
+        self._seed_users_and_shops()
+        rows = ''.join(f"Toko Satu,Produk {i},10.00\n" for i in range(5))
+        path = self._file('products.csv', "shop_name,name,price\n" + rows)
+        state = os.path.join(self.tmp.name, 'state.json')
+        calls = []
+
+        def crash_on_second_batch(*args):
+            calls.append(args)
+            if len(calls) == 2:
+                raise RuntimeError("Proses mati setelah batch ditulis")
+            return save_state(*args)
+
+        save_state = importing.save_state
+        with mock.patch.object(importing, 'save_state', crash_on_second_batch), self.assertRaises(RuntimeError):
+            self._import('products', path, '--batch-size', '2', '--state', state)
+        self.assertEqual(Product.objects.count(), 2)  # Batch kedua batal bersama checkpoint-nya
+
+        out, _ = self._import('products', path, '--batch-size', '2', '--state', state, '--resume')
+        self.assertIn('dimulai dari record 2', out)
+        self.assertEqual(Product.objects.count(), 5)
+
+    def test_rerun_skips_existing_users(self):
+        self._seed_users_and_shops()
+        path = self._file('again.csv', "email,username,full_name\nowner@example.com,owner,Owner\nbaru@example.com,baru,Baru\n")
+        out, _ = self._import('users', path)
+        self.assertIn('1 dibuat, 1 dilewati', out)
+
+
+class ProductBulkCreateTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='seller@example.com', username='seller', password='pass12345')
+        self.shop = Shop.objects.create(user=self.user, shop_name='Toko', address='Jl', postal_code='1', contact='0')
+        self.token = AccessToken.for_user(self.user)
+        self.url = reverse('product-bulk')
+        Category.objects.create(name='Kamera')
+
+    def _post(self, products, token=None):
+        return self.client.post(
+            self.url, {'products': products}, format='json',
+            HTTP_AUTHORIZATION=f'Bearer {token or self.token}'
+        )
+
+    def test_bulk_create_resolves_categories_in_one_pass(self):
+        products = [
+            {'name': f'Produk {i}', 'price': '10.00', 'categories': ['Kamera', f'Baru {i % 3}']}
+            for i in range(100)  # Satu INSERT produk di bawah batas parameter SQLite
+        ]
+        # user, toko, select kategori, insert kategori baru, select ulang,
+        # insert produk, insert relasi, update kategori + savepoint transaksi
+        with self.assertNumQueries(10):
+            response = self._post(products)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['created']), 100)
+        self.assertEqual(Product.objects.filter(shop=self.shop).count(), 100)
+        self.assertEqual(Category.objects.count(), 4)
+        product = Product.objects.get(name='Produk 4')
+        self.assertEqual(sorted(product.categories.values_list('name', flat=True)), ['Baru 1', 'Kamera'])
+
+    def test_invalid_items_are_reported_without_failing_batch(self):
+        response = self._post([
+            {'name': 'Valid', 'price': '10.00', 'categories': []},
+            {'name': 'Tanpa harga', 'categories': []},
+            {'name': 'Valid juga', 'price': '5.00', 'categories': ['Kamera']},
+        ])
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual([item['name'] for item in response.data['created']], ['Valid', 'Valid juga'])
+        self.assertEqual(response.data['errors'][0]['index'], 1)
+        self.assertIn('price', response.data['errors'][0]['errors'])
+
+    def test_all_invalid_returns_400(self):
+        response = self._post([{'name': 'Tanpa harga', 'categories': []}])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Product.objects.exists())
+
+    def test_requires_shop(self):
+        other = User.objects.create_user(email='other@example.com', username='other', password='pass12345')
+        response = self._post([{'name': 'A', 'price': '1.00', 'categories': []}], AccessToken.for_user(other))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_single_create_resolves_categories_in_one_pass(self):
+        def create(names):
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(
+                    reverse('product-list'), {'name': 'Tenda', 'price': '10.00', 'categories': names},
+                    format='json', HTTP_AUTHORIZATION=f'Bearer {self.token}',
+                )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            return len(queries.captured_queries)
+
+        # Jumlah query tidak bergantung pada jumlah kategori
+        self.assertEqual(create(['Kamera', 'Lensa']), create(['Kamera'] + [f'Aksesori {i}' for i in range(8)]))
+        self.assertEqual(Category.objects.count(), 10)
+        product = Product.objects.latest('id')
+        self.assertEqual(product.categories.count(), 9)
+
+    def test_batch_size_limit(self):
+        products = [{'name': 'A', 'price': '1.00', 'categories': []}] * (ProductBulkSerializer.MAX_ITEMS + 1)
+        self.assertEqual(self._post(products).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProductModerationTests(APITestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            email='admin@example.com', username='admin', password='pass12345', role='admin'
+        )
+        seller = User.objects.create_user(email='seller@example.com', username='seller', password='pass12345')
+        shop = Shop.objects.create(user=seller, shop_name='Toko', address='Jl', postal_code='1', contact='0')
+        self.products = [Product.objects.create(shop=shop, name=f'P{i}', price=10) for i in range(25)]
+        self.seller_token = AccessToken.for_user(seller)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.admin)}')
+        self.url = reverse('moderation-products')
+
+    def test_queue_lists_pending_products(self):
+        Product.objects.filter(id=self.products[0].id).update(status='approved')
+        response = self.client.get(self.url, {'page_size': 10})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in response.data['results']], [p.id for p in self.products[1:11]])
+        self.assertTrue(all(row['status'] == 'pending' for row in response.data['results']))
+
+    def test_bulk_block_in_single_update(self):
+        ids = [product.id for product in self.products[:20]]
+        # user, select id, update + savepoint
+        with self.assertNumQueries(5):
+            response = self.client.post(self.url, {'ids': ids, 'decision': 'block'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'updated': 20, 'missing': [], 'not_pending': []})
+        self.assertEqual(Product.objects.filter(status='blocked').count(), 20)
+
+    def test_already_moderated_products_are_reported(self):
+        Product.objects.filter(id=self.products[0].id).update(status='approved')
+        ids = [self.products[0].id, self.products[1].id, 999999]
+        response = self.client.post(self.url, {'ids': ids, 'decision': 'reject'}, format='json')
+        self.assertEqual(response.data, {'updated': 1, 'missing': [999999], 'not_pending': [self.products[0].id]})
+        self.assertEqual(Product.objects.get(id=self.products[0].id).status, 'approved')
+
+    def test_non_admin_forbidden(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.seller_token}')
+        response = self.client.post(self.url, {'ids': [self.products[0].id], 'decision': 'approve'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+@override_settings(CATALOG_CACHE={'ENABLED': False})
+class AsyncCatalogViewTests(APITestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='seller@example.com', username='seller', password='pass12345')
+        self.shop = Shop.objects.create(user=self.user, shop_name='Toko', address='Jl', postal_code='1', contact='0')
+        category = Category.objects.create(name='Kamera')
+        for i in range(25):
+            product = Product.objects.create(shop=self.shop, name=f'P{i}', price=10 + i * 40)
+            product.categories.add(category)
+        token = AccessToken.for_user(self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Bearer {token}'}
+        self.async_auth = {'headers': {'Authorization': f'Bearer {token}'}}
+
+    def _both(self, sync_url, async_url):
+        sync = self.client.get(sync_url, **self.auth)
+        response = async_to_sync(self.async_client.get)(async_url, **self.async_auth)
+        self.assertEqual(response.status_code, sync.status_code)
+        return sync.json(), response.json()
+
+    def test_product_list_matches_sync(self):
+        query = '?page_size=10&min_price=50'
+        sync, result = self._both(reverse('product-list') + query, reverse('async-product-list') + query)
+        self.assertEqual(result['results'], sync['results'])
+        self.assertEqual(result['facets'], sync['facets'])
+        self.assertIsNotNone(result['next'])
+
+        sync_next = self.client.get(sync['next'], **self.auth).json()
+        result_next = async_to_sync(self.async_client.get)(result['next'], **self.async_auth).json()
+        self.assertEqual(result_next['results'], sync_next['results'])
+
+    def test_product_detail_and_shop_detail(self):
+        product = Product.objects.first()
+        sync, result = self._both(
+            reverse('product-detail', args=[product.id]), reverse('async-product-detail', args=[product.id])
+        )
+        self.assertEqual(result, sync)
+        sync, result = self._both(
+            reverse('shop-detail', args=[self.shop.id]), reverse('async-shop-detail', args=[self.shop.id])
+        )
+        self.assertEqual(result, sync)
+        self._both(reverse('product-detail', args=[9999]), reverse('async-product-detail', args=[9999]))
+
+    def test_category_list_with_expansion(self):
+        sync, result = self._both(
+            reverse('category-list') + '?expand=products', reverse('async-category-list') + '?expand=products'
+        )
+        self.assertEqual(result['results'], sync['results'])
+        self.assertEqual(result['results'][0]['product_count'], 25)
+
+    def test_invalid_filter_and_missing_token(self):
+        response = async_to_sync(self.async_client.get)(reverse('async-product-list') + '?min_price=x', **self.async_auth)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = async_to_sync(self.async_client.get)(reverse('async-product-list'))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = async_to_sync(self.async_client.post)(reverse('async-product-list'), **self.async_auth)
+        self.assertEqual(response.status_code, status.HTTP_405_METHOD_NOT_ALLOWED)
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter # type: ignore
-from . import views
+from . import async_views, views
 
 router = DefaultRouter()
 router.register(r'shops', views.ShopViewSet)  # 'shops' adalah bagian dari URL
@@ -10,5 +10,11 @@ router.register(r'discounts', views.DiscountViewSet)
 router.register(r'inventory', views.InventoryViewSet)
 
 urlpatterns = [
+    # Jalur baca async native (ASGI) untuk endpoint katalog yang paling sering dipanggil
+    path('async/products/', async_views.product_list, name='async-product-list'),
+    path('async/products/<int:pk>/', async_views.product_detail, name='async-product-detail'),
+    path('async/categories/', async_views.category_list, name='async-category-list'),
+    path('async/shops/<int:pk>/', async_views.shop_detail, name='async-shop-detail'),
+    path('moderation/products/', views.ProductModerationView.as_view(), name='moderation-products'),
     path('', include(router.urls)),  # URL dasar untuk mengakses router
 ]
\ No newline at end of file
@@ -1,17 +1,48 @@
 # views.py
 
-from rest_framework import viewsets
+import json
+
+from django.db import transaction
+from django.db.models import Prefetch
+from rest_framework import generics, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from melar_project.cache import CachedResponseMixin
+from melar_project.conditional import ConditionalGetMixin
+from melar_project.mixins import QueryPlanMixin
 from .models import Shop
 from .serializers import ShopSerializer
 from .models import Product, Category, Discount, Inventory
 from .serializers import ProductSerializer, CategorySerializer, DiscountSerializer, InventorySerializer
+from .serializers import CATEGORY_PRODUCT_PREVIEW, wants_expansion
+from .serializers import ProductBulkSerializer, ProductModerationDecisionSerializer, ProductModerationSerializer
+from .serializers import ProductFilterSerializer, ProductSearchQuerySerializer, ProductSearchResultSerializer
+from .filters import facet_counts, filter_products
+from .importing import create_products, invalidate_products
+from .moderation import moderate_products
+from .search import search_products
 from .permissions import IsOwnerOrReadOnly
+from users.permissions import IsAdmin
+
+def category_queryset(request):
+    """Kategori beserta product_count, dan preview produk jika `?expand=products`."""
+    queryset = Category.objects.with_product_count()
+    if wants_expansion(request, 'products'):
+        # Prefetch berbatas: satu query (window function) untuk semua kategori di halaman ini
+        preview = Product.objects.order_by('-created_at', '-id')[:CATEGORY_PRODUCT_PREVIEW]
+        queryset = queryset.prefetch_related(
+            Prefetch('products', queryset=preview, to_attr='product_preview')
+        )
+    return queryset
+
 
-class ShopViewSet(viewsets.ModelViewSet):
+class ShopViewSet(ConditionalGetMixin, CachedResponseMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Shop.objects.all()
     serializer_class = ShopSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
+    cache_resource = 'shop'
+    cache_per_user = True  # Queryset dibatasi pada milik user
 
     def perform_create(self, serializer):
         # Menetapkan pengguna saat ini sebagai pemilik toko
@@ -22,15 +53,47 @@ class ShopViewSet(viewsets.ModelViewSet):
         return Shop.objects.filter(user=self.request.user)
 
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(ConditionalGetMixin, CachedResponseMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
+    cache_resource = 'product'
+    cache_per_user = True  # Queryset dibatasi pada milik user
 
     def get_queryset(self):
         # Batasi produk hanya untuk toko milik pengguna saat ini
         return Product.objects.filter(shop__user=self.request.user)
 
+    def get_filter_params(self):
+        if not hasattr(self, '_filter_params'):
+            params = ProductFilterSerializer(data=self.request.query_params)
+            params.is_valid(raise_exception=True)
+            self._filter_params = params.validated_data
+        return self._filter_params
+
+    def filter_queryset(self, queryset):
+        if self.action == 'list':
+            queryset = filter_products(queryset, self.get_filter_params())
+        return super().filter_queryset(queryset)
+
+    def get_facets(self):
+        """Facet counts atas seluruh queryset terfilter; dihitung sekali per request."""
+        if not hasattr(self, '_facets'):
+            params = self.get_filter_params()
+            queryset = filter_products(self.get_queryset(), params)
+            self._facets = facet_counts(queryset, params['price_bucket_size'])
+        return self._facets
+
+    def get_validator_extra(self, queryset):
+        # Facet berubah oleh produk di luar halaman, jadi ikut menentukan ETag
+        return [json.dumps(self.get_facets(), sort_keys=True, default=str)]
+
+    def get_paginated_response(self, data):
+        """Daftar produk terfilter beserta facet counts untuk sidebar filter."""
+        response = super().get_paginated_response(data)
+        response.data['facets'] = self.get_facets()
+        return response
+
     def perform_create(self, serializer):
         # Ambil toko pengguna saat ini
         shop = Shop.objects.filter(user=self.request.user).first()
@@ -40,21 +103,98 @@ class ProductViewSet(viewsets.ModelViewSet):
         # Simpan produk dengan toko pengguna saat ini
         serializer.save(shop=shop)
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Buat banyak produk sekaligus; item yang tidak valid dilaporkan tanpa menggagalkan yang lain."""
+        serializer = ProductBulkSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        shop_id = Shop.objects.filter(user=request.user).values_list('id', flat=True).first()
+        if shop_id is None:
+            return Response({"detail": "You do not have a shop to add products to."}, status=403)
+
+        items, errors = [], []
+        for index, data in enumerate(serializer.validated_data['products']):
+            item = ProductSerializer(data=data)
+            if item.is_valid():
+                items.append(item.validated_data)
+            else:
+                errors.append({"index": index, "errors": item.errors})
+        if not items:
+            return Response({"created": [], "errors": errors}, status=400)
+
+        with transaction.atomic():
+            products = create_products(shop_id, items)
+        invalidate_products()
+        return Response({"created": ProductSerializer(products, many=True).data, "errors": errors}, status=201)
 
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Pencarian full-text (FTS5, ranking BM25) atas produk yang terlihat di list, dengan filter status."""
+        query = ProductSearchQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        params = query.validated_data
+        hits = search_products(
+            params['q'],
+            status=params.get('status'),
+            availability_status=params.get('availability_status'),
+            limit=params['limit'],
+            offset=params['offset'],
+            queryset=self.filter_queryset(self.get_queryset()),  # Visibilitas sama dengan list
+        )
+        for product, rank, snippet in hits:
+            product.rank, product.snippet = rank, snippet
+        results = ProductSearchResultSerializer([product for product, _, _ in hits], many=True).data
+        next_offset = params['offset'] + params['limit'] if len(hits) == params['limit'] else None
+        return Response({"next_offset": next_offset, "results": results})
 
-class CategoryViewSet(viewsets.ModelViewSet):
+
+
+class CategoryViewSet(ConditionalGetMixin, CachedResponseMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticated]  # Tambahkan jika hanya pengguna tertentu yang boleh akses
+    cache_resource = 'category'
+
+    def get_queryset(self):
+        return category_queryset(self.request)
+
+    def get_validator_queryset(self):
+        # Tanpa anotasi product_count; relasi produk sudah menyentuh updated_at kategori
+        return self.filter_queryset(Category.objects.all())
 
+    def get_validator_relations(self):
+        if wants_expansion(self.request, 'products'):
+            return ['products']  # Preview produk ikut di-serialize
+        return []
 
-class DiscountViewSet(viewsets.ModelViewSet):
+
+class DiscountViewSet(ConditionalGetMixin, CachedResponseMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Discount.objects.all()
     serializer_class = DiscountSerializer
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
+    cache_resource = 'discount'
 
-class InventoryViewSet(viewsets.ModelViewSet):
+class InventoryViewSet(ConditionalGetMixin, CachedResponseMixin, QueryPlanMixin, viewsets.ModelViewSet):
     queryset = Inventory.objects.all()
     serializer_class = InventorySerializer
     permission_classes = [IsAuthenticated, IsOwnerOrReadOnly]
+    cache_resource = 'inventory'
+
+
+class ProductModerationView(generics.ListAPIView):
+    """
+    Antrean moderasi produk untuk admin: GET menampilkan produk pending (terlama
+    dulu, keyset di atas indeks `(status, created_at, id)`), POST menerapkan
+    `{"ids": [...], "decision": "approve"|"block"|"reject"}` dengan satu UPDATE.
+    """
+    serializer_class = ProductModerationSerializer
+    permission_classes = [IsAdmin]
+    keyset_ordering = ('created_at', 'id')
+
+    def get_queryset(self):
+        return Product.objects.filter(status='pending')
 
+    def post(self, request):
+        serializer = ProductModerationDecisionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(moderate_products(**serializer.validated_data))
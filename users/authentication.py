@@ -0,0 +1,66 @@
+from asgiref.sync import sync_to_async
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .claims import ahas_fresh_claims, has_fresh_claims, user_from_claims
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication yang membangun user dari claim token tanpa query ke database.
+
+    Token dari `LoginView` membawa `role`, `is_seller`, `is_staff` dan `is_active`.
+    Token tanpa claim tersebut, atau yang claim-nya sudah ditandai berubah oleh
+    `invalidate_user_claims`, memuat user dari database seperti biasa.
+    """
+
+    def get_user(self, validated_token):
+        return self.get_claims_user(validated_token) or super().get_user(validated_token)
+
+    def get_claims_user(self, validated_token):
+        """User dari claim token, atau None jika harus dimuat dari database."""
+        user_id = self.get_user_id(validated_token)
+        if api_settings.CHECK_REVOKE_TOKEN or not has_fresh_claims(validated_token, user_id):
+            return None
+        return self.build_claims_user(validated_token, user_id)
+
+    async def aget_claims_user(self, validated_token):
+        """`get_claims_user` untuk view async; penanda claim dibaca dengan API cache async."""
+        user_id = self.get_user_id(validated_token)
+        if api_settings.CHECK_REVOKE_TOKEN or not await ahas_fresh_claims(validated_token, user_id):
+            return None
+        return self.build_claims_user(validated_token, user_id)
+
+    @staticmethod
+    def get_user_id(validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    @staticmethod
+    def build_claims_user(validated_token, user_id):
+        user = user_from_claims(validated_token, user_id)
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
+
+    async def aauthenticate(self, request):
+        """
+        `authenticate` untuk view async Django (bukan DRF).
+
+        Validasi token murni CPU dan penanda claim dibaca dengan `aget`, jadi jalur
+        claim tidak memblok event loop; fallback ke database lewat `sync_to_async`.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        user = await self.aget_claims_user(validated_token)
+        if user is None:
+            user = await sync_to_async(super().get_user)(validated_token)
+        return user, validated_token
@@ -0,0 +1,35 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from .hashing import dummy_hash, needs_rehash, verify_password
+
+UserModel = get_user_model()
+
+
+class PooledHashingBackend(ModelBackend):
+    """
+    ModelBackend yang memverifikasi password lewat `users.hashing.verify_password`.
+
+    Hash lama (PBKDF2 atau parameter scrypt profil sebelumnya) diperbarui ke profil
+    aktif begitu login berhasil, seperti `User.check_password`.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Tetap jalankan hashing agar waktu respons tidak membocorkan email yang terdaftar
+            verify_password(password, dummy_hash())
+            return None
+
+        if not user.password or not verify_password(password, user.password):
+            return None
+        if needs_rehash(user.password):
+            user.set_password(password)
+            user.save(update_fields=['password'])
+        if self.user_can_authenticate(user):
+            return user
+        return None
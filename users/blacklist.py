@@ -0,0 +1,221 @@
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Max, Min
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+DEFAULTS = {
+    'ENABLED': True,
+    'SYNC_INTERVAL': 2.0,      # Detik antar sinkronisasi baris blacklist baru dari proses lain
+    'REBUILD_INTERVAL': 3600,  # Detik sebelum bloom dibangun ulang tanpa token yang sudah kadaluarsa
+    'CAPACITY': 10000,         # Kapasitas awal bloom; dibesarkan otomatis saat rebuild
+    'ERROR_RATE': 0.001,       # Target false positive bloom
+    'MAX_ENTRIES': 100000,     # Batas entri positif di memori; sisanya dicek ke database
+    'SYNC_OVERLAP': 1000,      # Id sebelum watermark yang ikut dibaca ulang (transaksi yang commit terlambat)
+}
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'TOKEN_BLACKLIST_CACHE', {})}
+
+
+class BloomFilter:
+    """Bloom filter sederhana di atas bytearray dengan double hashing blake2b."""
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode('utf-8'), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(value))
+
+
+class TokenBlacklistCache:
+    """
+    Cache blacklist token per proses.
+
+    Bloom filter menjawab lookup negatif (kasus umum: token belum di-blacklist)
+    tanpa query. Token yang di-blacklist disimpan sampai `exp`-nya lewat, dan
+    baris blacklist baru dari proses lain ditarik per `SYNC_INTERVAL` lewat
+    scan id > id terakhir. Bloom dibangun ulang per `REBUILD_INTERVAL` agar token
+    kadaluarsa ikut terbuang.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._bloom = None
+        self._entries = {}  # jti -> exp (epoch detik)
+        self._last_id = 0
+        self._synced_at = 0.0
+        self._built_at = 0.0
+        self._stats = {
+            'lookups': 0,
+            'bloom_negatives': 0,
+            'cache_hits': 0,
+            'db_lookups': 0,
+            'false_positives': 0,
+            'syncs': 0,
+            'rebuilds': 0,
+            'lookup_seconds_total': 0.0,
+            'lookup_seconds_max': 0.0,
+        }
+
+    def _rows(self, **filters):
+        return (
+            BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now(), **filters)
+            .order_by('id')
+            .values_list('id', 'token__jti', 'token__expires_at')
+        )
+
+    def _remember(self, jti, expires_at, config):
+        self._bloom.add(jti)
+        if len(self._entries) < config['MAX_ENTRIES']:
+            self._entries[jti] = expires_at
+
+    def _rebuild(self, config):
+        # Batas id dibaca dulu agar baris yang masuk selama rebuild ditarik oleh sync berikutnya
+        max_id = self._max_id()
+        rows = list(self._rows(id__lte=max_id))
+        self._bloom = BloomFilter(max(config['CAPACITY'], len(rows) * 2), config['ERROR_RATE'])
+        self._entries = {}
+        for row_id, jti, expires_at in rows:
+            self._remember(jti, expires_at.timestamp(), config)
+        self._last_id = max_id
+        self._built_at = self._synced_at = time.monotonic()
+        self._stats['rebuilds'] += 1
+
+    @staticmethod
+    def _max_id():
+        return BlacklistedToken.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+    def _sync(self, config):
+        now = time.monotonic()
+        if self._bloom is None or now - self._built_at >= config['REBUILD_INTERVAL']:
+            self._rebuild(config)
+            return
+        if now - self._synced_at < config['SYNC_INTERVAL']:
+            return
+        for row_id, jti, expires_at in self._rows(id__gt=self._last_id - config['SYNC_OVERLAP']):
+            if jti not in self._entries:
+                self._remember(jti, expires_at.timestamp(), config)
+            self._last_id = max(self._last_id, row_id)
+        self._synced_at = now
+        self._stats['syncs'] += 1
+
+    def is_blacklisted(self, jti):
+        config = get_config()
+        if not config['ENABLED']:
+            return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+        started = time.perf_counter()
+        with self._lock:
+            self._sync(config)
+            self._stats['lookups'] += 1
+            if jti not in self._bloom:
+                self._stats['bloom_negatives'] += 1
+                result = False
+            else:
+                expires_at = self._entries.get(jti)
+                result = None
+                if expires_at is not None:
+                    self._stats['cache_hits'] += 1
+                    result = True
+        if result is None:
+            # Bloom positif tanpa entri: false positive atau entri di atas MAX_ENTRIES
+            result = BlacklistedToken.objects.filter(token__jti=jti).exists()
+            with self._lock:
+                self._stats['db_lookups'] += 1
+                if not result:
+                    self._stats['false_positives'] += 1
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self._stats['lookup_seconds_total'] += elapsed
+            self._stats['lookup_seconds_max'] = max(self._stats['lookup_seconds_max'], elapsed)
+        return result
+
+    def add(self, jti, expires_at):
+        """Catat token yang baru di-blacklist proses ini tanpa menunggu sinkronisasi."""
+        with self._lock:
+            if self._bloom is not None:
+                self._remember(jti, expires_at, get_config())
+
+    def evict_expired(self):
+        now = time.time()
+        with self._lock:
+            self._entries = {jti: exp for jti, exp in self._entries.items() if exp > now}
+
+    def reset(self):
+        with self._lock:
+            self._bloom = None
+            self._entries = {}
+            self._last_id = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                **self._stats,
+                'entries': len(self._entries),
+                'bloom_items': self._bloom.count if self._bloom is not None else 0,
+                'bloom_bytes': len(self._bloom.bits) if self._bloom is not None else 0,
+            }
+
+
+blacklist_cache = TokenBlacklistCache()
+
+
+def table_sizes():
+    """Jumlah baris tabel token simplejwt, termasuk yang sudah kadaluarsa."""
+    now = timezone.now()
+    return {
+        'outstanding': OutstandingToken.objects.count(),
+        'outstanding_expired': OutstandingToken.objects.filter(expires_at__lte=now).count(),
+        'blacklisted': BlacklistedToken.objects.count(),
+    }
+
+
+def purge_expired(chunk_size=5000, pause=0.0, stdout=None):
+    """
+    Hapus token yang sudah kadaluarsa per rentang id.
+
+    Setiap rentang dihapus di transaksinya sendiri (baris blacklist ikut terhapus
+    lewat CASCADE) sehingga lock tulis tetap pendek di tabel yang besar.
+    """
+    now = timezone.now()
+    # Batas dari primary key saja; expires_at tidak berindeks
+    bounds = OutstandingToken.objects.aggregate(first=Min('id'), last=Max('id'))
+    first, last = bounds['first'], bounds['last']
+    if first is None:
+        return {'outstanding': 0, 'blacklisted': 0}
+
+    deleted = {'outstanding': 0, 'blacklisted': 0}
+    for low in range(first, last + 1, chunk_size):
+        with transaction.atomic():
+            _, counts = OutstandingToken.objects.filter(
+                id__gte=low, id__lt=low + chunk_size, expires_at__lte=now
+            ).delete()
+        deleted['outstanding'] += counts.get(OutstandingToken._meta.label, 0)
+        deleted['blacklisted'] += counts.get(BlacklistedToken._meta.label, 0)
+        if stdout is not None:
+            stdout.write(f"Purged up to id {min(low + chunk_size - 1, last)}")
+        if pause:
+            time.sleep(pause)
+    blacklist_cache.evict_expired()
+    return deleted
@@ -0,0 +1,128 @@
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from .models import CustomUser
+
+# Field user yang ditanam sebagai claim token dan cukup untuk cek izin tanpa query
+CLAIM_FIELDS = ('role', 'is_seller', 'is_staff', 'is_active')
+CLAIMS_ISSUED_AT = 'claims_iat'
+
+DEFAULTS = {
+    'ALIAS': 'default',
+    'USER_CACHE_TTL': 30,  # Detik sebelum status user di cache proses diambil ulang dari cache bersama
+}
+
+_lock = threading.Lock()
+_user_cache = {}  # user_id -> (kadaluarsa, waktu claim terakhir berubah atau None)
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'CLAIMS_AUTH', {})}
+
+
+def _marker_key(user_id):
+    return f'users:claims_changed:{user_id}'
+
+
+def add_claims(token, user):
+    """Tanam field izin `user` ke `token` beserta waktu pengambilannya."""
+    for field in CLAIM_FIELDS:
+        token[field] = getattr(user, field)
+    token[CLAIMS_ISSUED_AT] = time.time()
+    return token
+
+
+def invalidate_user_claims(user_id):
+    """
+    Tandai claim token lama milik `user_id` tidak berlaku lagi.
+
+    Dipanggil otomatis saat field di `CLAIM_FIELDS` berubah lewat `save()`; panggil
+    manual setelah `QuerySet.update()` pada field tersebut. Token yang claim-nya
+    diambil sebelum penanda ini kembali memuat user dari database.
+    """
+    config = get_config()
+    changed_at = time.time()
+    # Disimpan selama umur refresh token: rantai refresh membawa claim lama sampai diperbarui
+    timeout = settings.SIMPLE_JWT['REFRESH_TOKEN_LIFETIME'].total_seconds()
+    caches[config['ALIAS']].set(_marker_key(user_id), changed_at, timeout)
+    with _lock:
+        _user_cache[user_id] = (time.monotonic() + config['USER_CACHE_TTL'], changed_at)
+
+
+def _local_changed_at(user_id, now):
+    """`(True, nilai)` dari cache per proses jika belum kadaluarsa, selain itu `(False, None)`."""
+    with _lock:
+        cached = _user_cache.get(user_id)
+    if cached is not None and cached[0] > now:
+        return True, cached[1]
+    return False, None
+
+
+def _remember_changed_at(user_id, now, changed_at):
+    with _lock:
+        _user_cache[user_id] = (now + get_config()['USER_CACHE_TTL'], changed_at)
+    return changed_at
+
+
+def claims_changed_at(user_id):
+    """Waktu claim `user_id` terakhir berubah, dengan cache per proses ber-TTL pendek."""
+    now = time.monotonic()
+    hit, changed_at = _local_changed_at(user_id, now)
+    if hit:
+        return changed_at
+    changed_at = caches[get_config()['ALIAS']].get(_marker_key(user_id))
+    return _remember_changed_at(user_id, now, changed_at)
+
+
+async def aclaims_changed_at(user_id):
+    """`claims_changed_at` untuk view async: cache bersama dibaca dengan `aget`."""
+    now = time.monotonic()
+    hit, changed_at = _local_changed_at(user_id, now)
+    if hit:
+        return changed_at
+    changed_at = await caches[get_config()['ALIAS']].aget(_marker_key(user_id))
+    return _remember_changed_at(user_id, now, changed_at)
+
+
+def clear_user_cache():
+    with _lock:
+        _user_cache.clear()
+
+
+def _carries_claims(token):
+    return token.get(CLAIMS_ISSUED_AT) is not None and all(field in token for field in CLAIM_FIELDS)
+
+
+def _fresh(token, changed_at):
+    return changed_at is None or token[CLAIMS_ISSUED_AT] > changed_at
+
+
+def has_fresh_claims(token, user_id):
+    return _carries_claims(token) and _fresh(token, claims_changed_at(user_id))
+
+
+async def ahas_fresh_claims(token, user_id):
+    return _carries_claims(token) and _fresh(token, await aclaims_changed_at(user_id))
+
+
+def user_from_claims(token, user_id):
+    """
+    `CustomUser` ringan dari claim token tanpa query.
+
+    Field selain claim di-defer, jadi tetap bisa dipakai sebagai FK dan filter;
+    membaca field lain (mis. `email`) memuatnya dari database saat itu juga.
+    """
+    # simplejwt menyimpan user_id sebagai string; pk harus bertipe asli agar `obj.user == request.user`
+    claims = {'id': CustomUser._meta.pk.to_python(user_id), **{field: token[field] for field in CLAIM_FIELDS}}
+    # from_db mengharapkan nilai berurutan sesuai field model
+    field_names = [field.attname for field in CustomUser._meta.concrete_fields if field.attname in claims]
+    return CustomUser.from_db('default', field_names, [claims[name] for name in field_names])
+
+
+def load_full_user(user):
+    """User lengkap dari database jika `user` dibangun dari claim."""
+    if user.get_deferred_fields():
+        return CustomUser.objects.get(pk=user.pk)
+    return user
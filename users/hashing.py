@@ -0,0 +1,171 @@
+import base64
+import hashlib
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    ScryptPasswordHasher, check_password, get_hasher, identify_hasher, make_password,
+)
+
+# Parameter scrypt per profil. Memori per hash = 128 * work_factor * block_size byte.
+PROFILES = {
+    'throughput': {'work_factor': 2 ** 14, 'block_size': 8, 'parallelism': 1},  # 16 MiB
+    'balanced': {'work_factor': 2 ** 15, 'block_size': 8, 'parallelism': 1},    # 32 MiB
+    'hardened': {'work_factor': 2 ** 17, 'block_size': 8, 'parallelism': 1},    # 128 MiB
+}
+
+DEFAULTS = {
+    'PROFILE': 'balanced',
+    'POOL_SIZE': 0,          # Jumlah proses verifikasi; 0 = verifikasi di thread request
+    'MAX_PENDING': 32,       # Verifikasi yang boleh antre di luar yang sedang berjalan
+    'ACQUIRE_TIMEOUT': 5.0,  # Detik menunggu slot antrean sebelum login ditolak sibuk
+}
+
+
+class HashingBusy(Exception):
+    """Antrean verifikasi password penuh; login sebaiknya dicoba lagi nanti."""
+
+
+def get_config():
+    return {**DEFAULTS, **getattr(settings, 'PASSWORD_HASHING', {})}
+
+
+def get_profile(name=None):
+    return PROFILES[name or get_config()['PROFILE']]
+
+
+class ProfileScryptPasswordHasher(ScryptPasswordHasher):
+    """
+    Scrypt dengan parameter dari profil `PASSWORD_HASHING['PROFILE']`.
+
+    Algoritmanya tetap `scrypt`, jadi hash lama tetap terverifikasi dengan parameter
+    yang tersimpan di hash itu; `must_update` membuat hash diperbarui saat login
+    setelah profil berubah.
+    """
+
+    @property
+    def work_factor(self):
+        return get_profile()['work_factor']
+
+    @property
+    def block_size(self):
+        return get_profile()['block_size']
+
+    @property
+    def parallelism(self):
+        return get_profile()['parallelism']
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        self._check_encode_args(password, salt)
+        n, r, p = n or self.work_factor, r or self.block_size, p or self.parallelism
+        # Batas memori default OpenSSL (32 MiB) terlalu kecil untuk profil hardened.
+        # Dihitung per panggilan karena instance hasher dipakai bersama antar thread.
+        hash_ = hashlib.scrypt(password.encode(), salt=salt.encode(), n=n, r=r, p=p, maxmem=2 * 128 * n * r, dklen=64)
+        hash_ = base64.b64encode(hash_).decode('ascii').strip()
+        return '%s$%d$%s$%d$%d$%s' % (self.algorithm, n, salt, r, p, hash_)
+
+
+def _init_worker(settings_module):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    if not settings.configured:
+        import django
+        django.setup()
+
+
+def _verify(password, encoded):
+    return check_password(password, encoded)
+
+
+_lock = threading.Lock()
+_pool = {'executor': None, 'slots': None}
+
+
+def _get_pool(config):
+    with _lock:
+        if _pool['executor'] is None:
+            _pool['executor'] = hashing_pool(config['POOL_SIZE'])
+        if _pool['slots'] is None:
+            _pool['slots'] = threading.BoundedSemaphore(config['POOL_SIZE'] + config['MAX_PENDING'])
+        return _pool['executor'], _pool['slots']
+
+
+def _discard_pool(executor):
+    """Buang pool yang rusak; slot antrean tetap dipakai karena masih dipegang request lain."""
+    with _lock:
+        if _pool['executor'] is executor:
+            _pool['executor'] = None
+    executor.shutdown(wait=False, cancel_futures=True)
+
+
+def hashing_pool(workers):
+    """Process pool terpisah untuk hashing massal (mis. impor user), siap dipakai `hash_passwords`."""
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(os.environ.get('DJANGO_SETTINGS_MODULE', 'melar_project.settings'),),
+    )
+
+
+def hash_passwords(passwords, executor=None):
+    """`make_password` untuk banyak password; password kosong menjadi unusable."""
+    passwords = [password or None for password in passwords]
+    if executor is None:
+        return [make_password(password) for password in passwords]
+    return list(executor.map(make_password, passwords, chunksize=max(1, len(passwords) // 64)))
+
+
+def shutdown_pool():
+    with _lock:
+        if _pool['executor'] is not None:
+            _pool['executor'].shutdown()
+        _pool['executor'] = _pool['slots'] = None
+
+
+def verify_password(password, encoded):
+    """
+    Verifikasi `password` terhadap hash `encoded`.
+
+    Dengan `POOL_SIZE` > 0 hashing dijalankan di process pool terbatas sehingga
+    CPU-nya tidak memegang GIL worker; jika antrean penuh melebihi
+    `ACQUIRE_TIMEOUT`, `HashingBusy` dilempar. Jika proses worker mati (mis.
+    OOM killer), pool yang rusak diganti baru dan verifikasi dicoba sekali lagi.
+    """
+    config = get_config()
+    if not config['POOL_SIZE']:
+        return _verify(password, encoded)
+    executor, slots = _get_pool(config)
+    if not slots.acquire(timeout=config['ACQUIRE_TIMEOUT']):
+        raise HashingBusy("Password verification queue is full")
+    try:
+        try:
+            return executor.submit(_verify, password, encoded).result()
+        except BrokenProcessPool:
+            _discard_pool(executor)
+            executor, _ = _get_pool(config)
+            return executor.submit(_verify, password, encoded).result()
+    finally:
+        slots.release()
+
+
+def needs_rehash(encoded):
+    """True jika hash dibuat dengan hasher atau parameter selain hasher utama saat ini."""
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False
+    preferred = get_hasher('default')
+    return hasher.algorithm != preferred.algorithm or preferred.must_update(encoded)
+
+
+@lru_cache(maxsize=None)
+def _dummy_hash(profile):
+    return make_password('dummy-password')
+
+
+def dummy_hash():
+    """Hash profil aktif untuk verifikasi palsu saat user tidak ditemukan."""
+    return _dummy_hash(get_config()['PROFILE'])
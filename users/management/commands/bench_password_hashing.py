@@ -0,0 +1,50 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import PBKDF2PasswordHasher, identify_hasher
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from django.utils.crypto import get_random_string
+from users.hashing import PROFILES, ProfileScryptPasswordHasher
+
+
+def _verify_rate(encoded, seconds):
+    """Verifikasi per detik selama kira-kira `seconds`; satu proses = satu core."""
+    hasher = identify_hasher(encoded)  # Parameter dibaca dari hash itu sendiri
+    done, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        hasher.verify('bench-password', encoded)
+        done += 1
+    return done / (time.perf_counter() - start)
+
+
+class Command(BaseCommand):
+    help = "Benchmark verifikasi password (login/detik per core) untuk tiap profil hashing."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seconds', type=float, default=2.0, help="Durasi per profil")
+        parser.add_argument('--processes', type=int, default=1, help="Jumlah proses paralel (1 = per core)")
+        parser.add_argument('--profile', action='append', help="Batasi ke profil tertentu (bisa berulang)")
+
+    def handle(self, *args, **options):
+        seconds, processes = options['seconds'], options['processes']
+        profiles = options['profile'] or [None, *PROFILES]
+        for profile in profiles:
+            with override_settings(PASSWORD_HASHING={'PROFILE': profile} if profile else {}):
+                hasher = ProfileScryptPasswordHasher() if profile else PBKDF2PasswordHasher()
+                encoded = hasher.encode('bench-password', get_random_string(22))
+
+            if processes == 1:
+                rate = _verify_rate(encoded, seconds)
+            else:
+                with ProcessPoolExecutor(max_workers=processes) as pool:
+                    rate = sum(pool.map(_verify_rate, [encoded] * processes, [seconds] * processes))
+
+            per_core = rate / processes
+            self.stdout.write(
+                f"{profile or 'pbkdf2 (django default)':<24} "
+                f"logins/s={rate:8.1f} per_core={per_core:8.1f} "
+                f"ms/login={1000 / per_core if per_core else float('inf'):7.1f} "
+                f"processes={processes} cpus={os.cpu_count()}"
+            )
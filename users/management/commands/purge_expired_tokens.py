@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from users.blacklist import purge_expired, table_sizes
+
+
+class Command(BaseCommand):
+    help = "Hapus OutstandingToken/BlacklistedToken yang sudah kadaluarsa per rentang id, lalu laporkan ukuran tabel."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--pause', type=float, default=0.0, help="Jeda (detik) antar chunk agar penulis lain mendapat lock")
+        parser.add_argument('--dry-run', action='store_true', help="Hanya laporkan ukuran tabel")
+
+    def handle(self, *args, **options):
+        before = table_sizes()
+        self.stdout.write(
+            f"outstanding={before['outstanding']} expired={before['outstanding_expired']} "
+            f"blacklisted={before['blacklisted']}"
+        )
+        if options['dry_run']:
+            return
+
+        start = time.perf_counter()
+        deleted = purge_expired(chunk_size=options['chunk_size'], pause=options['pause'])
+        elapsed = time.perf_counter() - start
+        after = table_sizes()
+        self.stdout.write(self.style.SUCCESS(
+            f"Dihapus {deleted['outstanding']} outstanding dan {deleted['blacklisted']} blacklisted "
+            f"dalam {elapsed:.2f}s; tersisa outstanding={after['outstanding']} blacklisted={after['blacklisted']}."
+        ))
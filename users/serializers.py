@@ -3,6 +3,11 @@ from django.contrib.auth.password_validation import validate_password
 from .models import CustomUser
 from django.contrib.auth import password_validation
 from django.contrib.auth.hashers import check_password
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from .claims import add_claims
+from .tokens import CachedBlacklistRefreshToken
 
 class CustomUserSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True)
@@ -83,3 +88,40 @@ class ChangePasswordSerializer(serializers.Serializer):
         return user
 
   
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Token login dengan claim izin user, dibaca `ClaimsJWTAuthentication` tanpa query."""
+    token_class = CachedBlacklistRefreshToken
+
+    @classmethod
+    def get_token(cls, user):
+        return add_claims(super().get_token(user), user)
+
+
+class ClaimsTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh token sekaligus memperbarui claim dari user yang memang sudah dimuat untuk cek aktif."""
+    token_class = CachedBlacklistRefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM)
+        user = CustomUser.objects.filter(**{api_settings.USER_ID_FIELD: user_id}).first() if user_id else None
+        if user_id and (user is None or not api_settings.USER_AUTHENTICATION_RULE(user)):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+        if user is not None:
+            add_claims(refresh, user)
+
+        data = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                try:
+                    refresh.blacklist()
+                except AttributeError:
+                    pass  # App blacklist tidak terpasang
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            refresh.outstand()
+            data['refresh'] = str(refresh)
+        return data
@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .claims import CLAIM_FIELDS, invalidate_user_claims
+from .models import CustomUser
+
+
+@receiver(pre_save, sender=CustomUser, dispatch_uid='user_claims_pre_save')
+def detect_claim_changes(sender, instance, update_fields=None, **kwargs):
+    instance._claims_changed = False
+    if instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not set(update_fields) & set(CLAIM_FIELDS):
+        return
+    previous = sender.objects.filter(pk=instance.pk).values(*CLAIM_FIELDS).first()
+    instance._claims_changed = previous is not None and any(
+        previous[field] != getattr(instance, field) for field in CLAIM_FIELDS
+    )
+
+
+@receiver(post_save, sender=CustomUser, dispatch_uid='user_claims_post_save')
+def invalidate_changed_claims(sender, instance, created, **kwargs):
+    if getattr(instance, '_claims_changed', False):
+        invalidate_user_claims(instance.pk)
+
+
+@receiver(post_delete, sender=CustomUser, dispatch_uid='user_claims_post_delete')
+def invalidate_deleted_user(sender, instance, **kwargs):
+    invalidate_user_claims(instance.pk)
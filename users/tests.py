@@ -1,7 +1,24 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.test import APITestCase
-from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
+from melar_project.cache import check_shared_caches
+from shops.models import Shop
+from .blacklist import BloomFilter, blacklist_cache
+from . import hashing
+from .claims import clear_user_cache, invalidate_user_claims, user_from_claims
+from .hashing import PROFILES, get_profile, shutdown_pool
+from .tokens import CachedBlacklistRefreshToken
 
 User = get_user_model()
 
@@ -82,3 +99,221 @@ class UserTests(APITestCase):
         self.client.logout()  # Logout to test unauthenticated access
         response = self.client.get(self.profile_url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ClaimsAuthTests(APITestCase):
+
+    def setUp(self):
+        """Setup a user and log in through LoginView to get a token with claims."""
+        cache.clear()
+        clear_user_cache()
+        self.user = User.objects.create_user(
+            username='claims', email='claims@example.com', full_name='Claims User', password='claimspassword123'
+        )
+        self.access, self.refresh = self._login()
+
+    def _login(self):
+        response = self.client.post(reverse('login'), {'email': 'claims@example.com', 'password': 'claimspassword123'})
+        return response.data['tokens']['access'], response.data['tokens']['refresh']
+
+    def _get(self, url, access=None):
+        return self.client.get(url, HTTP_AUTHORIZATION=f'Bearer {access or self.access}')
+
+    def test_login_token_carries_claims(self):
+        token = AccessToken(self.access)
+        self.assertEqual(token['role'], 'user')
+        self.assertFalse(token['is_staff'])
+        self.assertTrue(token['is_active'])
+
+    def test_claims_skip_user_query(self):
+        url = f"{reverse('cart-list')}summary/"
+        with self.assertNumQueries(1):  # Hanya agregat keranjang
+            response = self._get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        legacy = AccessToken.for_user(self.user)  # Token tanpa claim tetap memuat user
+        with self.assertNumQueries(2):
+            self._get(url, access=str(legacy))
+
+    def test_claims_user_equals_database_user(self):
+        # Pemeriksaan pemilik (`obj.user == request.user`) membandingkan pk
+        user = user_from_claims(AccessToken(self.access), AccessToken(self.access)['user_id'])
+        self.assertEqual(user, self.user)
+        self.assertEqual(user.pk, self.user.pk)
+
+    def test_owner_write_with_login_token(self):
+        # Token hasil login sungguhan (berisi claim) harus lolos pemeriksaan pemilik
+        shop = Shop.objects.create(user=self.user, shop_name='Claims Shop', address='Jl. Claim', postal_code='40111', contact='0812')
+        response = self.client.patch(
+            reverse('shop-detail', args=[shop.id]), {'description': 'Toko saya'},
+            HTTP_AUTHORIZATION=f'Bearer {self.access}',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        shop.refresh_from_db()
+        self.assertEqual(shop.description, 'Toko saya')
+
+    def test_profile_loads_full_user(self):
+        response = self._get(reverse('profile'))
+        self.assertEqual(response.data['email'], 'claims@example.com')
+
+    def test_claim_change_falls_back_to_database(self):
+        self.user.is_staff = True
+        self.user.save()
+        url = f"{reverse('cart-list')}summary/"
+        with self.assertNumQueries(2):  # Claim lama tidak dipercaya lagi
+            self._get(url)
+        access, _ = self._login()
+        self.assertTrue(AccessToken(access)['is_staff'])
+        with self.assertNumQueries(1):
+            self._get(url, access=access)
+
+    def test_unrelated_change_keeps_claims(self):
+        self.user.full_name = 'Renamed'
+        self.user.save()
+        with self.assertNumQueries(1):
+            self._get(f"{reverse('cart-list')}summary/")
+
+    def test_deactivated_user_is_rejected(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self._get(reverse('profile')).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deploy_check_requires_shared_cache(self):
+        self.assertIn('melar.E002', [error.id for error in check_shared_caches(None)])
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache', 'LOCATION': 'cache'}}):
+            self.assertEqual(check_shared_caches(None), [])
+
+    def test_refresh_reissues_claims(self):
+        User.objects.filter(pk=self.user.pk).update(role='admin')
+        invalidate_user_claims(self.user.pk)
+        response = self.client.post(reverse('token_refresh'), {'refresh': self.refresh})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data['access'])['role'], 'admin')
+
+
+@override_settings(TOKEN_BLACKLIST_CACHE={'SYNC_INTERVAL': 0})
+class TokenBlacklistTests(APITestCase):
+
+    def setUp(self):
+        """Setup a logged-in user and an empty blacklist cache."""
+        blacklist_cache.reset()
+        self.user = User.objects.create_user(
+            username='blacklist', email='blacklist@example.com', full_name='Blacklist User', password='blacklist123'
+        )
+        response = self.client.post(reverse('login'), {'email': 'blacklist@example.com', 'password': 'blacklist123'})
+        self.access = response.data['tokens']['access']
+        self.refresh = response.data['tokens']['refresh']
+
+    def _refresh(self, token):
+        return self.client.post(reverse('token_refresh'), {'refresh': token})
+
+    def test_rotated_token_is_rejected(self):
+        self.assertEqual(self._refresh(self.refresh).status_code, status.HTTP_200_OK)
+        self.assertEqual(self._refresh(self.refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertGreaterEqual(blacklist_cache.stats()['cache_hits'], 1)
+
+    def test_logout_blacklists_refresh_token(self):
+        response = self.client.post(
+            reverse('logout'), {'refresh': self.refresh}, HTTP_AUTHORIZATION=f'Bearer {self.access}'
+        )
+        self.assertEqual(response.status_code, status.HTTP_205_RESET_CONTENT)
+        self.assertEqual(self._refresh(self.refresh).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(TOKEN_BLACKLIST_CACHE={'SYNC_INTERVAL': 3600})
+    def test_negative_lookup_skips_database(self):
+        jti = CachedBlacklistRefreshToken(self.refresh)['jti']
+        blacklist_cache.is_blacklisted(jti)  # Bangun bloom
+        with self.assertNumQueries(0):
+            self.assertFalse(blacklist_cache.is_blacklisted(jti))
+        self.assertGreaterEqual(blacklist_cache.stats()['bloom_negatives'], 1)
+
+    def test_rows_from_other_processes_are_synced(self):
+        token = CachedBlacklistRefreshToken(self.refresh)
+        blacklist_cache.is_blacklisted(token['jti'])
+        outstanding = OutstandingToken.objects.get(jti=token['jti'])
+        BlacklistedToken.objects.create(token=outstanding)  # Ditulis tanpa melewati cache proses ini
+        self.assertTrue(blacklist_cache.is_blacklisted(token['jti']))
+
+    def test_bloom_filter(self):
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f'jti-{i}')
+        self.assertTrue(all(f'jti-{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'other-{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+    def test_purge_command_removes_only_expired_tokens(self):
+        now = timezone.now()
+        expired = OutstandingToken.objects.bulk_create([
+            OutstandingToken(jti=f'expired-{i}', token='-', user=self.user, expires_at=now - timedelta(days=1))
+            for i in range(25)
+        ])
+        BlacklistedToken.objects.bulk_create([BlacklistedToken(token=token) for token in expired[:10]])
+        live = OutstandingToken.objects.count() - 25
+        out = StringIO()
+        call_command('purge_expired_tokens', chunk_size=7, stdout=out)
+        self.assertIn('Dihapus 25 outstanding dan 10 blacklisted', out.getvalue())
+        self.assertEqual(OutstandingToken.objects.count(), live)
+
+
+class PasswordHashingTests(APITestCase):
+
+    def setUp(self):
+        """Setup a user with a password hashed by the active profile."""
+        self.user = User.objects.create_user(
+            username='hashing', email='hashing@example.com', full_name='Hashing User', password='hashingpassword123'
+        )
+
+    def _login(self):
+        return self.client.post(reverse('login'), {'email': 'hashing@example.com', 'password': 'hashingpassword123'})
+
+    def _password(self):
+        return User.objects.values_list('password', flat=True).get(pk=self.user.pk)
+
+    def test_new_password_uses_profile(self):
+        work_factor = get_profile()['work_factor']
+        self.assertTrue(self._password().startswith(f'scrypt${work_factor}$'))
+
+    def test_legacy_hash_is_upgraded_on_login(self):
+        legacy = PBKDF2PasswordHasher().encode('hashingpassword123', 'legacysalt')
+        User.objects.filter(pk=self.user.pk).update(password=legacy)
+        self.assertEqual(self._login().status_code, status.HTTP_200_OK)
+        self.assertTrue(self._password().startswith('scrypt$'))
+
+    def test_profile_change_rehashes_on_login(self):
+        with override_settings(PASSWORD_HASHING={'PROFILE': 'throughput'}):
+            self.assertEqual(self._login().status_code, status.HTTP_200_OK)
+        self.assertTrue(self._password().startswith(f"scrypt${PROFILES['throughput']['work_factor']}$"))
+
+    def test_wrong_password_and_unknown_user(self):
+        response = self.client.post(reverse('login'), {'email': 'hashing@example.com', 'password': 'wrong'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        response = self.client.post(reverse('login'), {'email': 'nobody@example.com', 'password': 'wrong'})
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(PASSWORD_HASHING={'PROFILE': 'balanced', 'POOL_SIZE': 1, 'MAX_PENDING': 0, 'ACQUIRE_TIMEOUT': 0.01})
+    def test_verification_in_process_pool(self):
+        self.addCleanup(shutdown_pool)
+        self.assertEqual(self._login().status_code, status.HTTP_200_OK)
+
+        _, slots = hashing._get_pool(hashing.get_config())
+        slots.acquire()  # Satu-satunya slot dipakai request lain
+        self.addCleanup(slots.release)
+        response = self._login()
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+
+    @override_settings(PASSWORD_HASHING={'PROFILE': 'throughput', 'POOL_SIZE': 1})
+    def test_broken_pool_is_rebuilt(self):
+        self.addCleanup(shutdown_pool)
+        self.assertEqual(self._login().status_code, status.HTTP_200_OK)
+        executor, _ = hashing._get_pool(hashing.get_config())
+        for process in list(executor._processes.values()):
+            process.kill()  # Seolah worker dimatikan OOM killer
+            process.join()
+        self.assertEqual(self._login().status_code, status.HTTP_200_OK)
+        self.assertIsNot(hashing._get_pool(hashing.get_config())[0], executor)
+
+    def test_benchmark_command(self):
+        out = StringIO()
+        call_command('bench_password_hashing', seconds=0.01, profile=['throughput'], stdout=out)
+        self.assertIn('throughput', out.getvalue())
@@ -0,0 +1,18 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from .blacklist import blacklist_cache
+
+
+class CachedBlacklistRefreshToken(RefreshToken):
+    """RefreshToken yang mengecek blacklist lewat `blacklist_cache`, bukan query per verifikasi."""
+
+    def check_blacklist(self):
+        if blacklist_cache.is_blacklisted(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        blacklist_cache.add(self.payload[api_settings.JTI_CLAIM], self.payload['exp'])
+        return result
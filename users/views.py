@@ -1,9 +1,11 @@
 from rest_framework import status, permissions, generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from .serializers import CustomUserSerializer, ChangePasswordSerializer
+from .claims import load_full_user
+from .hashing import HashingBusy
+from .tokens import CachedBlacklistRefreshToken
 from django.conf import settings
 
 class RegisterView(APIView):
@@ -29,7 +31,12 @@ class LoginView(TokenObtainPairView):
     permission_classes = [permissions.AllowAny]
 
     def post(self, request, *args, **kwargs):
-        response = super().post(request, *args, **kwargs)
+        try:
+            response = super().post(request, *args, **kwargs)
+        except HashingBusy:
+            return Response({
+                "message": "Login is temporarily busy. Please retry shortly."
+            }, status=status.HTTP_503_SERVICE_UNAVAILABLE, headers={"Retry-After": "1"})
         if response.status_code == status.HTTP_200_OK:
             return Response({
                 "message": "Login successful.",
@@ -52,7 +59,7 @@ class LogoutView(APIView):
             }, status=status.HTTP_400_BAD_REQUEST)
         
         try:
-            token = RefreshToken(refresh_token)
+            token = CachedBlacklistRefreshToken(refresh_token)
             token.blacklist()  # Assumes simplejwt.blacklist is configured
             return Response({
                 "message": "Logout successful. Token has been blacklisted."
@@ -71,7 +78,7 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
 
     def get_object(self):
         """Return the current authenticated user."""
-        return self.request.user
+        return load_full_user(self.request.user)  # User dari claim token hanya memuat field izin
 
     def update(self, request, *args, **kwargs):
         """Update the user's profile with feedback messages."""
@@ -93,6 +100,7 @@ class ChangePasswordView(APIView):
 
     def post(self, request, *args, **kwargs):
         """API untuk mengubah password pengguna."""
+        request.user = load_full_user(request.user)  # Validasi password butuh email, username, dst.
         serializer = ChangePasswordSerializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
         